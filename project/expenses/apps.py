@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.core.signals import setting_changed
+from django.db.models.signals import post_migrate, pre_save
 
 
 class ExpensesConfig(AppConfig):
     """Config for the expenses app"""
     name = 'expenses'
+
+    def ready(self) -> None:
+        """Connects the signals of the app"""
+        from .models import set_category_name, set_year_month
+        from .report_cache import reset_report_cache
+        from .search import install_search
+
+        post_migrate.connect(install_search, sender=self)
+        pre_save.connect(set_year_month, sender=self.get_model('Expense'))
+        pre_save.connect(
+            set_category_name, sender=self.get_model('Expense')
+        )
+        setting_changed.connect(reset_report_cache)
@@ -0,0 +1,296 @@
+import datetime
+import heapq
+import itertools
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.query import QuerySet
+
+from . import rollups
+from .models import ArchivedExpense, DataVersion, Expense
+from .pagination import get_sort_key
+from .routers import get_archive_database, get_archive_options
+from .rows import ExpenseRow, iter_expenses, project_expenses
+
+logger = logging.getLogger(__name__)
+
+# Fields compared to tell a copy of an expense from another archived one
+COPIED_FIELDS = ('category_id', 'name', 'amount', 'date')
+
+
+class ArchiveConflict(Exception):
+    """Raised when an archived expense has the id of another expense"""
+
+
+def get_cutoff(age_days: Optional[int] = None,
+               today: Optional[datetime.date] = None) -> datetime.date:
+    """
+    Returns the date, which the expenses dated before are archived,
+    settings.EXPENSES_ARCHIVE['AGE_DAYS'] before today by default
+    """
+    if age_days is None:
+        age_days = get_archive_options()['AGE_DAYS']
+
+    return (today or datetime.date.today()) - datetime.timedelta(age_days)
+
+
+def needs_archive(params: Dict,
+                  archived_before: Optional[datetime.date]) -> bool:
+    """
+    Checks if expenses filtered with given search form parameters may
+    be archived, which is when their dates don't start after the archived
+    ones end. Expenses of the later dates are read only from the default
+    database
+    """
+    if archived_before is None:
+        return False
+
+    starts = [params[key] for key in ('date', 'date_from') if params.get(key)]
+    return not starts or max(starts) < archived_before
+
+
+class CombinedExpenses:
+    """
+    Expenses filtered alike in the default and the archive database,
+    which the views read as a single queryset: they are filtered and
+    ordered in both databases and their slices are merged from the same
+    slices of both of them, as rows
+    """
+
+    def __init__(self, queryset: QuerySet, archived: QuerySet):
+        self.queryset = queryset
+        self.archived = archived
+        self.model = queryset.model
+
+    def __repr__(self):
+        return f'<CombinedExpenses {self.queryset!r} {self.archived!r}>'
+
+    @property
+    def query(self):
+        """Returns query of the expenses of the default database"""
+        return self.queryset.query
+
+    @property
+    def ordered(self) -> bool:
+        """Checks if the expenses are ordered"""
+        return self.queryset.ordered
+
+    @property
+    def querysets(self) -> List[QuerySet]:
+        """Returns the querysets of both databases"""
+        return [self.queryset, self.archived]
+
+    def filter(self, *args, **kwargs) -> 'CombinedExpenses':
+        """Returns the expenses of both databases filtered alike"""
+        return CombinedExpenses(
+            self.queryset.filter(*args, **kwargs),
+            self.archived.filter(*args, **kwargs),
+        )
+
+    def order_by(self, *field_names: str) -> 'CombinedExpenses':
+        """Returns the expenses of both databases ordered alike"""
+        return CombinedExpenses(
+            self.queryset.order_by(*field_names),
+            self.archived.order_by(*field_names),
+        )
+
+    def count(self) -> int:
+        """Returns number of the expenses of both databases"""
+        return self.queryset.count() + self.archived.count()
+
+    def _merge(self, *rows: Iterator[ExpenseRow]) -> Iterator[ExpenseRow]:
+        """Merges ordered rows of both databases"""
+        return heapq.merge(*rows, key=get_sort_key(self.queryset))
+
+    @staticmethod
+    def _get_row(queryset: QuerySet, index: int,
+                 archived: bool = False) -> Optional[ExpenseRow]:
+        """Returns the row at an index of a queryset, None past its end"""
+        rows = project_expenses(queryset[index:index + 1], archived=archived)
+        return rows[0] if rows else None
+
+    def _split(self, start: int) -> Tuple[int, int]:
+        """
+        Returns numbers of the rows of the default and the archive
+        database, which come before a given index of the merged rows.
+        They are found with a binary search, which fetches a single row
+        of both databases at a step, instead of all the rows before
+        the index
+        """
+        key = get_sort_key(self.queryset)
+        low, high = 0, start
+        while low < high:
+            middle = (low + high) // 2
+            row = self._get_row(self.queryset, middle)
+            archived = self._get_row(
+                self.archived, start - middle - 1, archived=True
+            )
+            # The row past the end of a database follows all the others
+            if row is None or (
+                    archived is not None and key(row) > key(archived)
+            ):
+                high = middle
+            else:
+                low = middle + 1
+
+        return low, start - low
+
+    def __getitem__(self, index: slice) -> List[ExpenseRow]:
+        """
+        Returns rows of a slice, merged from the same number of rows
+        of both databases, which follow the rows of each one before
+        the slice
+        """
+        if not isinstance(index, slice) or index.step is not None:
+            raise TypeError('Combined expenses support only slices')
+        if index.stop is None:
+            return list(itertools.islice(self, index.start, None))
+
+        start = index.start or 0
+        size = index.stop - start
+        if size <= 0:
+            return []
+        default_start, archived_start = self._split(start)
+
+        return list(itertools.islice(
+            self._merge(
+                project_expenses(
+                    self.queryset[default_start:default_start + size]
+                ),
+                project_expenses(
+                    self.archived[archived_start:archived_start + size],
+                    archived=True,
+                ),
+            ),
+            size,
+        ))
+
+    def __iter__(self) -> Iterator[ExpenseRow]:
+        """Yields rows of all expenses, fetched in chunks"""
+        return self._merge(
+            iter_expenses(self.queryset),
+            iter_expenses(self.archived, archived=True),
+        )
+
+
+def _get_uncopied(batch: List[Expense]) -> List[Expense]:
+    """
+    Returns expenses of a batch, which aren't in the archive yet. Copies
+    left by an interrupted move are skipped, but an archived expense,
+    which only has the id of one of them (e.g. archived from another
+    copy of the default database), raises ArchiveConflict, so that
+    the expense isn't deleted without being archived
+    """
+    archived = {
+        values[0]: values[1:]
+        for values in ArchivedExpense.objects.filter(
+            pk__in=[expense.pk for expense in batch]
+        ).values_list('pk', *COPIED_FIELDS)
+    }
+    conflicts = [
+        expense.pk for expense in batch
+        if expense.pk in archived and archived[expense.pk] != tuple(
+            getattr(expense, field) for field in COPIED_FIELDS
+        )
+    ]
+    if conflicts:
+        raise ArchiveConflict(
+            f'Archived expenses have ids of other expenses: {conflicts}'
+        )
+
+    return [expense for expense in batch if expense.pk not in archived]
+
+
+def archive_expenses(
+        before: datetime.date, batch_size: Optional[int] = None,
+        on_batch: Optional[Callable[[int], None]] = None
+) -> int:
+    """
+    Moves expenses dated before a given date to the archive database
+    in batches. Each batch is copied and deleted in short transactions
+    of both databases, the archive one is committed first, so that
+    an interrupted move leaves the expenses in the default database.
+    The rollups aren't changed, they summarize the archived expenses too.
+    Returns number of the moved expenses
+    """
+    batch_size = batch_size or get_archive_options()['BATCH_SIZE']
+    # The ids of the expenses are AUTOINCREMENT, SQLite doesn't give
+    # the ones of the archived expenses to new rows
+    expenses = (
+        Expense._base_manager
+        .filter(date__lt=before)
+        .select_related('category')
+        .order_by('pk')
+    )
+
+    moved = 0
+    while True:
+        with transaction.atomic(), \
+                transaction.atomic(using=get_archive_database()):
+            batch = list(expenses[:batch_size])
+            if not batch:
+                return moved
+
+            DataVersion.bump()
+            DataVersion.objects.filter(pk=1).filter(
+                Q(archived_before__isnull=True)
+                | Q(archived_before__lt=before)
+            ).update(archived_before=before)
+            ArchivedExpense.objects.bulk_create([
+                ArchivedExpense(
+                    id=expense.pk,
+                    category_id=expense.category_id,
+                    category_name=(
+                        expense.category.name if expense.category else None
+                    ),
+                    name=expense.name,
+                    amount=expense.amount,
+                    date=expense.date,
+                    year_month=expense.year_month,
+                )
+                for expense in _get_uncopied(batch)
+            ])
+            Expense._base_manager.filter(
+                pk__in=[expense.pk for expense in batch]
+            ).delete()
+
+        moved += len(batch)
+        logger.info('Archived %s expenses', moved)
+        if on_batch is not None:
+            on_batch(moved)
+
+
+def delete_archived(
+        category_id: int, batch_size: Optional[int] = None,
+        on_batch: Optional[Callable[[int], None]] = None
+) -> int:
+    """
+    Deletes archived expenses of a category in batches of primary keys,
+    each one removed from the rollups in short transactions of both
+    databases, returns number of the deleted expenses
+    """
+    if DataVersion.get().archived_before is None:
+        return 0
+
+    batch_size = batch_size or get_archive_options()['BATCH_SIZE']
+    archived = ArchivedExpense.objects.filter(category_id=category_id)
+    deleted = 0
+    while True:
+        pks = list(
+            archived.order_by().values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return deleted
+
+        with transaction.atomic(), transaction.atomic(using=archived.db):
+            batch = ArchivedExpense.objects.filter(pk__in=pks)
+            removed = rollups.collect_queryset(batch)
+            batch.delete()
+            rollups.apply_changes(removed=removed)
+            DataVersion.bump()
+
+        deleted += len(pks)
+        if on_batch is not None:
+            on_batch(deleted)
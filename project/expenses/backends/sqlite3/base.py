@@ -0,0 +1,66 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+# Pragmas run on every new connection, OPTIONS['pragmas'] of a database
+# override (or add) them
+PRAGMAS = {
+    # The readers don't block the writer and the writer doesn't block
+    # the readers, the journal is persisted in the database file
+    'journal_mode': 'WAL',
+    # Commits don't wait for the disk, which is safe in the WAL mode,
+    # a power loss may only lose the last transactions
+    'synchronous': 'NORMAL',
+    # Milliseconds a connection waits for a lock before it fails
+    # with "database is locked"
+    'busy_timeout': 5000,
+    # Negative cache size is in KiB
+    'cache_size': -20000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite backend, which sets up its connections with PRAGMAS (merged
+    with OPTIONS['pragmas']) and starts the transactions in
+    OPTIONS['transaction_mode'], IMMEDIATE by default. An immediate
+    transaction takes the write lock when it begins, waiting for it
+    up to busy_timeout, so a transaction reading before it writes
+    doesn't fail with "database is locked" when another one writes
+    in the meantime, as a deferred one does
+    """
+
+    def __init__(self, settings_dict, *args, **kwargs):
+        super().__init__(settings_dict, *args, **kwargs)
+        options = settings_dict.get('OPTIONS', {})
+        self.pragmas = {**PRAGMAS, **options.get('pragmas', {})}
+        self.transaction_mode = options.get(
+            'transaction_mode', 'IMMEDIATE'
+        ).upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f'Invalid SQLite transaction mode: {self.transaction_mode}'
+            )
+
+    def get_connection_params(self) -> dict:
+        """Returns parameters of sqlite3.connect() without the own options"""
+        kwargs = super().get_connection_params()
+        kwargs.pop('pragmas', None)
+        kwargs.pop('transaction_mode', None)
+
+        return kwargs
+
+    def get_new_connection(self, conn_params: dict):
+        """Opens a connection and runs the pragmas on it"""
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+
+        return connection
+
+    def _start_transaction_under_autocommit(self) -> None:
+        """Starts a transaction in the configured mode"""
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
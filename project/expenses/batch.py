@@ -0,0 +1,91 @@
+from typing import Dict, List
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .forms import ExpenseBatchForm
+from .models import Category, Expense
+
+# Largest number of expenses created by a request
+MAX_ITEMS = 1000
+
+
+class BatchConflict(Exception):
+    """
+    Raised when the ids of the created expenses can't be read back,
+    the expenses aren't created then
+    """
+
+
+def _get_categories(items: List) -> Dict[int, Category]:
+    """Returns the categories referenced by the items, fetched at once"""
+    pks = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            pks.add(Category._meta.pk.to_python(item.get('category')))
+        except ValidationError:
+            continue
+    pks.discard(None)
+
+    return Category.objects.in_bulk(pks) if pks else {}
+
+
+def create_expenses(items: List) -> List[Dict]:
+    """
+    Validates expenses (dicts of the fields of the expense form) and
+    creates the valid ones with a single bulk_create in one transaction.
+    Returns a result of every item in their order: its index and either
+    id of the created expense or errors of its fields. Raises
+    BatchConflict, if the ids of the created expenses can't be read back
+    """
+    categories = _get_categories(items)
+    results = []
+    expenses = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results.append({
+                'index': index, 'errors': {'__all__': ['Not an object.']},
+            })
+            continue
+
+        form = ExpenseBatchForm(data=item, categories=categories)
+        if not form.is_valid():
+            results.append({'index': index, 'errors': form.errors})
+            continue
+
+        results.append({'index': index, 'id': None})
+        expenses.append((results[-1], form.save(commit=False)))
+
+    if not expenses:
+        return results
+
+    with transaction.atomic():
+        last_pk = Expense._base_manager.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        Expense.objects.bulk_create([expense for _, expense in expenses])
+        # SQLite doesn't return the ids of the inserted rows, they are
+        # the ones above the last id: AUTOINCREMENT gives them larger
+        # ids from sqlite_sequence (not necessarily following the last
+        # one), and no other writer gets in between the reading and the
+        # insert of the transaction
+        pks = [expense.pk for _, expense in expenses]
+        if None in pks:
+            pks = list(
+                Expense._base_manager.filter(pk__gt=last_pk)
+                .order_by('pk').values_list('pk', flat=True)
+            )
+            # Otherwise the ids would be given to the wrong expenses,
+            # the insert is rolled back instead
+            if len(pks) != len(expenses):
+                raise BatchConflict(
+                    f'Expected {len(expenses)} new expenses, '
+                    f'found {len(pks)}'
+                )
+
+    for (result, _), pk in zip(expenses, pks):
+        result['id'] = pk
+
+    return results
@@ -0,0 +1,283 @@
+import datetime
+import itertools
+import platform
+import re
+import sqlite3
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import django
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import urls
+from .models import Category, Expense
+from .report_cache import get_report_cache
+from .synthetic import ExpenseGenerator
+from .views import ExpenseReportView
+
+# Last day of the generated expenses, fixed so that reports of different
+# runs are comparable
+END_DATE = datetime.date(2024, 12, 31)
+
+# Values of the URL arguments other than the primary keys, every one
+# of them is benchmarked
+URL_ARGS = {'summary': ExpenseReportView.SUMMARIES}
+
+# Query parameters of the benchmarked variants of the views
+VARIANTS = {
+    'expense-list': {
+        'default': {},
+        'sorted': {'sort_by': 'date: desc'},
+        'grouped': {'group_by': 'category: asc'},
+        'filtered': {'name': 'coffee', 'categories': '<category>'},
+        'cursor': {'pagination': 'cursor', 'sort_by': 'date: desc'},
+        'large-page': {'items_per_page': '500'},
+        'date-range': {'date_from': '2024-01-01', 'date_to': '2024-12-31'},
+    },
+    'expense-export': {
+        'csv': {'format': 'csv'},
+        'ndjson-gzip': {'format': 'ndjson', 'gzip': 'on'},
+    },
+    'expense-report': {
+        'default': {},
+        'filtered': {'categories': '<category>'},
+        'date-range': {'date_from': '2024-01-01', 'date_to': '2024-12-31'},
+    },
+    'category-list': {
+        'default': {},
+        'filtered': {'name': 'foo'},
+    },
+}
+
+VARIANTS['expense-list-async'] = VARIANTS['expense-list']
+
+# Percentiles of the latencies included in the report
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Returns a nearest-rank percentile of given values"""
+    values = sorted(values)
+    rank = max(int(-(-percent * len(values) // 100)), 1)
+
+    return values[rank - 1]
+
+
+def get_requests(objects: Dict[str, int]) -> List[Tuple[str, str, Dict]]:
+    """
+    Returns (label, path, query parameters) of the benchmarked GET requests
+    of every readable URL of the expenses app, the primary keys and <model>
+    placeholders are taken from given ids of objects of the models
+    """
+    requests = []
+    for pattern in urls.urlpatterns:
+        # The views, which only write, aren't benchmarked
+        if not hasattr(pattern.callback.view_class, 'get'):
+            continue
+        model = pattern.name.split('-')[0]
+        names = list(pattern.pattern.converters)
+        choices = [
+            [objects[model]] if name == 'pk' else URL_ARGS[name]
+            for name in names
+        ]
+        for values in itertools.product(*choices):
+            kwargs = dict(zip(names, values))
+            path = reverse(f'expenses:{pattern.name}', kwargs=kwargs)
+            label = '/'.join(
+                [pattern.name]
+                + [str(value) for name, value in kwargs.items()
+                   if name != 'pk']
+            )
+            variants = VARIANTS.get(pattern.name, {'default': {}})
+            for variant, params in variants.items():
+                params = {
+                    key: objects.get(value[1:-1], value)
+                    if value.startswith('<') else value
+                    for key, value in params.items()
+                }
+                if variant != 'default':
+                    label_variant = f'{label}?{variant}'
+                else:
+                    label_variant = label
+                requests.append((label_variant, path, params))
+
+    return requests
+
+
+def _consume(response: HttpResponse) -> int:
+    """Reads the whole (possibly streamed) response, returns its size"""
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+
+    return len(response.content)
+
+
+def _get_server_timing(response: HttpResponse) -> Dict[str, Tuple]:
+    """
+    Returns (duration, description) of the metrics of the Server-Timing
+    header, which is added by the expenses.timing.TimingMiddleware
+    """
+    return {
+        match.group(1): (float(match.group(2)), match.group(3) or '')
+        for match in re.finditer(
+            r'([^\s,;]+);dur=([\d.]+)(?:;desc="([^"]*)")?',
+            response.get('Server-Timing', ''),
+        )
+    }
+
+
+def _clear_caches() -> None:
+    """Clears the cached counts and reports"""
+    cache.clear()
+    get_report_cache().clear()
+
+
+def measure(client: Client, path: str, params: Dict, repeat: int,
+            cold: bool = True) -> Dict:
+    """
+    Requests a path a given number of times and returns the latency
+    percentiles (in milliseconds), number of queries and peak memory
+    allocated by one more request (in KiB, measured separately, because
+    tracing the allocations slows everything down). The queries, which
+    include the ones of the async views' threads, and the median template
+    rendering time are read from the Server-Timing header if it's sent
+    """
+    timings = []
+    templates = []
+    queries = 0
+    for _ in range(repeat):
+        if cold:
+            _clear_caches()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = client.get(path, params)
+            size = _consume(response)
+            timings.append((time.perf_counter() - started) * 1000)
+        server_timing = _get_server_timing(response)
+        queries = len(context.captured_queries)
+        if 'db' in server_timing:
+            queries = int(server_timing['db'][1].split()[0])
+        if 'tpl' in server_timing:
+            templates.append(server_timing['tpl'][0])
+
+    if cold:
+        _clear_caches()
+    tracemalloc.start()
+    try:
+        _consume(client.get(path, params))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        'status': response.status_code,
+        'bytes': size,
+        'queries': queries,
+    }
+    for percent in PERCENTILES:
+        result[f'p{percent}_ms'] = round(percentile(timings, percent), 3)
+    result['max_ms'] = round(max(timings), 3)
+    result['template_ms'] = (
+        round(percentile(templates, 50), 3) if templates else None
+    )
+    result['peak_memory_kib'] = round(peak / 1024, 1)
+
+    return result
+
+
+def _get_objects() -> Dict[str, int]:
+    """
+    Returns ids of the benchmarked objects: the largest category
+    and an expense of it
+    """
+    category = Category.objects.order_by('-expenses_count', 'pk').first()
+    expense = Expense.objects.filter(category=category).order_by('pk').first()
+
+    return {
+        'category': category.pk if category else 0,
+        'expense': expense.pk if expense else 0,
+    }
+
+
+def _analyze() -> None:
+    """Updates statistics of the query planner, as a real database would"""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+
+def run_benchmark(
+        sizes: Iterable[int], repeat: int = 20,
+        generator: Optional[ExpenseGenerator] = None, cold: bool = True,
+        on_result: Optional[Callable[[Dict], None]] = None,
+        views: Optional[Iterable[str]] = None
+) -> Dict:
+    """
+    Benchmarks every URL of the expenses app (or the URLs of given names)
+    at given numbers of expenses, which are generated incrementally
+    in the current database, and returns a JSON serializable report
+    """
+    generator = generator or ExpenseGenerator(end=END_DATE, seed=0)
+    client = Client()
+    results = []
+    for size in sorted(sizes):
+        missing = size - Expense.objects.count()
+        if missing > 0:
+            generator.generate(missing)
+        _analyze()
+        for view, path, params in get_requests(_get_objects()):
+            if views and re.split(r'[/?]', view)[0] not in views:
+                continue
+            result = {'size': size, 'view': view, 'path': path}
+            result.update(measure(client, path, params, repeat, cold))
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    return {
+        'meta': {
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'database': connection.vendor,
+            'repeat': repeat,
+            'cold': cold,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: Dict, report: Dict,
+            metric: str = 'p50_ms') -> List[Dict]:
+    """
+    Returns a metric of the results present in both reports, with its
+    relative change (in percents) against the baseline
+    """
+    before = {
+        (result['size'], result['view']): result
+        for result in baseline['results']
+    }
+    rows = []
+    for result in report['results']:
+        old = before.get((result['size'], result['view']))
+        if old is None or old.get(metric) is None or result[metric] is None:
+            continue
+        change = None
+        if old[metric]:
+            change = round((result[metric] / old[metric] - 1) * 100, 1)
+        rows.append({
+            'size': result['size'],
+            'view': result['view'],
+            'before': old[metric],
+            'after': result[metric],
+            'change': change,
+        })
+
+    return rows
@@ -0,0 +1,84 @@
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.db.models.query import QuerySet
+
+from . import rollups
+from .models import Expense
+
+
+def get_amount_limit() -> Decimal:
+    """Returns the largest amount, which fits the amount field"""
+    field = Expense._meta.get_field('amount')
+    return Decimal(10) ** (field.max_digits - field.decimal_places) \
+        - Decimal(10) ** -field.decimal_places
+
+
+def select_expenses(filtered: Optional[QuerySet],
+                    ids: List[int]) -> Optional[QuerySet]:
+    """
+    Returns the expenses edited at once: the filtered ones (None when
+    no filter is given) narrowed down to given ids, or None when
+    neither of them selects the expenses
+    """
+    if filtered is None and not ids:
+        return None
+
+    queryset = Expense.objects.all() if filtered is None else filtered
+    if ids:
+        queryset = queryset.filter(pk__in=ids)
+
+    return queryset
+
+
+def _check_amounts(queryset: QuerySet, delta: Decimal) -> None:
+    """Checks if the amounts changed with a delta still fit their field"""
+    limit = get_amount_limit()
+    if delta > 0:
+        overflows = queryset.filter(amount__gt=limit - delta)
+    else:
+        overflows = queryset.filter(amount__lt=-limit - delta)
+    if overflows.exists():
+        raise ValidationError(
+            'Amounts of some expenses would exceed %(limit)s.',
+            code='amount_limit', params={'limit': limit},
+        )
+
+
+def bulk_edit(queryset: QuerySet, changes: Dict,
+              batch_size: Optional[int] = None,
+              on_batch: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Applies changes (category, name and amount_delta added
+    to the amounts) to the expenses of a queryset, in batches of primary
+    keys taken in their order. Every batch is a single UPDATE statement,
+    which moves the expenses between the rollups and the categories
+    counters in its own short transaction, so that the database isn't
+    locked for long. Returns number of updated expenses
+    """
+    batch_size = batch_size or rollups.BATCH_SIZE
+    changes = dict(changes)
+    delta = changes.pop('amount_delta', None)
+    if delta:
+        _check_amounts(queryset, delta)
+        changes['amount'] = F('amount') + delta
+
+    queryset = queryset.order_by('pk')
+    updated = 0
+    last_pk = 0
+    while True:
+        # The edited expenses may not be filtered anymore, the batches
+        # continue after the last primary key instead of an offset
+        pks = list(
+            queryset.filter(pk__gt=last_pk)
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return updated
+
+        updated += Expense.objects.filter(pk__in=pks).update(**changes)
+        last_pk = pks[-1]
+        if on_batch is not None:
+            on_batch(updated)
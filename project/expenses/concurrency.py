@@ -0,0 +1,204 @@
+import datetime
+import os
+import platform
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.db import (
+    DEFAULT_DB_ALIAS, OperationalError, close_old_connections, connections,
+)
+
+from .models import Category, Expense
+from .rows import project_expenses
+
+# Connection settings of the stock SQLite backend, a new connection
+# per request with the default journal and transactions
+STOCK_PROFILE = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'OPTIONS': {},
+    'CONN_MAX_AGE': 0,
+}
+
+# Number of the categories of the written expenses
+CATEGORIES = 5
+
+
+def get_profiles() -> Dict[str, Dict]:
+    """
+    Returns the compared connection settings by their names: the stock
+    ones and the ones configured for the default database
+    """
+    default = settings.DATABASES[DEFAULT_DB_ALIAS]
+    return {
+        'stock': STOCK_PROFILE,
+        'configured': {
+            'ENGINE': default['ENGINE'],
+            'OPTIONS': default.get('OPTIONS', {}),
+            'CONN_MAX_AGE': default.get('CONN_MAX_AGE', 0),
+        },
+    }
+
+
+@contextmanager
+def temporary_database(profile: Dict) -> Iterator[str]:
+    """
+    Points the default database of the current and the new threads
+    at a new, migrated SQLite file connected with the settings
+    of a profile, while the block runs, yields path of the file.
+    The previous connection is kept open and restored afterwards
+    """
+    old_settings = connections.settings[DEFAULT_DB_ALIAS]
+    old_connection = connections[DEFAULT_DB_ALIAS]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'concurrency.sqlite3')
+        connections.settings[DEFAULT_DB_ALIAS] = {
+            **old_settings, **profile, 'NAME': path,
+        }
+        connections[DEFAULT_DB_ALIAS] = connections.create_connection(
+            DEFAULT_DB_ALIAS
+        )
+        try:
+            call_command('migrate', verbosity=0, interactive=False)
+            yield path
+        finally:
+            connections[DEFAULT_DB_ALIAS].close()
+            connections.settings[DEFAULT_DB_ALIAS] = old_settings
+            connections[DEFAULT_DB_ALIAS] = old_connection
+
+
+def _write(rng: random.Random, categories: List[int]) -> None:
+    """Creates an expense, as the expense form does"""
+    Expense.objects.create(
+        category_id=rng.choice(categories),
+        name='concurrent',
+        amount=Decimal(rng.randint(100, 10000)) / 100,
+        date=datetime.date(2024, 1, 1)
+        + datetime.timedelta(rng.randrange(366)),
+    )
+
+
+def _read(rng: random.Random, categories: List[int]) -> None:
+    """Reads a page of expenses of a category and their count"""
+    expenses = Expense.objects.filter(category_id=rng.choice(categories))
+    project_expenses(expenses.order_by('-date', '-pk')[:50])
+    expenses.count()
+
+
+def _work(operation: Callable, seed: int, categories: List[int],
+          deadline: float, results: List[Tuple[str, int, int]],
+          kind: str) -> None:
+    """
+    Repeats an operation until a deadline, each time as a request,
+    which closes the old connections afterwards, and records numbers
+    of the finished operations and of the ones failed on a lock
+    """
+    rng = random.Random(seed)
+    done = errors = 0
+    try:
+        while time.perf_counter() < deadline:
+            try:
+                operation(rng, categories)
+                done += 1
+            except OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                errors += 1
+            finally:
+                close_old_connections()
+    finally:
+        connections.close_all()
+        results.append((kind, done, errors))
+
+
+def _summarize(results: List[Tuple[str, int, int]], kind: str,
+               seconds: float) -> Dict:
+    """Returns throughput and lock error rate of operations of a kind"""
+    done = sum(d for k, d, _ in results if k == kind)
+    errors = sum(e for k, _, e in results if k == kind)
+    attempts = done + errors
+
+    return {
+        f'{kind}s': done,
+        f'{kind}s_per_second': round(done / seconds, 1),
+        f'{kind}_errors': errors,
+        f'{kind}_error_rate': round(errors / attempts, 4) if attempts else 0,
+    }
+
+
+def measure(writers: int, readers: int, seconds: float,
+            seed: int = 0) -> Dict:
+    """
+    Runs given numbers of writer and reader threads against the default
+    database for a given number of seconds and returns their throughput
+    and lock error rates
+    """
+    categories = [
+        Category.objects.get_or_create(name=f'category {i}')[0].pk
+        for i in range(CATEGORIES)
+    ]
+    connections[DEFAULT_DB_ALIAS].close()
+
+    results = []
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(
+            target=_work,
+            args=(operation, seed + i, categories, deadline, results, kind),
+        )
+        for i, (operation, kind) in enumerate(
+            [(_write, 'write')] * writers + [(_read, 'read')] * readers
+        )
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        **_summarize(results, 'write', seconds),
+        **_summarize(results, 'read', seconds),
+    }
+
+
+def run_concurrency_benchmark(
+        writers: int = 4, readers: int = 4, seconds: float = 5.0,
+        profiles: Optional[Dict[str, Dict]] = None,
+        on_result: Optional[Callable[[Dict], None]] = None
+) -> Dict:
+    """
+    Measures the writer and reader threads with every connection
+    profile (the stock and the configured one by default), each one
+    on its own new database file, and returns a JSON serializable report
+    """
+    results = []
+    for name, profile in (profiles or get_profiles()).items():
+        with temporary_database(profile):
+            result = {
+                'profile': name,
+                'writers': writers,
+                'readers': readers,
+                'seconds': seconds,
+            }
+            result.update(measure(writers, readers, seconds))
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    return {
+        'meta': {
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'sqlite': sqlite3.sqlite_version,
+        },
+        'results': results,
+    }
@@ -0,0 +1,209 @@
+import hashlib
+import json
+from typing import Any, Dict, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import (
+    EmptyPage, Page, PageNotAnInteger, Paginator,
+)
+from django.db import connections
+from django.db.models import Model
+from django.db.models.query import QuerySet
+
+# Parameters of the search forms, which don't change number of results
+IGNORED_PARAMS = frozenset(
+    ('sort_by', 'group_by', 'items_per_page', 'pagination')
+)
+
+# How long (in seconds) the exact counts are cached
+CACHE_TIMEOUT = 60 * 60
+
+
+class CountResult(NamedTuple):
+    """
+    Number of objects, which might be estimated on large tables,
+    or capped, when counting stopped at a lower bound of it
+    """
+    value: int
+    exact: bool = True
+    capped: bool = False
+
+    def __str__(self):
+        if self.exact:
+            return str(self.value)
+        if self.capped:
+            return f'more than {self.value}'
+        return f'about {self.value}'
+
+
+class EstimatedPage(Page):
+    """
+    Page of a paginator of an estimated number of objects, which knows
+    whether another page follows from the objects themselves
+    """
+
+    def __init__(self, *args, has_next: bool, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._has_next = has_next
+
+    def has_next(self) -> bool:
+        """Checks if there are objects after the page"""
+        return self._has_next
+
+    def end_index(self) -> int:
+        """Returns 1-based index of the last object of the page"""
+        return self.start_index() + len(self) - 1
+
+
+class CountedPaginator(Paginator):
+    """
+    Paginator, which uses an already known number of objects. When
+    the number is only estimated, the pages aren't bounded by it: any
+    page, which has objects, is returned
+    """
+
+    def __init__(self, *args, count: int, exact: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count = count
+        self.exact = exact
+
+    def _has_object(self, index: int) -> bool:
+        """Checks if there is an object at a given 0-based index"""
+        return len(self.object_list[index:index + 1]) > 0
+
+    def validate_number(self, number) -> int:
+        """
+        Validates a page number, the number of pages is checked only
+        when the count is exact
+        """
+        if self.exact:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+
+        return number
+
+    def page(self, number) -> Page:
+        """Returns a page, which must have objects unless it's the first"""
+        if self.exact:
+            return super().page(number)
+
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        has_next = self._has_object(top)
+        if number > 1 and not has_next and not self._has_object(bottom):
+            raise EmptyPage('That page contains no results')
+
+        return EstimatedPage(
+            self.object_list[bottom:top], number, self, has_next=has_next
+        )
+
+
+def _normalize(value: Any) -> Any:
+    """Returns JSON serializable representation of a form value"""
+    if isinstance(value, Model):
+        return value.pk
+    if isinstance(value, (list, tuple, QuerySet)):
+        return sorted(_normalize(item) for item in value)
+    if isinstance(value, str):
+        return value.strip()
+    if value is None:
+        return ''
+    return str(value)
+
+
+def get_cache_key(model, params: Dict, version: str,
+                  kind: str = 'count') -> str:
+    """
+    Returns a cache key of a count (or another kind of result) of a given
+    model, filtered with given form parameters, valid for a given
+    data version
+    """
+    normalized = {
+        key: _normalize(value) for key, value in params.items()
+        if key not in IGNORED_PARAMS and value not in (None, '', [])
+    }
+    digest = hashlib.md5(
+        json.dumps(normalized, sort_keys=True).encode()
+    ).hexdigest()
+
+    return (
+        f'expenses:{kind}:{model._meta.label_lower}:{version}:{digest}'
+    )
+
+
+def _get_table_rows(model, using: str) -> Optional[int]:
+    """
+    Returns number of rows of a model's table from the SQLite statistics,
+    which are gathered by ANALYZE
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        )
+        if cursor.fetchone() is None:
+            return None
+        cursor.execute(
+            'SELECT stat FROM sqlite_stat1 WHERE tbl = %s',
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+
+    return int(row[0].split()[0]) if row else None
+
+
+def estimate_count(queryset: QuerySet) -> Optional[CountResult]:
+    """
+    Returns estimated number of objects of a queryset, when the table
+    has more rows than settings.EXPENSES_COUNT_ESTIMATE_THRESHOLD,
+    or None if it should be counted exactly
+    """
+    threshold = getattr(settings, 'EXPENSES_COUNT_ESTIMATE_THRESHOLD', None)
+    if threshold is None:
+        return None
+
+    rows = _get_table_rows(queryset.model, queryset.db)
+    if rows is None or rows < threshold:
+        return None
+    if not queryset.query.where:
+        return CountResult(rows, exact=False)
+
+    # Counting stops after the threshold rather than scanning the whole
+    # table, larger results are reported as more than it
+    count = queryset.order_by()[:threshold + 1].count()
+    if count > threshold:
+        return CountResult(threshold, exact=False, capped=True)
+
+    return CountResult(count)
+
+
+def get_count(queryset: QuerySet, params: Dict, version: str) -> CountResult:
+    """
+    Returns number of objects of a queryset filtered with given form
+    parameters, exact counts are cached until the data version changes
+    """
+    key = get_cache_key(queryset.model, params, version)
+    count = cache.get(key)
+    if count is not None:
+        return CountResult(count)
+
+    estimate = estimate_count(queryset)
+    if estimate is not None and not estimate.exact:
+        return estimate
+
+    count = estimate.value if estimate is not None else queryset.count()
+    cache.set(key, count, CACHE_TIMEOUT)
+
+    return CountResult(count)
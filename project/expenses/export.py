@@ -0,0 +1,79 @@
+import csv
+import itertools
+import json
+import zlib
+from typing import Iterable, Iterator
+
+from .rows import ExpenseRow
+
+# Formats of the exported files with their content types
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Columns of the exported files, which can be read by import_expenses
+COLUMNS = ('id', 'name', 'amount', 'date', 'category')
+
+# Size (in characters) of the chunks of a streamed file
+CHUNK_SIZE = 64 * 1024
+
+
+def _get_values(row: ExpenseRow) -> tuple:
+    """Returns values of the exported columns of a row"""
+    return (
+        row.id, row.name, str(row.amount), row.date.isoformat(),
+        row.category_name or '',
+    )
+
+
+class _Echo:
+    """File-like object, which returns what is written instead of storing"""
+
+    def write(self, value: str) -> str:
+        """Returns a given value"""
+        return value
+
+
+def _buffered(lines: Iterable[str]) -> Iterator[str]:
+    """Yields given lines joined into chunks of about CHUNK_SIZE"""
+    chunk, size = [], 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk, size = [], 0
+
+    if chunk:
+        yield ''.join(chunk)
+
+
+def write_csv(rows: Iterable[ExpenseRow]) -> Iterator[str]:
+    """Yields chunks of a CSV file (with a header) of given rows"""
+    writer = csv.writer(_Echo())
+    lines = (writer.writerow(_get_values(row)) for row in rows)
+
+    return _buffered(itertools.chain([writer.writerow(COLUMNS)], lines))
+
+
+def write_ndjson(rows: Iterable[ExpenseRow]) -> Iterator[str]:
+    """Yields chunks of a file of given rows with a JSON object per line"""
+    return _buffered(
+        json.dumps(dict(zip(COLUMNS, _get_values(row)))) + '\n'
+        for row in rows
+    )
+
+
+WRITERS = {'csv': write_csv, 'ndjson': write_ndjson}
+
+
+def gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Yields given chunks of text compressed on the fly as a gzip file"""
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+
+    yield compressor.flush()
@@ -1,6 +1,9 @@
-from typing import Union, List, Tuple
+from typing import Dict, Union, List, Tuple
 
 from django import forms
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from .export import FORMATS
 from .models import Expense, Category
 
 
@@ -16,9 +19,16 @@ def _get_choices(choices: Union[str, List]) -> List[Tuple[str, str]]:
     return result
 
 
+def parse_ids(value: str) -> List[int]:
+    """Returns list of comma separated ids, raises ValueError if invalid"""
+    return [int(pk) for pk in value.split(',') if pk.strip()]
+
+
 class ExpenseSearchForm(forms.ModelForm):
     """Form for searching for Expenses"""
     CATEGORIES = ['category: asc', 'category: desc']
+    date_from = forms.DateField()
+    date_to = forms.DateField()
     categories = forms.ModelMultipleChoiceField(
         widget=forms.CheckboxSelectMultiple, queryset=Category.objects.all()
     )
@@ -29,6 +39,10 @@ class ExpenseSearchForm(forms.ModelForm):
         choices=_get_choices(CATEGORIES + ['date'])
     )
     items_per_page = forms.IntegerField(min_value=1)
+    pagination = forms.ChoiceField(choices=_get_choices(['cursor']))
+
+    # Fields narrowing down the expenses, the others only order them
+    FILTERS = ('name', 'date', 'date_from', 'date_to', 'categories')
 
     class Meta:
         model = Expense
@@ -39,6 +53,22 @@ class ExpenseSearchForm(forms.ModelForm):
         for i in self.fields:
             self.fields[i].required = False
 
+    def clean(self):
+        """Checks if the date range isn't reversed"""
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get('date_from')
+        date_to = cleaned_data.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            self.add_error('date_to', 'Must not be earlier than date from.')
+
+        return cleaned_data
+
+    def has_filters(self) -> bool:
+        """Checks if the valid form narrows down the expenses"""
+        return self.is_valid() and any(
+            self.cleaned_data.get(field) for field in self.FILTERS
+        )
+
 
 class CategorySearchForm(forms.Form):
     """
@@ -53,3 +83,137 @@ class CategorySearchForm(forms.Form):
         super().__init__(*args, **kwargs)
         for i in self.fields:
             self.fields[i].required = False
+
+
+class ExpenseExportForm(forms.Form):
+    """Form for choosing format of the exported Expenses"""
+    format = forms.ChoiceField(choices=_get_choices(list(FORMATS))[1:])
+    gzip = forms.BooleanField(required=False)
+
+
+class CategoryChoiceField(forms.ModelChoiceField):
+    """
+    Choice of a category looked up among given categories, fetched
+    at once for many forms, instead of a query of each form
+    """
+    categories: Dict[int, Category] = {}
+
+    def to_python(self, value):
+        """Returns the category of a given primary key"""
+        if value in self.empty_values:
+            return None
+        try:
+            category = self.categories.get(
+                Category._meta.pk.to_python(value)
+            )
+        except ValidationError:
+            category = None
+        if category is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+
+        return category
+
+
+class ExpenseForm(forms.ModelForm):
+    """
+    Form of the expense CreateView and UpdateView, an edited expense
+    keeps its category, while the category is being deleted
+    """
+
+    class Meta:
+        model = Expense
+        fields = '__all__'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.category_id is not None:
+            self.fields['category'].queryset = Category.all_objects.filter(
+                Q(deleting=False) | Q(pk=self.instance.category_id)
+            )
+
+
+class ExpenseBatchForm(forms.ModelForm):
+    """
+    Form validating an expense of a batch with the same rules as the form
+    of the expense CreateView, the categories are looked up among given
+    ones (the ones, which aren't being deleted)
+    """
+
+    class Meta:
+        model = Expense
+        fields = '__all__'
+        field_classes = {'category': CategoryChoiceField}
+
+    def __init__(self, *args, categories: Dict[int, Category], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['category'].categories = categories
+
+    def _get_validation_exclusions(self) -> List[str]:
+        """
+        Excludes the category from the validation of the model, which
+        would query it again, the form has found it among the categories
+        """
+        return [*super()._get_validation_exclusions(), 'category']
+
+
+class ExpenseBulkEditForm(forms.Form):
+    """
+    Form for the changes applied to many expenses at once, selected
+    with their ids and/or the search filters of the expenses list
+    """
+    ids = forms.CharField(
+        required=False, help_text='Comma separated ids of the expenses'
+    )
+    category = forms.ModelChoiceField(
+        queryset=Category.objects.all(), required=False
+    )
+    clear_category = forms.BooleanField(required=False, label='No category')
+    name = forms.CharField(max_length=50, required=False)
+    amount_delta = forms.DecimalField(
+        max_digits=8, decimal_places=2, required=False,
+        help_text='Added to the amounts, a negative one is subtracted',
+    )
+
+    def clean_ids(self) -> List[int]:
+        """Returns list of the given ids"""
+        try:
+            return parse_ids(self.cleaned_data['ids'])
+        except ValueError:
+            raise ValidationError('Enter ids separated by commas.')
+
+    def clean(self):
+        """
+        Checks if the category isn't both set and cleared,
+        and if anything is changed
+        """
+        cleaned_data = super().clean()
+        if cleaned_data.get('category') and \
+                cleaned_data.get('clear_category'):
+            self.add_error(
+                'clear_category', 'Must not be set along with a category.'
+            )
+        elif not self.errors and not self.get_changes():
+            raise ValidationError('Nothing to change.')
+
+        return cleaned_data
+
+    def get_changes(self) -> Dict:
+        """
+        Returns the requested changes: category (None to clear it),
+        name and amount_delta
+        """
+        changes = {}
+        if self.cleaned_data.get('clear_category'):
+            changes['category'] = None
+        elif self.cleaned_data.get('category'):
+            changes['category'] = self.cleaned_data['category']
+        if self.cleaned_data.get('name'):
+            changes['name'] = self.cleaned_data['name']
+        if self.cleaned_data.get('amount_delta'):
+            changes['amount_delta'] = self.cleaned_data['amount_delta']
+
+        return changes
@@ -0,0 +1,149 @@
+import csv
+import json
+from typing import Callable, Dict, IO, Iterator, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import Category, Expense
+
+# Formats of the imported files
+FORMATS = ('csv', 'ndjson')
+
+# Number of the rejected records kept with their errors, the rest
+# of them are only counted
+MAX_ERRORS = 100
+
+
+class InvalidRecord(Exception):
+    """Raised when a record can't be imported"""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f'line {line}: {message}')
+        self.line = line
+
+
+def read_csv(stream: IO[str]) -> Iterator[Tuple[int, Dict]]:
+    """Yields (line number, record) of a CSV file with a header"""
+    reader = csv.DictReader(stream)
+    for record in reader:
+        yield reader.line_num, record
+
+
+def read_ndjson(stream: IO[str]) -> Iterator[Tuple[int, Dict]]:
+    """Yields (line number, record) of a file with a JSON object per line"""
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError as e:
+            yield line, InvalidRecord(line, f'invalid JSON ({e})')
+            continue
+        if not isinstance(record, dict):
+            yield line, InvalidRecord(line, 'not a JSON object')
+            continue
+        yield line, record
+
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson}
+
+
+class ExpenseImporter:
+    """
+    Imports expenses from records with name, amount, date and category
+    (a name), in batches inserted with bulk_create, each of them in its
+    own transaction. Categories are created on demand and cached.
+    The first max_errors rejected records are kept with their errors,
+    all of them are counted
+    """
+
+    def __init__(self, batch_size: int = 1000,
+                 on_batch: Optional[Callable[[int, int], None]] = None,
+                 max_errors: int = MAX_ERRORS):
+        self.batch_size = batch_size
+        self.on_batch = on_batch
+        self.max_errors = max_errors
+        self.categories = {}
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []
+
+    def get_category_id(self, line: int, name: str) -> Optional[int]:
+        """
+        Returns id of a category with a given name, creating it if needed,
+        raises InvalidRecord if the category is being deleted
+        """
+        if not name:
+            return None
+        if name not in self.categories:
+            category = Category.all_objects.filter(name=name).first()
+            if category is None:
+                category = Category.objects.create(name=name)
+            self.categories[name] = (
+                None if category.deleting else category.pk
+            )
+        if self.categories[name] is None:
+            raise InvalidRecord(line, 'category: it is being deleted')
+
+        return self.categories[name]
+
+    def build(self, line: int, record: Dict) -> Expense:
+        """Returns a validated (but not saved) expense built from a record"""
+        values = {}
+        for field_name in ('name', 'amount', 'date'):
+            field = Expense._meta.get_field(field_name)
+            value = record.get(field_name)
+            if value in (None, '') and field.has_default():
+                value = field.get_default()
+            try:
+                values[field_name] = field.clean(value, None)
+            except ValidationError as e:
+                raise InvalidRecord(
+                    line, f'{field_name}: {" ".join(e.messages)}'
+                )
+
+        category = str(record.get('category') or '').strip()
+        if len(category) > Category._meta.get_field('name').max_length:
+            raise InvalidRecord(line, 'category: name is too long')
+
+        return Expense(
+            category_id=self.get_category_id(line, category), **values
+        )
+
+    def _flush(self, batch: List[Expense], line: int) -> None:
+        """Inserts a batch of expenses"""
+        with transaction.atomic():
+            Expense.objects.bulk_create(batch)
+        self.imported += len(batch)
+        batch.clear()
+        if self.on_batch is not None:
+            self.on_batch(line, self.imported)
+
+    def run(self, records: Iterator[Tuple[int, Dict]],
+            skip_to: int = 0) -> int:
+        """
+        Imports records, skipping ones up to a given line,
+        returns number of imported expenses
+        """
+        batch = []
+        line = skip_to
+        for line, record in records:
+            if line <= skip_to:
+                continue
+            try:
+                if isinstance(record, InvalidRecord):
+                    raise record
+                batch.append(self.build(line, record))
+            except InvalidRecord as e:
+                self.rejected += 1
+                if len(self.errors) < self.max_errors:
+                    self.errors.append(e)
+                continue
+            if len(batch) >= self.batch_size:
+                self._flush(batch, line)
+
+        if batch:
+            self._flush(batch, line)
+
+        return self.imported
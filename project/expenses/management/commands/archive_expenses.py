@@ -0,0 +1,51 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...archive import ArchiveConflict, archive_expenses, get_cutoff
+
+
+class Command(BaseCommand):
+    """Moves the old expenses to the archive database"""
+    help = 'Moves expenses older than a cutoff date from the Expense ' \
+           'table to the archive database in batches of short ' \
+           'transactions, they stay listed, reported and exported'
+
+    def add_arguments(self, parser) -> None:
+        """Adds arguments of the command"""
+        parser.add_argument(
+            '--before', metavar='YYYY-MM-DD',
+            help='Expenses dated before this date are archived, by default '
+                 "EXPENSES_ARCHIVE['AGE_DAYS'] before today",
+        )
+        parser.add_argument(
+            '--age-days', type=int,
+            help='Expenses older than this number of days are archived',
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Number of expenses moved at once, by default '
+                 "EXPENSES_ARCHIVE['BATCH_SIZE']",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Handles the command"""
+        if options['before']:
+            try:
+                before = datetime.date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError(f'Invalid date: {options["before"]}')
+        else:
+            before = get_cutoff(options['age_days'])
+
+        def on_batch(moved: int) -> None:
+            """Reports progress of the archiving"""
+            self.stdout.write(f'Archived {moved} expenses')
+
+        try:
+            moved = archive_expenses(before, options['batch_size'], on_batch)
+        except ArchiveConflict as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {moved} expenses dated before {before}'
+        ))
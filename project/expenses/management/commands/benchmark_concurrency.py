@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from ...concurrency import run_concurrency_benchmark
+
+
+class Command(BaseCommand):
+    """Benchmarks concurrent writes and reads of the SQLite database"""
+    help = 'Runs writer threads creating expenses and reader threads ' \
+           'listing them on new SQLite databases, with the stock and ' \
+           'the configured connection settings, and reports their ' \
+           'throughput and "database is locked" error rates'
+
+    def add_arguments(self, parser) -> None:
+        """Adds arguments of the command"""
+        parser.add_argument(
+            '--writers', type=int, default=4,
+            help='Number of the writer threads',
+        )
+        parser.add_argument(
+            '--readers', type=int, default=4,
+            help='Number of the reader threads',
+        )
+        parser.add_argument(
+            '--seconds', type=float, default=5.0,
+            help='Duration of every measurement',
+        )
+        parser.add_argument(
+            '--output', help='File the JSON report is written to',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Handles the command"""
+        def on_result(result) -> None:
+            """Reports a measured profile"""
+            self.stdout.write(
+                f'{result["profile"]:<12} '
+                f'writes {result["writes_per_second"]:>8.1f}/s '
+                f'({result["write_error_rate"]:>6.1%} locked)  '
+                f'reads {result["reads_per_second"]:>8.1f}/s '
+                f'({result["read_error_rate"]:>6.1%} locked)'
+            )
+
+        report = run_concurrency_benchmark(
+            options['writers'], options['readers'], options['seconds'],
+            on_result=on_result,
+        )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f'Report written to {options["output"]}')
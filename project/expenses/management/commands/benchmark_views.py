@@ -0,0 +1,107 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from ...benchmark import END_DATE, compare, run_benchmark
+from ...synthetic import ExpenseGenerator
+
+
+class Command(BaseCommand):
+    """Benchmarks the views of the expenses app on generated data"""
+    help = 'Benchmarks every URL of the expenses app with the test client ' \
+           'at given numbers of generated expenses, in a test database, ' \
+           'and writes the latencies, queries and memory as JSON'
+
+    def add_arguments(self, parser) -> None:
+        """Adds arguments of the command"""
+        parser.add_argument(
+            '--sizes', default='1000,10000,100000',
+            help='Comma separated numbers of expenses',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Number of timed requests of every URL',
+        )
+        parser.add_argument(
+            '--warm', action='store_true',
+            help="Don't clear the cached counts and reports between requests",
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Seed of the generated expenses',
+        )
+        parser.add_argument(
+            '--views',
+            help='Comma separated names of the benchmarked URLs, '
+                 'e.g. expense-report (all of them by default)',
+        )
+        parser.add_argument(
+            '--output', help='File the JSON report is written to',
+        )
+        parser.add_argument(
+            '--compare', metavar='BASELINE',
+            help='JSON report the results are compared with',
+        )
+        parser.add_argument(
+            '--metric', default='p50_ms',
+            help='Metric of the results compared with --compare, '
+                 'e.g. p99_ms, queries or template_ms',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Handles the command"""
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError(f'Invalid sizes: {options["sizes"]}')
+
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        def on_result(result) -> None:
+            """Reports a benchmarked URL"""
+            self.stdout.write(
+                f'{result["size"]:>8} {result["view"]:<40} '
+                f'p50 {result["p50_ms"]:>9.2f} ms  '
+                f'p99 {result["p99_ms"]:>9.2f} ms  '
+                f'{result["queries"]:>3} queries  '
+                f'{result["peak_memory_kib"]:>9.1f} KiB'
+            )
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            report = run_benchmark(
+                sizes, options['repeat'],
+                ExpenseGenerator(end=END_DATE, seed=options['seed']),
+                cold=not options['warm'], on_result=on_result,
+                views=options['views'] and options['views'].split(','),
+            )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f'Report written to {options["output"]}')
+
+        if baseline is not None:
+            for row in compare(baseline, report, options['metric']):
+                change = (
+                    f'{row["change"]:+.1f}%' if row['change'] is not None
+                    else '-'
+                )
+                self.stdout.write(
+                    f'{row["size"]:>8} {row["view"]:<40} '
+                    f'{row["before"]:>9.2f} -> {row["after"]:>9.2f}  '
+                    f'{change}'
+                )
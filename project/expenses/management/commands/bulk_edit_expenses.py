@@ -0,0 +1,80 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from ...bulk_edit import bulk_edit, select_expenses
+from ...forms import ExpenseBulkEditForm, ExpenseSearchForm
+from ...models import Expense
+from ...views import ExpenseFilterMixin
+
+
+class Command(BaseCommand):
+    """Changes many expenses at once"""
+    help = 'Changes the category, name or amounts of the expenses given ' \
+           'with their ids and/or filtered as in the expenses list, ' \
+           'with an UPDATE statement per batch of short transactions'
+
+    def add_arguments(self, parser) -> None:
+        """Adds arguments of the command"""
+        parser.add_argument(
+            '--ids', default='', help='Comma separated ids of the expenses',
+        )
+        parser.add_argument(
+            '--filter', default='',
+            help='Search parameters of the expenses list, e.g. '
+                 '"categories=1&date_to=2020-12-31"',
+        )
+        parser.add_argument('--category', help='Id of the new category')
+        parser.add_argument(
+            '--no-category', action='store_true',
+            help='Clear the category of the expenses',
+        )
+        parser.add_argument('--name', default='', help='New name')
+        parser.add_argument(
+            '--amount-delta', default='',
+            help='Added to the amounts, a negative one is subtracted',
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Number of expenses updated at once',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Handles the command"""
+        form = ExpenseBulkEditForm({
+            'ids': options['ids'],
+            'category': options['category'],
+            'clear_category': options['no_category'],
+            'name': options['name'],
+            'amount_delta': options['amount_delta'],
+        })
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+
+        search_form = ExpenseSearchForm(QueryDict(options['filter']))
+        if options['filter'] and not search_form.has_filters():
+            raise CommandError(
+                f'Invalid filter: {search_form.errors.as_text() or "empty"}'
+            )
+        filtered = None
+        if options['filter']:
+            filtered = ExpenseFilterMixin().filter_queryset(
+                Expense.objects.all(), search_form
+            )
+        queryset = select_expenses(filtered, form.cleaned_data['ids'])
+        if queryset is None:
+            raise CommandError('Select the expenses with --ids or --filter')
+
+        def on_batch(updated: int) -> None:
+            """Reports progress of the changes"""
+            self.stdout.write(f'Updated {updated} expenses')
+
+        try:
+            updated = bulk_edit(
+                queryset, form.get_changes(), options['batch_size'], on_batch
+            )
+        except ValidationError as e:
+            raise CommandError(' '.join(e.messages))
+        self.stdout.write(self.style.SUCCESS(
+            f'Changed {updated} expenses'
+        ))
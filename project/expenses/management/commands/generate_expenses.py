@@ -0,0 +1,67 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...synthetic import ExpenseGenerator
+
+
+class Command(BaseCommand):
+    """Generates realistic expenses for testing and benchmarking"""
+    help = 'Generates expenses with skewed category, name and amount ' \
+           'distributions, spread over a given number of days'
+
+    def add_arguments(self, parser) -> None:
+        """Adds arguments of the command"""
+        parser.add_argument('count', type=int, help='Number of expenses')
+        parser.add_argument(
+            '--categories', type=int, default=12,
+            help='Number of categories, created if they are missing',
+        )
+        parser.add_argument(
+            '--days', type=int, default=3 * 365,
+            help='Number of days the expenses are spread over',
+        )
+        parser.add_argument(
+            '--end', type=datetime.date.fromisoformat,
+            help='Date of the last day (YYYY-MM-DD), by default today',
+        )
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Exponent of the Zipf distribution of the categories '
+                 'and names, 0 makes them uniform',
+        )
+        parser.add_argument(
+            '--uncategorized', type=float, default=0.02,
+            help='Fraction of the expenses without a category',
+        )
+        parser.add_argument(
+            '--seed', type=int, help='Seed making the data reproducible',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=20000,
+            help='Number of expenses inserted at once',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Handles the command"""
+        generator = ExpenseGenerator(
+            categories=options['categories'], days=options['days'],
+            end=options['end'], skew=options['skew'],
+            uncategorized=options['uncategorized'], seed=options['seed'],
+        )
+        started = time.monotonic()
+
+        def on_batch(created: int) -> None:
+            """Reports the speed of the generation"""
+            rate = created / max(time.monotonic() - started, 1e-9)
+            self.stdout.write(
+                f'Generated {created} expenses ({rate:.0f} rows/s)'
+            )
+
+        created = generator.generate(
+            options['count'], options['batch_size'], on_batch
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {created} expenses'
+        ))
@@ -0,0 +1,92 @@
+import json
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...importing import FORMATS, READERS, ExpenseImporter
+
+
+class Command(BaseCommand):
+    """Imports expenses from a CSV or NDJSON file"""
+    help = 'Imports expenses from a CSV (with a header) or NDJSON file ' \
+           'with name, amount, date and category (name) of each expense'
+
+    def add_arguments(self, parser) -> None:
+        """Adds arguments of the command"""
+        parser.add_argument('path', help='Path of the file, - for stdin')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Format of the file, by default guessed from its extension',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of expenses inserted in a single transaction',
+        )
+        parser.add_argument(
+            '--state-file',
+            help='File storing the last imported line, '
+                 'by default <path>.import-state',
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Skip lines imported before, read from the state file',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Handles the command"""
+        path = options['path']
+        file_format = options['format'] or (
+            'ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv'
+        )
+        state_file = options['state_file']
+        if state_file is None and path != '-':
+            state_file = f'{path}.import-state'
+        if options['resume'] and state_file is None:
+            raise CommandError('--resume requires --state-file for stdin')
+
+        skip_to = 0
+        if options['resume'] and os.path.exists(state_file):
+            with open(state_file) as f:
+                skip_to = json.load(f)['line']
+            self.stdout.write(f'Resuming after line {skip_to}')
+
+        started = time.monotonic()
+
+        def on_batch(line: int, imported: int) -> None:
+            """Saves the progress and reports the speed of the import"""
+            if state_file is not None:
+                with open(state_file, 'w') as f:
+                    json.dump({'line': line}, f)
+            rate = imported / max(time.monotonic() - started, 1e-9)
+            self.stdout.write(
+                f'Imported {imported} expenses '
+                f'(line {line}, {rate:.0f} rows/s)'
+            )
+
+        importer = ExpenseImporter(options['batch_size'], on_batch)
+        stream = (
+            sys.stdin if path == '-'
+            else open(path, newline='', encoding='utf-8')
+        )
+        try:
+            importer.run(READERS[file_format](stream), skip_to)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for error in importer.errors:
+            self.stderr.write(f'Rejected {error}')
+        if importer.rejected > len(importer.errors):
+            self.stderr.write(
+                f'Rejected {importer.rejected - len(importer.errors)} '
+                f'more records'
+            )
+
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {importer.imported} expenses, '
+            f'rejected {importer.rejected} '
+            f'({importer.imported / elapsed:.0f} rows/s)'
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from ...models import Category
+from ...purge import purge_category
+
+
+class Command(BaseCommand):
+    """Deletes the hidden categories with their expenses in batches"""
+    help = 'Finishes deletion of the categories, which are hidden, ' \
+           'deleting their expenses in batches of short transactions'
+
+    def add_arguments(self, parser) -> None:
+        """Adds arguments of the command"""
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Number of expenses deleted at once, by default '
+                 "EXPENSES_CATEGORY_PURGE['BATCH_SIZE']",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Handles the command"""
+        categories = Category.all_objects.filter(deleting=True)
+        for category_id, name in categories.values_list('pk', 'name'):
+            def on_batch(deleted: int, remaining: int) -> None:
+                """Reports progress of the deletion"""
+                self.stdout.write(
+                    f'{name}: deleted {deleted} expenses, '
+                    f'{remaining} remaining'
+                )
+
+            deleted = purge_category(
+                category_id, options['batch_size'], on_batch
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Deleted category {name} with {deleted} expenses'
+            ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...rollups import rebuild, verify
+
+
+class Command(BaseCommand):
+    """Rebuilds the expenses rollups and counters and verifies them"""
+    help = 'Rebuilds the expenses rollups and the categories expenses ' \
+           'counters from the Expense table and verifies them against it'
+
+    def add_arguments(self, parser) -> None:
+        """Adds arguments of the command"""
+        parser.add_argument(
+            '--verify-only', action='store_true',
+            help='Only compare the rollups with the Expense table',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Handles the command"""
+        if not options['verify_only']:
+            rows = rebuild()
+            self.stdout.write(f'Rebuilt {rows} rollups')
+
+        errors = verify()
+        for error in errors:
+            self.stderr.write(error)
+        if errors:
+            raise CommandError(f'{len(errors)} rollups are out of date')
+
+        self.stdout.write(self.style.SUCCESS('Rollups are up to date'))
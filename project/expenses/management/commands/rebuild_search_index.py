@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from ...search import get_search_backend
+
+
+class Command(BaseCommand):
+    """Rebuilds the search index of expenses and categories names"""
+    help = 'Rebuilds the search index of expenses and categories names'
+
+    def add_arguments(self, parser) -> None:
+        """Adds arguments of the command"""
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database to rebuild the index in',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Handles the command"""
+        get_search_backend().rebuild(connections[options['database']])
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
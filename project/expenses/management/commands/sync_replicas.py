@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...replicas import sync_replicas
+
+
+class Command(BaseCommand):
+    """Copies the primary database to the replicas"""
+    help = 'Copies the primary SQLite database to every replica in ' \
+           "EXPENSES_REPLICAS['DATABASES'], run it whenever the replicas " \
+           'should catch up with the writes'
+
+    def handle(self, *args, **options) -> None:
+        """Handles the command"""
+        try:
+            synced = sync_replicas(
+                lambda alias: self.stdout.write(f'Synced {alias}')
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Synced {len(synced)} replicas'
+        ))
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:54
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+import django.db.models.deletion
+
+
+def populate_rollups(apps, schema_editor):
+    Expense = apps.get_model('expenses', 'Expense')
+    ExpenseRollup = apps.get_model('expenses', 'ExpenseRollup')
+
+    rows = (
+        Expense.objects
+        .annotate(year_month=TruncMonth('date'))
+        .order_by()
+        .values('category_id', 'year_month')
+        .annotate(total=Sum('amount'), count=Count('pk'))
+    )
+    ExpenseRollup.objects.bulk_create(
+        [ExpenseRollup(**row) for row in rows], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year_month', models.DateField()),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='expenses.category')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='expenserollup',
+            constraint=models.UniqueConstraint(fields=('category', 'year_month'), name='unique_expense_rollup'),
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:55
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_expenses_count(apps, schema_editor):
+    Category = apps.get_model('expenses', 'Category')
+    Expense = apps.get_model('expenses', 'Expense')
+
+    Category.objects.update(
+        expenses_count=Coalesce(Subquery(
+            Expense.objects
+            .filter(category=OuterRef('pk'))
+            .order_by()
+            .values('category')
+            .annotate(c=Count('pk'))
+            .values('c')
+        ), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0002_expense_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='expenses_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_expenses_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0003_category_expenses_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['date', '-id'], name='expense_date_id_desc_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:58
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0004_expense_date_id_desc_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+                ('modified', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
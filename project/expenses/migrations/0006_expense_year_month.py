@@ -0,0 +1,35 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:20
+
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+
+
+def populate_year_month(apps, schema_editor):
+    Expense = apps.get_model('expenses', 'Expense')
+
+    Expense.objects.update(year_month=TruncMonth('date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0005_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='year_month',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.RunPython(populate_year_month, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='expense',
+            name='year_month',
+            field=models.DateField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['year_month', 'category', 'amount'], name='expense_month_category_idx'),
+        ),
+    ]
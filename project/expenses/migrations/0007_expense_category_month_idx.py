@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0006_expense_year_month'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='expense',
+            name='expense_month_category_idx',
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['category', 'year_month', 'amount'], name='expense_category_month_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0007_expense_category_month_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='deleting',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:42
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def populate_daily_rollups(apps, schema_editor):
+    Expense = apps.get_model('expenses', 'Expense')
+    ExpenseDailyRollup = apps.get_model('expenses', 'ExpenseDailyRollup')
+
+    rows = (
+        Expense.objects
+        .order_by()
+        .values('category_id', 'date')
+        .annotate(total=Sum('amount'), count=Count('pk'))
+    )
+    ExpenseDailyRollup.objects.bulk_create(
+        [ExpenseDailyRollup(**row) for row in rows.iterator()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0008_category_deleting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseDailyRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='expenses.category')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='expensedailyrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'category'), name='unique_expense_daily_rollup'),
+        ),
+        migrations.AddConstraint(
+            model_name='expensedailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('category', None)), fields=('date',), name='unique_expense_daily_rollup_uncategorized'),
+        ),
+        migrations.RunPython(populate_daily_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0009_expense_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataversion',
+            name='archived_before',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedExpense',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('category_id', models.IntegerField(blank=True, null=True)),
+                ('category_name', models.CharField(blank=True, max_length=50, null=True)),
+                ('name', models.CharField(max_length=50)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('date', models.DateField()),
+                ('year_month', models.DateField()),
+            ],
+            options={
+                'ordering': ('-date', '-pk'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedexpense',
+            index=models.Index(fields=['date', '-id'], name='archived_date_id_desc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedexpense',
+            index=models.Index(fields=['category_id', 'year_month', 'amount'], name='archived_category_month_idx'),
+        ),
+    ]
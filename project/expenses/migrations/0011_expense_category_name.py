@@ -0,0 +1,38 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+def populate_category_name(apps, schema_editor):
+    Category = apps.get_model('expenses', 'Category')
+    Expense = apps.get_model('expenses', 'Expense')
+
+    Expense.objects.filter(category__isnull=False).update(
+        category_name=models.Subquery(
+            Category.objects.filter(
+                pk=models.OuterRef('category_id')
+            ).values('name')
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0010_archived_expense'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='category_name',
+            field=models.CharField(db_index=True, editable=False, max_length=50, null=True),
+        ),
+        migrations.RunPython(
+            populate_category_name, migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['category_name', '-id'], name='expense_category_name_id_idx'),
+        ),
+    ]
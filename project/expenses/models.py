@@ -1,30 +1,586 @@
 import datetime
+from typing import Any, Tuple
 
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+class DataVersion(models.Model):
+    """
+    Single row with a version of the expenses data, bumped on every write
+    of the Expense and Category models, used to invalidate cached data
+    """
+    version = models.BigIntegerField(default=0)
+    modified = models.DateTimeField(default=timezone.now)
+    # Expenses dated before it may be archived, None if none of them is,
+    # changed by the archive_expenses command with the version
+    archived_before = models.DateField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.version} ({self.modified})'
+
+    @classmethod
+    def bump(cls) -> None:
+        """Increases the data version"""
+        updated = cls.objects.filter(pk=1).update(
+            version=F('version') + 1, modified=timezone.now()
+        )
+        if not updated:
+            cls.objects.create(pk=1, version=1)
+
+    @classmethod
+    def get(cls) -> 'DataVersion':
+        """Returns the current data version"""
+        obj = cls.objects.filter(pk=1).first()
+        if obj is None:
+            obj = cls(pk=1, modified=datetime.datetime(
+                1970, 1, 1, tzinfo=timezone.utc
+            ))
+
+        return obj
+
+    @property
+    def stamp(self) -> str:
+        """
+        Returns the version combined with the modification time, which
+        stays unique even if the table is recreated
+        """
+        return f'{self.version}-{int(self.modified.timestamp() * 10 ** 6)}'
+
+
+class CategoryQuerySet(models.QuerySet):
+    """
+    QuerySet for the expenses categories, which bumps the data version
+    on bulk operations
+    """
+
+    def bulk_create(self, *args, **kwargs):
+        """Creates categories and bumps the data version"""
+        with transaction.atomic(using=self.db):
+            result = super().bulk_create(*args, **kwargs)
+            DataVersion.bump()
+
+        return result
+
+    def update(self, **kwargs):
+        """
+        Updates categories and bumps the data version, new names
+        are copied to the expenses of the categories
+        """
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list('pk', flat=True)) \
+                if 'name' in kwargs else []
+            result = super().update(**kwargs)
+            if pks:
+                Expense._base_manager.filter(category_id__in=pks).update(
+                    category_name=models.Subquery(
+                        Category.all_objects.filter(
+                            pk=models.OuterRef('category_id')
+                        ).values('name')
+                    )
+                )
+            DataVersion.bump()
+
+        return result
+
+    update.alters_data = True
+
+    def delete(self):
+        """Deletes categories and bumps the data version"""
+        with transaction.atomic(using=self.db):
+            result = super().delete()
+            DataVersion.bump()
+
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def hide(self) -> int:
+        """
+        Hides categories, which are being deleted with their expenses,
+        returns number of hidden categories
+        """
+        return self.update(deleting=True)
+
+    hide.alters_data = True
+
+    def with_expenses_amount(self) -> 'CategoryQuerySet':
+        """
+        Annotates categories with the number of their expenses counted
+        from the Expense table, used to verify expenses_count
+        """
+        return self.annotate(expenses_amount=models.Count('expense'))
+
+
+class CategoryManager(models.Manager.from_queryset(CategoryQuerySet)):
+    """Manager of the categories, which aren't being deleted"""
+
+    def get_queryset(self) -> CategoryQuerySet:
+        """Returns the categories, which aren't hidden"""
+        return super().get_queryset().filter(deleting=False)
 
 
 class Category(models.Model):
     """Model for expenses categories"""
     name = models.CharField(max_length=50, unique=True)
 
+    # Number of expenses of the category, maintained with the rollups
+    expenses_count = models.PositiveIntegerField(default=0, editable=False)
+    # Set when the category is deleted, its expenses are then deleted
+    # in batches and the category itself after them
+    deleting = models.BooleanField(default=False, editable=False)
+
+    objects = CategoryManager()
+    all_objects = CategoryQuerySet.as_manager()
+
     def __str__(self):
         return f'{self.name}'
 
+    def validate_unique(self, exclude=None) -> None:
+        """
+        Checks that the name is unique, including the hidden categories,
+        which aren't deleted yet
+        """
+        super().validate_unique(exclude)
+        if exclude and 'name' in exclude:
+            return
+        hidden = Category.all_objects.filter(name=self.name, deleting=True)
+        if hidden.exclude(pk=self.pk).exists():
+            raise ValidationError({
+                'name': 'Category with this Name is still being deleted.'
+            })
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the category and bumps the data version, the new name
+        is copied to the expenses and the archived expenses of the category
+        """
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            Expense._base_manager.filter(category_id=self.pk).exclude(
+                category_name=self.name
+            ).update(category_name=self.name)
+            if DataVersion.get().archived_before is not None:
+                ArchivedExpense.objects.filter(category_id=self.pk).exclude(
+                    category_name=self.name
+                ).update(category_name=self.name)
+            DataVersion.bump()
+
+    def delete(self, *args, **kwargs):
+        """Deletes the category and bumps the data version"""
+        with transaction.atomic(using=kwargs.get('using')):
+            result = super().delete(*args, **kwargs)
+            DataVersion.bump()
+
+        return result
+
+
+def get_year_month(date):
+    """
+    Returns first day of the month of a date, or an expression computing
+    it if the date is an expression
+    """
+    if hasattr(date, 'resolve_expression'):
+        return TruncMonth(date, output_field=models.DateField())
+
+    return models.DateField().to_python(date).replace(day=1)
+
+
+def set_year_month(sender, instance: 'Expense', **kwargs) -> None:
+    """
+    Sets the year-month of an expense from its date, connected to
+    the pre_save signal, which is sent also when loading fixtures
+    """
+    if instance.date is not None:
+        instance.year_month = get_year_month(instance.date)
+
+
+def get_category_name(category) -> Any:
+    """Returns name of a category given as an instance, a pk or None"""
+    if category is None or isinstance(category, Category):
+        return getattr(category, 'name', None)
+
+    return Category.all_objects.filter(pk=category).values_list(
+        'name', flat=True
+    ).first()
+
+
+def set_category_names(objs) -> None:
+    """
+    Copies names of the categories to expenses, the categories, which
+    aren't cached on the expenses, are fetched with a single query
+    """
+    cached = Expense.category.is_cached
+    missing = {
+        obj.category_id for obj in objs
+        if obj.category_id is not None and not cached(obj)
+    }
+    names = dict(
+        Category.all_objects.filter(pk__in=missing).values_list('pk', 'name')
+    ) if missing else {}
+    for obj in objs:
+        if obj.category_id is None:
+            obj.category_name = None
+        elif cached(obj):
+            obj.category_name = obj.category.name
+        else:
+            obj.category_name = names.get(obj.category_id)
+
+
+def set_category_name(sender, instance: 'Expense', **kwargs) -> None:
+    """
+    Copies name of the category to an expense, connected to the pre_save
+    signal, which is sent also when loading fixtures
+    """
+    set_category_names([instance])
+
+
+class ExpenseQuerySet(models.QuerySet):
+    """
+    QuerySet for the expenses, which keeps the rollups and the categories
+    expenses counters up to date and bumps the data version
+    on bulk operations
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Creates expenses, adds them to the rollups
+        and bumps the data version
+        """
+        from . import rollups
+
+        objs = list(objs)
+        for obj in objs:
+            set_year_month(self.model, obj)
+        set_category_names(objs)
+        with transaction.atomic(using=self.db):
+            result = super().bulk_create(objs, *args, **kwargs)
+            rollups.apply_changes(added=rollups.collect_objects(objs))
+            DataVersion.bump()
+
+        return result
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        """
+        Updates expenses, which are moved between the rollups by update,
+        called for every batch
+        """
+        objs = list(objs)
+        if 'date' in fields:
+            for obj in objs:
+                set_year_month(self.model, obj)
+            fields = [*fields, 'year_month']
+        if {'category', 'category_id'}.intersection(fields):
+            set_category_names(objs)
+            fields = [*fields, 'category_name']
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        """Updates expenses and moves them between the rollups"""
+        from . import rollups
+
+        if 'date' in kwargs:
+            kwargs['year_month'] = get_year_month(kwargs['date'])
+        # Names of the categories set with expressions are copied
+        # after the update, when the expressions are evaluated
+        copy_names = False
+        for field in ('category', 'category_id'):
+            if field not in kwargs or 'category_name' in kwargs:
+                continue
+            if hasattr(kwargs[field], 'resolve_expression'):
+                copy_names = True
+            else:
+                kwargs['category_name'] = get_category_name(kwargs[field])
+        updated = 0
+        with transaction.atomic(using=self.db):
+            DataVersion.bump()
+            if not rollups.TRACKED_FIELDS.intersection(kwargs):
+                return super().update(**kwargs)
+
+            pks = list(self.values_list('pk', flat=True))
+            for start in range(0, len(pks), rollups.BATCH_SIZE):
+                queryset = self.model._base_manager.using(self.db).filter(
+                    pk__in=pks[start:start + rollups.BATCH_SIZE]
+                )
+                removed = rollups.collect_queryset(queryset)
+                updated += models.QuerySet.update(queryset, **kwargs)
+                if copy_names:
+                    models.QuerySet.update(
+                        queryset, category_name=models.Subquery(
+                            Category.all_objects.filter(
+                                pk=models.OuterRef('category_id')
+                            ).values('name')
+                        )
+                    )
+                rollups.apply_changes(
+                    removed=removed, added=rollups.collect_queryset(queryset)
+                )
+
+        return updated
+
+    update.alters_data = True
+
+    def delete(self):
+        """Deletes expenses and removes them from the rollups"""
+        from . import rollups
+
+        with transaction.atomic(using=self.db):
+            removed = rollups.collect_queryset(self)
+            result = super().delete()
+            rollups.apply_changes(removed=removed)
+            DataVersion.bump()
+
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
 
 class Expense(models.Model):
     """Model for the expenses"""
 
     class Meta:
         ordering = ('-date', '-pk')
+        indexes = [
+            # SQLite appends the primary key to every index, so the date
+            # and category indexes cover the other orderings of the list
+            models.Index(
+                fields=['date', '-id'], name='expense_date_id_desc_idx'
+            ),
+            # The list sorted by the category name reads this index
+            # (or the one of the name with the implicit ascending
+            # primary key, when it's sorted in the descending order)
+            models.Index(
+                fields=['category_name', '-id'],
+                name='expense_category_name_id_idx',
+            ),
+            # Covers the summaries of the expenses of the categories,
+            # which read only these columns and group by the first two
+            models.Index(
+                fields=['category', 'year_month', 'amount'],
+                name='expense_category_month_idx',
+            ),
+        ]
 
     category = models.ForeignKey(
         Category, models.PROTECT, null=True, blank=True
     )
 
+    # Copy of the name of the category, maintained on every write of
+    # the expense and the category, so that the list is sorted by it
+    # with an index instead of a join
+    category_name = models.CharField(
+        max_length=50, null=True, editable=False, db_index=True
+    )
+
     name = models.CharField(max_length=50)
     amount = models.DecimalField(max_digits=8, decimal_places=2)
 
     date = models.DateField(default=datetime.date.today, db_index=True)
+    # First day of the month of the date, maintained on every write
+    year_month = models.DateField(editable=False)
+
+    objects = ExpenseQuerySet.as_manager()
 
     def __str__(self):
         return f'{self.date} {self.name} {self.amount}'
+
+    def save(self, *args, **kwargs):
+        """Saves the expense and moves it between the rollups"""
+        from . import rollups
+
+        with transaction.atomic(using=kwargs.get('using')):
+            removed = None
+            if self.pk is not None:
+                removed = rollups.collect_queryset(
+                    Expense._base_manager.filter(pk=self.pk)
+                )
+            super().save(*args, **kwargs)
+            rollups.apply_changes(
+                removed=removed, added=rollups.collect_objects([self])
+            )
+            DataVersion.bump()
+
+    def delete(self, *args, **kwargs):
+        """Deletes the expense and removes it from the rollups"""
+        from . import rollups
+
+        with transaction.atomic(using=kwargs.get('using')):
+            removed = rollups.collect_queryset(
+                Expense._base_manager.filter(pk=self.pk)
+            )
+            result = super().delete(*args, **kwargs)
+            rollups.apply_changes(removed=removed)
+            DataVersion.bump()
+
+        return result
+
+
+class ExpenseRollup(models.Model):
+    """
+    Total amount and number of the expenses of a category in a month,
+    maintained on every write of the Expense model
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['category', 'year_month'],
+                name='unique_expense_rollup',
+            ),
+        ]
+
+    category = models.ForeignKey(
+        Category, models.CASCADE, null=True, blank=True
+    )
+    year_month = models.DateField()
+
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.category} {self.year_month:%Y-%m} {self.total}'
+
+
+class ExpenseDailyRollup(models.Model):
+    """
+    Total amount and number of the expenses of a category in a day,
+    maintained with the monthly rollups, so that summaries of a date
+    range read at most a row per day and category instead of the expenses
+    """
+
+    class Meta:
+        constraints = [
+            # Its index leads with the date, so it serves the date ranges
+            models.UniqueConstraint(
+                fields=['date', 'category'],
+                name='unique_expense_daily_rollup',
+            ),
+            # NULLs are distinct in the unique index above
+            models.UniqueConstraint(
+                fields=['date'], condition=models.Q(category=None),
+                name='unique_expense_daily_rollup_uncategorized',
+            ),
+        ]
+
+    category = models.ForeignKey(
+        Category, models.CASCADE, null=True, blank=True
+    )
+    date = models.DateField()
+
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.category} {self.date:%Y-%m-%d} {self.total}'
+
+
+def _translate_lookup(lookup: str, value=None) -> Tuple[str, Any]:
+    """
+    Returns a lookup (and its value) of the Expense model translated
+    to the fields of the ArchivedExpense model, which stores the id
+    and the name of the category instead of the relation
+    """
+    for prefix, field in (
+            ('category__name', 'category_name'), ('category', 'category_id')
+    ):
+        if lookup != prefix and not lookup.startswith(f'{prefix}__'):
+            continue
+        lookup = field + lookup[len(prefix):]
+        if field == 'category_id':
+            if isinstance(value, models.Model):
+                value = value.pk
+            elif isinstance(value, (list, tuple, models.QuerySet)):
+                value = [getattr(item, 'pk', item) for item in value]
+        break
+
+    return lookup, value
+
+
+def _translate_q(q: models.Q) -> models.Q:
+    """Returns a condition of the Expense model translated as a lookup"""
+    return models.Q(
+        *(
+            _translate_q(child) if isinstance(child, models.Q)
+            else _translate_lookup(*child)
+            for child in q.children
+        ),
+        _connector=q.connector, _negated=q.negated,
+    )
+
+
+class ArchivedExpenseQuerySet(models.QuerySet):
+    """
+    QuerySet of the archived expenses, which accepts the lookups
+    and orderings of the Expense model (by the category and its name),
+    so that they can be filtered and sorted with the same code
+    """
+
+    def filter(self, *args, **kwargs):
+        """Filters archived expenses with lookups of the Expense model"""
+        return super().filter(
+            *(_translate_q(q) for q in args),
+            **dict(_translate_lookup(*item) for item in kwargs.items())
+        )
+
+    def exclude(self, *args, **kwargs):
+        """Excludes archived expenses with lookups of the Expense model"""
+        return super().exclude(
+            *(_translate_q(q) for q in args),
+            **dict(_translate_lookup(*item) for item in kwargs.items())
+        )
+
+    def order_by(self, *field_names):
+        """Orders archived expenses with fields of the Expense model"""
+        return super().order_by(*(
+            field[:len(field) - len(field.lstrip('-'))]
+            + _translate_lookup(field.lstrip('-'))[0]
+            if isinstance(field, str) else field
+            for field in field_names
+        ))
+
+    def values_list(self, *fields, **kwargs):
+        """Returns values of fields named as in the Expense model"""
+        return super().values_list(
+            *(_translate_lookup(field)[0] for field in fields), **kwargs
+        )
+
+
+class ArchivedExpense(models.Model):
+    """
+    Expense moved to the archive database by the archive_expenses command.
+    The categories stay in the default database, so the archived expenses
+    keep id and a copy of the name of their category instead of a relation
+    """
+
+    class Meta:
+        ordering = ('-date', '-pk')
+        indexes = [
+            models.Index(
+                fields=['date', '-id'], name='archived_date_id_desc_idx'
+            ),
+            models.Index(
+                fields=['category_id', 'year_month', 'amount'],
+                name='archived_category_month_idx',
+            ),
+        ]
+
+    # Id of the expense, which isn't reused by the new expenses
+    id = models.IntegerField(primary_key=True)
+    category_id = models.IntegerField(null=True, blank=True)
+    category_name = models.CharField(max_length=50, null=True, blank=True)
+
+    name = models.CharField(max_length=50)
+    amount = models.DecimalField(max_digits=8, decimal_places=2)
+
+    date = models.DateField()
+    year_month = models.DateField()
+
+    objects = ArchivedExpenseQuerySet.as_manager()
+
+    def __str__(self):
+        return f'{self.date} {self.name} {self.amount} (archived)'
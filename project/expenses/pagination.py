@@ -0,0 +1,241 @@
+import base64
+import binascii
+import datetime
+import functools
+import json
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from django.db.models import Q
+from django.db.models.query import QuerySet
+
+# Fields, which the expenses can be ordered by in the cursor mode,
+# with functions converting their values back from JSON
+CURSOR_FIELDS = {
+    'date': datetime.date.fromisoformat,
+    'category_name': str,
+    'pk': int,
+}
+
+
+class InvalidCursor(Exception):
+    """Raised when a cursor can't be decoded"""
+
+
+def _get_ordering(queryset: QuerySet) -> List[Tuple[str, bool]]:
+    """
+    Returns ordering of a queryset as a list of (field, descending),
+    ending with the primary key, so that it is unambiguous
+    """
+    ordering = []
+    for term in queryset.query.order_by or queryset.model._meta.ordering:
+        field = term.lstrip('-')
+        if field == 'id':
+            field = 'pk'
+        if field not in CURSOR_FIELDS:
+            raise ValueError(f'Ordering by {term} is not supported')
+        ordering.append((field, term.startswith('-')))
+
+    if not ordering:
+        ordering.append(('pk', False))
+    elif ordering[-1][0] != 'pk':
+        ordering.append(('pk', ordering[-1][1]))
+
+    return ordering
+
+
+def _get_value(obj, field: str) -> Any:
+    """
+    Returns value of an ordering field of an object, which is either
+    a row with the field's attribute (category__name as category_name)
+    or a model instance, where the relations are followed
+    """
+    attr = field.replace('__', '_')
+    if hasattr(obj, attr):
+        return getattr(obj, attr)
+
+    value = obj
+    for attr in field.split('__'):
+        value = getattr(value, attr) if value is not None else None
+
+    return value
+
+
+def get_sort_key(queryset: QuerySet) -> Callable[[Any], Any]:
+    """
+    Returns a key function sorting objects (or rows) in the order
+    of a queryset, NULLs are placed first in the ascending order
+    (as in SQLite)
+    """
+    ordering = _get_ordering(queryset)
+
+    def compare(a, b) -> int:
+        """Compares two objects by the ordering fields"""
+        for field, descending in ordering:
+            x, y = _get_value(a, field), _get_value(b, field)
+            if x == y:
+                continue
+            result = -1 if x is None or (y is not None and x < y) else 1
+            return -result if descending else result
+
+        return 0
+
+    return functools.cmp_to_key(compare)
+
+
+def _after(field: str, value: Any, descending: bool) -> Q:
+    """
+    Returns condition for rows after a given value of a field,
+    NULLs are placed first in the ascending order (as in SQLite)
+    """
+    if descending:
+        if value is None:
+            return Q(pk__in=[])
+        return Q(**{f'{field}__lt': value}) | Q(**{f'{field}__isnull': True})
+
+    if value is None:
+        return Q(**{f'{field}__isnull': False})
+    return Q(**{f'{field}__gt': value})
+
+
+def _equal(field: str, value: Any) -> Q:
+    """Returns condition for rows with a given value of a field"""
+    if value is None:
+        return Q(**{f'{field}__isnull': True})
+    return Q(**{field: value})
+
+
+class CursorPage(Sequence):
+    """Page of objects returned by the CursorPaginator"""
+
+    def __init__(
+            self, object_list: List, next_cursor: Optional[str],
+            previous_cursor: Optional[str]
+    ):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        """Checks if there is a next page"""
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        """Checks if there is a previous page"""
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        """Checks if there are other pages"""
+        return self.has_next() or self.has_previous()
+
+    def start_index(self) -> int:
+        """
+        Returns index of the first object on the page, pages of cursors
+        are not numbered, so it's counted from the page start
+        """
+        return 1
+
+
+class CursorPaginator:
+    """
+    Paginator, which filters the queryset by the ordering key of the last
+    (or first) object of the previous page instead of using OFFSET,
+    so every page costs the same, however deep it is
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int,
+                 project: Callable[[QuerySet], List] = list):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = _get_ordering(queryset)
+        self.project = project
+
+    def _get_keys(self, obj) -> List:
+        """Returns values of the ordering fields of a given object"""
+        return [_get_value(obj, field) for field, _ in self.ordering]
+
+    def encode(self, obj, backwards: bool = False) -> str:
+        """Returns an opaque cursor pointing at a given object"""
+        keys = [
+            value.isoformat() if isinstance(value, datetime.date) else value
+            for value in self._get_keys(obj)
+        ]
+        data = json.dumps({'k': keys, 'b': backwards}, separators=(',', ':'))
+
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode(self, cursor: str) -> Tuple[List, bool]:
+        """Returns keys and direction of a given cursor"""
+        try:
+            data = json.loads(base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)
+            ))
+            keys = [
+                None if value is None else CURSOR_FIELDS[field](value)
+                for (field, _), value in zip(self.ordering, data['k'])
+            ]
+            backwards = bool(data['b'])
+        except (
+                binascii.Error, KeyError, TypeError, ValueError,
+                UnicodeDecodeError
+        ) as e:
+            raise InvalidCursor(f'Invalid cursor: {cursor}') from e
+
+        if len(keys) != len(self.ordering):
+            raise InvalidCursor(f'Invalid cursor: {cursor}')
+
+        return keys, backwards
+
+    def _filter_after(self, keys: List, backwards: bool) -> Q:
+        """
+        Returns condition for rows after (or before) given keys, led by
+        a range condition on the first field, which can use an index
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (field, descending), value in zip(self.ordering, keys):
+            condition |= equal & _after(field, value, descending ^ backwards)
+            equal &= _equal(field, value)
+
+        field, descending = self.ordering[0]
+        return (
+            _after(field, keys[0], descending ^ backwards)
+            | _equal(field, keys[0])
+        ) & condition
+
+    def page(self, cursor: Optional[str] = None) -> CursorPage:
+        """Returns a page pointed at by a given cursor"""
+        keys, backwards = self.decode(cursor) if cursor else (None, False)
+
+        order_by = [
+            f'{"-" if descending ^ backwards else ""}{field}'
+            for field, descending in self.ordering
+        ]
+        queryset = self.queryset.order_by(*order_by)
+        if keys is not None:
+            queryset = queryset.filter(self._filter_after(keys, backwards))
+
+        object_list = self.project(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if backwards:
+            object_list.reverse()
+
+        has_next = has_more if not backwards else True
+        has_previous = has_more if backwards else keys is not None
+        if not object_list:
+            return CursorPage(object_list, None, None)
+
+        return CursorPage(
+            object_list,
+            self.encode(object_list[-1]) if has_next else None,
+            self.encode(object_list[0], True) if has_previous else None,
+        )
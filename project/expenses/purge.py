@@ -0,0 +1,121 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import ProtectedError
+
+from .archive import delete_archived
+from .models import Category, Expense
+
+logger = logging.getLogger(__name__)
+
+# Thread deleting the hidden categories one after another, SQLite
+# has only one writer anyway
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='purge')
+
+
+def _get_options() -> dict:
+    """Returns settings.EXPENSES_CATEGORY_PURGE with the defaults"""
+    return {
+        'BACKGROUND': True,
+        'BATCH_SIZE': 1000,
+        **getattr(settings, 'EXPENSES_CATEGORY_PURGE', {}),
+    }
+
+
+def delete_in_batches(
+        queryset, batch_size: int,
+        on_batch: Optional[Callable[[int], None]] = None
+) -> int:
+    """
+    Deletes expenses of a queryset in batches of primary keys, each one
+    with its rollups in a short transaction, so that the database isn't
+    locked for long, returns number of deleted expenses
+    """
+    deleted = 0
+    while True:
+        pks = list(
+            queryset.order_by().values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return deleted
+
+        Expense.objects.filter(pk__in=pks).delete()
+        deleted += len(pks)
+        if on_batch is not None:
+            on_batch(deleted)
+
+
+def purge_category(
+        category_id: int, batch_size: Optional[int] = None,
+        on_batch: Optional[Callable[[int, int], None]] = None
+) -> int:
+    """
+    Deletes a hidden category after all of its expenses, which are
+    deleted in batches (the archived ones first), on_batch is called
+    with numbers of the deleted and remaining expenses. Returns number
+    of deleted expenses
+    """
+    batch_size = batch_size or _get_options()['BATCH_SIZE']
+    expenses = Expense.objects.filter(category_id=category_id)
+
+    def report(deleted: int) -> None:
+        """Reports progress of the deletion"""
+        remaining = Category.all_objects.filter(pk=category_id).values_list(
+            'expenses_count', flat=True
+        ).first() or 0
+        logger.info(
+            'Category %s: deleted %s expenses, %s remaining',
+            category_id, deleted, remaining,
+        )
+        if on_batch is not None:
+            on_batch(deleted, remaining)
+
+    deleted = delete_archived(category_id, batch_size, report)
+    while True:
+        deleted += delete_in_batches(
+            expenses, batch_size,
+            lambda count: report(deleted + count),
+        )
+        try:
+            with transaction.atomic():
+                Category.all_objects.filter(
+                    pk=category_id, deleting=True
+                ).delete()
+        except ProtectedError:
+            # Expenses were added while the others were deleted
+            continue
+
+        logger.info('Category %s deleted', category_id)
+        return deleted
+
+
+def _purge_in_background(category_id: int) -> None:
+    """Purges a category in the background thread"""
+    try:
+        purge_category(category_id)
+    except Exception:
+        logger.exception(
+            'Category %s could not be deleted, it will be deleted by '
+            'the purge_categories command', category_id
+        )
+    finally:
+        close_old_connections()
+
+
+def delete_category(category: Category) -> None:
+    """
+    Hides a category at once, then deletes its expenses in batches
+    and the category itself, in the background after the current
+    transaction is committed, unless it's disabled in
+    settings.EXPENSES_CATEGORY_PURGE
+    """
+    Category.all_objects.filter(pk=category.pk).hide()
+    if _get_options()['BACKGROUND']:
+        transaction.on_commit(
+            lambda: _executor.submit(_purge_in_background, category.pk)
+        )
+    else:
+        purge_category(category.pk)
@@ -0,0 +1,103 @@
+import logging
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+
+from .routers import (
+    get_replica_options, get_replicas, is_test_mirror, replica_reads,
+)
+
+logger = logging.getLogger(__name__)
+
+# Methods of the requests, which only read the data
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _stream(content: Iterable[bytes], enabled: bool) -> Iterator[bytes]:
+    """
+    Yields chunks of a streamed response, each one produced with
+    the replica reads of the request, after the middleware returned
+    """
+    chunks = iter(content)
+    while True:
+        with replica_reads(enabled):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class ReplicaMiddleware:
+    """
+    Middleware routing the reads of the read-only requests to the replicas
+    with the expenses.routers.ReplicaRouter. A successful write sets
+    a cookie, which keeps the following requests of the client (e.g.
+    the redirect after a POST) on the primary database for
+    settings.EXPENSES_REPLICAS['STICKY_SECONDS'], so that they see
+    the write before the replicas are synced. Without any replica
+    in settings.EXPENSES_REPLICAS['DATABASES'] the middleware is removed
+    """
+
+    def __init__(self, get_response: Callable):
+        options = get_replica_options()
+        if not options['DATABASES']:
+            raise MiddlewareNotUsed('No replicas are configured')
+
+        self.get_response = get_response
+        self.cookie_name = options['COOKIE_NAME']
+        self.sticky_seconds = options['STICKY_SECONDS']
+
+    def __call__(self, request: WSGIRequest) -> HttpResponse:
+        safe = request.method in SAFE_METHODS
+        enabled = safe and self.cookie_name not in request.COOKIES
+        with replica_reads(enabled):
+            response = self.get_response(request)
+
+        if response.streaming:
+            response.streaming_content = _stream(
+                response.streaming_content, enabled
+            )
+        if not safe and response.status_code < 400:
+            response.set_cookie(
+                self.cookie_name, '1', max_age=self.sticky_seconds,
+                httponly=True, samesite='Lax',
+            )
+
+        return response
+
+
+def sync_replica(source, target) -> None:
+    """
+    Copies a primary SQLite database to a replica with the online backup
+    API, which copies a consistent snapshot while the primary is written
+    """
+    if source.vendor != 'sqlite' or target.vendor != 'sqlite':
+        raise ValueError('Only SQLite replicas can be copied')
+
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
+
+
+def sync_replicas(
+        on_replica: Optional[Callable[[str], None]] = None
+) -> List[str]:
+    """
+    Copies the primary database to every replica, other than the test
+    mirrors of it, returns aliases of the copied replicas
+    """
+    synced = []
+    for alias in get_replicas():
+        if is_test_mirror(alias):
+            continue
+
+        sync_replica(connections[DEFAULT_DB_ALIAS], connections[alias])
+        synced.append(alias)
+        logger.info('Replica %s synced', alias)
+        if on_replica is not None:
+            on_replica(alias)
+
+    return synced
@@ -0,0 +1,176 @@
+import abc
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.query import QuerySet
+from django.utils.module_loading import import_string
+
+from .counts import get_cache_key
+from .reports import Report, build_report
+
+logger = logging.getLogger(__name__)
+
+# Backend used when settings.EXPENSES_REPORT_CACHE is not set
+DEFAULT_BACKEND = {
+    'BACKEND': 'expenses.report_cache.LRUReportCache',
+    'OPTIONS': {'max_size': 256},
+}
+
+
+class ReportCache(abc.ABC):
+    """
+    Base of the report caches, which counts hits, misses and evictions,
+    so that the size and timeout of the cache can be tuned
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[Report]:
+        """Returns a cached report or None"""
+
+    @abc.abstractmethod
+    def set(self, key: str, report: Report) -> None:
+        """Caches a report"""
+
+    def clear(self) -> None:
+        """Removes all cached reports and resets the counters"""
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the counters of the cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / total if total else 0.0,
+            }
+
+    def get_or_build(self, key: str,
+                     build: Callable[[], Report]) -> Report:
+        """Returns a cached report, building and caching it on a miss"""
+        report = self.get(key)
+        with self._lock:
+            if report is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Report cache %s: %s', key, self.stats())
+        if report is None:
+            report = build()
+            self.set(key, report)
+
+        return report
+
+
+class LRUReportCache(ReportCache):
+    """
+    Report cache in the memory of the process, which evicts the least
+    recently used reports above a given number of them
+    """
+
+    def __init__(self, max_size: int = 256):
+        super().__init__()
+        self.max_size = max_size
+        self._reports = OrderedDict()
+
+    def get(self, key: str) -> Optional[Report]:
+        """Returns a cached report or None"""
+        with self._lock:
+            report = self._reports.get(key)
+            if report is not None:
+                self._reports.move_to_end(key)
+
+        return report
+
+    def set(self, key: str, report: Report) -> None:
+        """Caches a report, evicting the least recently used ones"""
+        with self._lock:
+            self._reports[key] = report
+            self._reports.move_to_end(key)
+            while len(self._reports) > self.max_size:
+                self._reports.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Removes all cached reports and resets the counters"""
+        with self._lock:
+            self._reports.clear()
+        super().clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the counters and size of the cache"""
+        return {**super().stats(), 'size': len(self._reports)}
+
+
+class DjangoReportCache(ReportCache):
+    """
+    Report cache stored in one of settings.CACHES, shared by all
+    processes using it. Evictions are done by the cache backend
+    (e.g. above its MAX_ENTRIES), so they aren't counted
+    """
+
+    def __init__(self, alias: str = 'default', timeout: int = 60 * 60):
+        super().__init__()
+        self.alias = alias
+        self.timeout = timeout
+
+    def get(self, key: str) -> Optional[Report]:
+        """Returns a cached report or None"""
+        return caches[self.alias].get(key)
+
+    def set(self, key: str, report: Report) -> None:
+        """Caches a report"""
+        caches[self.alias].set(key, report, self.timeout)
+
+    def clear(self) -> None:
+        """Removes the cached reports (the whole cache) and the counters"""
+        caches[self.alias].clear()
+        super().clear()
+
+
+_report_cache = None
+
+
+def get_report_cache() -> ReportCache:
+    """Returns the cache set in settings.EXPENSES_REPORT_CACHE"""
+    global _report_cache
+    if _report_cache is None:
+        config = getattr(settings, 'EXPENSES_REPORT_CACHE', DEFAULT_BACKEND)
+        _report_cache = import_string(config['BACKEND'])(
+            **config.get('OPTIONS', {})
+        )
+
+    return _report_cache
+
+
+def reset_report_cache(**kwargs) -> None:
+    """Drops the cache, so that it's created again with the settings"""
+    global _report_cache
+    if kwargs.get('setting', 'EXPENSES_REPORT_CACHE') in (
+            'EXPENSES_REPORT_CACHE', 'CACHES'
+    ):
+        _report_cache = None
+
+
+def get_report(queryset: QuerySet, params: Dict, version: str) -> Report:
+    """
+    Returns a report of a queryset filtered with given form parameters,
+    cached until the data version changes
+    """
+    key = get_cache_key(queryset.model, params, version, kind='report')
+    return get_report_cache().get_or_build(
+        key, lambda: build_report(queryset, params)
+    )
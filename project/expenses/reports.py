@@ -1,41 +1,188 @@
+import datetime
+import itertools
 from collections import OrderedDict
 from decimal import Decimal
-from typing import Dict
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
 
-from django.db.models import Sum, Value
-from django.db.models.functions import TruncMonth
-from django.db.models.functions import Coalesce
+from django.db.models import Count, Min, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
 from django.db.models.query import QuerySet
 
+from .models import (
+    ArchivedExpense,
+    Category,
+    Expense,
+    ExpenseDailyRollup,
+    ExpenseRollup,
+)
+from .timing import timed
 
-def summary_per_category(queryset) -> OrderedDict:
-    """Summarizes how much money was spend in different categories"""
-    return OrderedDict(sorted(
+
+class Report(NamedTuple):
+    """All summaries of an Expense queryset"""
+    count: int
+    overall: Decimal
+    per_category: OrderedDict
+    per_year_month: OrderedDict
+
+
+def _fold(rows) -> Report:
+    """
+    Returns a report built from rows of
+    (category name, year-month, sum, count)
+    """
+    count = 0
+    overall = Decimal(0)
+    per_category = {}
+    per_year_month = {}
+    for category_name, year_month, amount_sum, amount_count in rows:
+        count += amount_count
+        overall += amount_sum
+        per_category[category_name] = (
+            per_category.get(category_name, 0) + amount_sum
+        )
+        per_year_month[year_month] = (
+            per_year_month.get(year_month, 0) + amount_sum
+        )
+
+    return Report(
+        count=count,
+        overall=overall,
+        per_category=OrderedDict(sorted(per_category.items())),
+        per_year_month=OrderedDict(sorted(per_year_month.items())),
+    )
+
+
+def _is_unfiltered(queryset: QuerySet) -> bool:
+    """Checks if a queryset contains all of the expenses"""
+    query = queryset.query
+    return (
+        queryset.model is Expense
+        and not query.where
+        and query.can_filter()
+        and not query.combinator
+        and not query.distinct
+    )
+
+
+@timed
+def rollup_report(category: Optional[Category] = None) -> Report:
+    """
+    Returns a report of all expenses (or all expenses of a given category)
+    read from the rollups instead of the Expense table
+    """
+    queryset = ExpenseRollup.objects.filter(count__gt=0)
+    if category is not None:
+        queryset = queryset.filter(category=category)
+
+    return _fold(
         queryset
         .annotate(category_name=Coalesce('category__name', Value('-')))
-        .order_by()
-        .values('category_name')
-        .annotate(s=Sum('amount'))
-        .values_list('category_name', 's')
-    ))
+        .values_list('category_name', 'year_month', 'total', 'count')
+    )
 
 
-def summary_per_year_month(queryset) -> OrderedDict:
-    """Summarizes how much money was spent in different months"""
-    return OrderedDict(sorted(
+def _get_date_range(params: Optional[Dict]) -> Optional[Tuple]:
+    """
+    Returns (date from, date to) of the search form parameters, which
+    filter the expenses only by the dates and categories, or None
+    """
+    if not params or (params.get('name') or '').strip():
+        return None
+
+    date = params.get('date')
+    date_from = params.get('date_from')
+    date_to = params.get('date_to')
+    if date:
+        date_from = max(date, date_from) if date_from else date
+        date_to = min(date, date_to) if date_to else date
+    if not date_from and not date_to:
+        return None
+
+    return date_from, date_to
+
+
+@timed
+def daily_report(date_from: Optional[datetime.date] = None,
+                 date_to: Optional[datetime.date] = None,
+                 categories: Optional[Iterable[Category]] = None) -> Report:
+    """
+    Returns a report of the expenses of a date range (and of given
+    categories) read from the daily rollups, a row per day and category,
+    instead of the Expense table
+    """
+    queryset = ExpenseDailyRollup.objects.filter(count__gt=0)
+    if date_from:
+        queryset = queryset.filter(date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(date__lte=date_to)
+    if categories:
+        queryset = queryset.filter(category__in=categories)
+
+    return _fold(
         queryset
+        .order_by()
+        .values('category_id', year_month=TruncMonth('date'))
         .annotate(
-            year_month=TruncMonth('date'),
+            category_name=Coalesce(Min('category__name'), Value('-')),
+            s=Sum('total'),
+            c=Sum('count'),
         )
+        .values_list('category_name', 'year_month', 's', 'c')
+    )
+
+
+@timed
+def build_report(queryset: QuerySet, params: Optional[Dict] = None) -> Report:
+    """
+    Computes all summaries of a given queryset with a single aggregate query
+    grouped by category and month, the remaining totals are folded from
+    its (small) result in Python, combined expenses are grouped in both
+    databases. Unfiltered querysets are read from
+    the rollups, querysets filtered (only) by the dates in given search
+    form parameters from the daily rollups
+    """
+    if _is_unfiltered(queryset):
+        return rollup_report()
+
+    date_range = _get_date_range(params)
+    if date_range is not None:
+        return daily_report(*date_range, params.get('categories'))
+
+    # Grouped by the columns of the (category, year_month, amount) index,
+    # which is read in order, the category name is taken from the group.
+    # The archived expenses have their category names copied
+    return _fold(itertools.chain.from_iterable(
+        part
         .order_by()
-        .values('year_month')
-        .annotate(sum=Sum('amount'))
-        .values_list('year_month', 'sum')
+        .values('category_id', 'year_month')
+        .annotate(
+            label=Coalesce(
+                Min('category_name' if part.model is ArchivedExpense
+                    else 'category__name'),
+                Value('-'),
+            ),
+            s=Sum('amount'),
+            c=Count('pk'),
+        )
+        .values_list('label', 'year_month', 's', 'c')
+        for part in getattr(queryset, 'querysets', [queryset])
     ))
 
 
+@timed
+def summary_per_category(queryset) -> OrderedDict:
+    """Summarizes how much money was spend in different categories"""
+    return build_report(queryset).per_category
+
+
+@timed
+def summary_per_year_month(queryset) -> OrderedDict:
+    """Summarizes how much money was spent in different months"""
+    return build_report(queryset).per_year_month
+
+
+@timed
 def summary_overall(queryset: QuerySet) -> Dict[str, Decimal]:
     """Summarizes how much money was spent"""
-    amount_sum = sum([value[0] for value in queryset.values_list('amount')])
-
-    return {'overall': amount_sum}
+    return {'overall': build_report(queryset).overall}
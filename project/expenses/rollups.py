@@ -0,0 +1,391 @@
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from typing import DefaultDict, Dict, Iterable, List, Optional, Tuple
+
+from django.db import connections, router, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+from django.db.models.query import QuerySet
+
+from .models import (
+    ArchivedExpense, Category, DataVersion, Expense, ExpenseDailyRollup,
+    ExpenseRollup,
+)
+
+# Fields of the Expense model, which the rollups depend on
+TRACKED_FIELDS = frozenset(('amount', 'category', 'category_id', 'date'))
+
+# Number of expenses handled at once by the batched operations
+BATCH_SIZE = 500
+
+# Key of the changes and the rollups: (category_id, date or year_month)
+Key = Tuple[Optional[int], datetime.date]
+
+# Changes of the expenses, keyed by (category_id, date)
+Changes = DefaultDict[Key, List]
+
+# Upserts of the daily rollups, used on the databases supporting them
+UPSERT_VENDORS = frozenset(('sqlite', 'postgresql'))
+
+
+def _empty_changes() -> Changes:
+    """Returns an empty mapping of changes"""
+    return defaultdict(lambda: [Decimal(0), 0])
+
+
+def collect_queryset(queryset: QuerySet) -> Changes:
+    """Returns totals of a given queryset, grouped by category and date"""
+    changes = _empty_changes()
+    rows = (
+        queryset
+        .order_by()
+        .values('category_id', 'date')
+        .annotate(s=Sum('amount'), c=Count('pk'))
+        .values_list('category_id', 'date', 's', 'c')
+    )
+    for category_id, date, amount_sum, amount_count in rows:
+        changes[category_id, date][0] += amount_sum
+        changes[category_id, date][1] += amount_count
+
+    return changes
+
+
+def collect_objects(objs: Iterable[Expense]) -> Changes:
+    """Returns totals of given expenses, grouped by category and date"""
+    amount_field = Expense._meta.get_field('amount')
+    date_field = Expense._meta.get_field('date')
+
+    changes = _empty_changes()
+    for obj in objs:
+        key = obj.category_id, date_field.to_python(obj.date)
+        amount = amount_field.to_python(obj.amount)
+        changes[key][0] += amount.quantize(Decimal('0.01'))
+        changes[key][1] += 1
+
+    return changes
+
+
+def _per_day(
+        removed: Optional[Changes], added: Optional[Changes]
+) -> Dict[Key, List]:
+    """Returns difference between added and removed totals per day"""
+    result = _empty_changes()
+    for sign, changes in ((-1, removed), (1, added)):
+        for key, (amount_sum, amount_count) in (changes or {}).items():
+            result[key][0] += sign * amount_sum
+            result[key][1] += sign * amount_count
+
+    return {
+        key: value for key, value in result.items() if any(value)
+    }
+
+
+def _per_year_month(daily: Dict[Key, List]) -> Dict[Key, List]:
+    """Returns daily differences of the totals summed per month"""
+    result = _empty_changes()
+    for (category_id, date), (amount_sum, amount_count) in daily.items():
+        key = category_id, date.replace(day=1)
+        result[key][0] += amount_sum
+        result[key][1] += amount_count
+
+    return {
+        key: value for key, value in result.items() if any(value)
+    }
+
+
+def _per_category(deltas: Dict[Key, List]) -> Dict[int, int]:
+    """Returns difference in number of expenses per category"""
+    result = defaultdict(int)
+    for (category_id, _), (_, count) in deltas.items():
+        if category_id is not None:
+            result[category_id] += count
+
+    return {key: value for key, value in result.items() if value}
+
+
+def _upsert_daily(connection, daily: Dict[Key, List]) -> None:
+    """
+    Adds differences to the daily rollups with INSERT ... ON CONFLICT,
+    executed once for many days, separately for the expenses without
+    a category, whose rows are unique by another (partial) index
+    """
+    quote = connection.ops.quote_name
+    table = quote(ExpenseDailyRollup._meta.db_table)
+    category, date = quote('category_id'), quote('date')
+    total, count = quote('total'), quote('count')
+    sql = (
+        f'INSERT INTO {table} ({category}, {date}, {total}, {count}) '
+        f'VALUES (%s, %s, %s, %s) ON CONFLICT {{target}} DO UPDATE SET '
+        f'{total} = {table}.{total} + excluded.{total}, '
+        f'{count} = {table}.{count} + excluded.{count}'
+    )
+    targets = {
+        True: f'({date}, {category})',
+        False: f'({date}) WHERE {category} IS NULL',
+    }
+    date_field = ExpenseDailyRollup._meta.get_field('date')
+    with connection.cursor() as cursor:
+        for categorized, target in targets.items():
+            rows = [
+                (category_id, date_field.get_db_prep_value(day, connection),
+                 amount_sum, amount_count)
+                for (category_id, day), (amount_sum, amount_count)
+                in daily.items()
+                if (category_id is not None) == categorized
+            ]
+            if rows:
+                cursor.executemany(sql.format(target=target), rows)
+
+
+def _update_daily(daily: Dict[Key, List]) -> None:
+    """Adds differences to the daily rollups one day at a time"""
+    for (category_id, date), (total, count) in daily.items():
+        updated = ExpenseDailyRollup.objects.filter(
+            category_id=category_id, date=date
+        ).update(total=F('total') + total, count=F('count') + count)
+        if not updated:
+            ExpenseDailyRollup.objects.create(
+                category_id=category_id, date=date, total=total, count=count,
+            )
+
+
+def apply_changes(
+        removed: Optional[Changes] = None, added: Optional[Changes] = None
+) -> None:
+    """
+    Applies removed and added expenses to the monthly and daily rollups
+    and the categories expenses counters
+    """
+    daily = _per_day(removed, added)
+    if not daily:
+        return
+
+    deltas = _per_year_month(daily)
+    with transaction.atomic():
+        for category_id, count in _per_category(deltas).items():
+            Category._base_manager.filter(pk=category_id).update(
+                expenses_count=F('expenses_count') + count
+            )
+
+        for (category_id, year_month), (total, count) in deltas.items():
+            updated = ExpenseRollup.objects.filter(
+                category_id=category_id, year_month=year_month
+            ).update(total=F('total') + total, count=F('count') + count)
+            if not updated:
+                ExpenseRollup.objects.create(
+                    category_id=category_id, year_month=year_month,
+                    total=total, count=count,
+                )
+
+        connection = connections[router.db_for_write(ExpenseDailyRollup)]
+        if connection.vendor in UPSERT_VENDORS:
+            _upsert_daily(connection, daily)
+        else:
+            _update_daily(daily)
+
+        if any(count < 0 for _, count in deltas.values()):
+            ExpenseRollup.objects.filter(count__lte=0).delete()
+        removed_days = [
+            date for (_, date), (_, count) in daily.items() if count < 0
+        ]
+        if removed_days:
+            # Bounded by the dates, so that the index is used
+            ExpenseDailyRollup.objects.filter(
+                date__gte=min(removed_days), date__lte=max(removed_days),
+                count__lte=0,
+            ).delete()
+
+
+def _get_expense_querysets() -> List[QuerySet]:
+    """
+    Returns the expenses summarized by the rollups: in the default
+    database and in the archive one, if any of them are archived
+    """
+    querysets = [Expense.objects.all()]
+    if DataVersion.get().archived_before is not None:
+        querysets.append(ArchivedExpense.objects.all())
+
+    return querysets
+
+
+def _expected_rollups(period: str = 'year_month') -> Dict[Key, Tuple]:
+    """
+    Returns rollups computed from the Expense table (and the archived
+    expenses), per year-month or per date
+    """
+    expected = _empty_changes()
+    for queryset in _get_expense_querysets():
+        rows = (
+            queryset
+            .order_by()
+            .values('category_id', period)
+            .annotate(s=Sum('amount'), c=Count('pk'))
+            .values_list('category_id', period, 's', 'c')
+        )
+        for category_id, day, amount_sum, amount_count in rows:
+            expected[category_id, day][0] += amount_sum
+            expected[category_id, day][1] += amount_count
+
+    return {key: tuple(value) for key, value in expected.items()}
+
+
+def _count_archived() -> Dict[int, int]:
+    """Returns numbers of the archived expenses of the categories"""
+    if DataVersion.get().archived_before is None:
+        return {}
+
+    return dict(
+        ArchivedExpense.objects
+        .exclude(category_id=None)
+        .order_by()
+        .values('category_id')
+        .annotate(c=Count('pk'))
+        .values_list('category_id', 'c')
+    )
+
+
+def _get_stale_year_months() -> QuerySet:
+    """Returns expenses with year-months not matching their dates"""
+    return Expense._base_manager.exclude(year_month=TruncMonth('date'))
+
+
+def _get_category_name() -> Subquery:
+    """Returns expression of the name of the category of an expense"""
+    return Subquery(
+        Category.all_objects.filter(pk=OuterRef('category_id')).values('name')
+    )
+
+
+def _get_stale_category_names() -> QuerySet:
+    """Returns expenses with copies of names not matching their categories"""
+    return (
+        Expense._base_manager
+        .filter(
+            ~Q(category_name=_get_category_name())
+            | Q(category_id=None, category_name__isnull=False)
+        )
+        .exclude(category_id=None, category_name=None)
+    )
+
+
+def rebuild() -> int:
+    """
+    Rebuilds the year-months and the category names of the expenses,
+    the monthly and daily rollups and the categories expenses counters
+    from the Expense table and the archived expenses, returns number
+    of the monthly rollups
+    """
+    with transaction.atomic():
+        _get_stale_year_months().update(year_month=TruncMonth('date'))
+        _get_stale_category_names().update(
+            category_name=_get_category_name()
+        )
+        expected = _expected_rollups()
+        Category._base_manager.update(
+            expenses_count=Coalesce(Subquery(
+                Expense.objects
+                .filter(category=OuterRef('pk'))
+                .order_by()
+                .values('category')
+                .annotate(c=Count('pk'))
+                .values('c')
+            ), 0)
+        )
+        for category_id, count in _count_archived().items():
+            Category._base_manager.filter(pk=category_id).update(
+                expenses_count=F('expenses_count') + count
+            )
+        ExpenseRollup.objects.all().delete()
+        ExpenseRollup.objects.bulk_create(
+            [
+                ExpenseRollup(
+                    category_id=category_id, year_month=year_month,
+                    total=total, count=count,
+                )
+                for (category_id, year_month), (total, count)
+                in expected.items()
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        ExpenseDailyRollup.objects.all().delete()
+        ExpenseDailyRollup.objects.bulk_create(
+            [
+                ExpenseDailyRollup(
+                    category_id=category_id, date=date,
+                    total=total, count=count,
+                )
+                for (category_id, date), (total, count)
+                in _expected_rollups('date').items()
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        DataVersion.bump()
+
+    return len(expected)
+
+
+def _compare(expected: Dict[Key, Tuple], actual: Dict[Key, Tuple],
+             date_format: str) -> List[str]:
+    """Returns differences between expected and actual rollups"""
+    errors = []
+    for key in sorted(
+            set(expected) | set(actual), key=lambda k: (k[0] or 0, k[1])
+    ):
+        if expected.get(key) != actual.get(key):
+            category_id, date = key
+            errors.append(
+                f'category {category_id}, {date:{date_format}}: '
+                f'expected {expected.get(key)}, found {actual.get(key)}'
+            )
+
+    return errors
+
+
+def verify() -> List[str]:
+    """
+    Returns differences between the rollups (or the categories expenses
+    counters, or the year-months and the category names of the expenses)
+    and the Expense table with the archived expenses
+    """
+    errors = [
+        f'expense {pk}: expected year-month {date:%Y-%m}, '
+        f'found {year_month:%Y-%m}'
+        for pk, date, year_month in _get_stale_year_months().values_list(
+            'pk', 'date', 'year_month'
+        )
+    ]
+    errors += [
+        f'expense {pk}: expected category name {expected!r}, '
+        f'found {category_name!r}'
+        for pk, expected, category_name in (
+            _get_stale_category_names()
+            .annotate(expected=_get_category_name())
+            .values_list('pk', 'expected', 'category_name')
+        )
+    ]
+    archived = _count_archived()
+    errors += [
+        f'category {category_id}: '
+        f'expected {expenses_amount + archived.get(category_id, 0)} '
+        f'expenses, found {expenses_count}'
+        for category_id, expenses_count, expenses_amount in (
+            Category.all_objects
+            .with_expenses_amount()
+            .values_list('pk', 'expenses_count', 'expenses_amount')
+        )
+        if expenses_count != expenses_amount + archived.get(category_id, 0)
+    ]
+    for model, period, date_format in (
+            (ExpenseRollup, 'year_month', '%Y-%m'),
+            (ExpenseDailyRollup, 'date', '%Y-%m-%d'),
+    ):
+        actual = {
+            (category_id, day): (total, count)
+            for category_id, day, total, count in model.objects.values_list(
+                'category_id', period, 'total', 'count'
+            )
+        }
+        errors += _compare(_expected_rollups(period), actual, date_format)
+
+    return errors
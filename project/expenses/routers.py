@@ -0,0 +1,151 @@
+import contextvars
+import random
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Name of the model stored in the archive database
+ARCHIVE_MODEL = 'archivedexpense'
+
+# Whether the reads of the current request may go to the replicas,
+# set by the expenses.replicas.ReplicaMiddleware
+_replica_reads = contextvars.ContextVar(
+    'expenses_replica_reads', default=False
+)
+
+
+def get_archive_options() -> dict:
+    """Returns settings.EXPENSES_ARCHIVE with the defaults"""
+    return {
+        'DATABASE': 'archive',
+        'AGE_DAYS': 2 * 365,
+        'BATCH_SIZE': 1000,
+        **getattr(settings, 'EXPENSES_ARCHIVE', {}),
+    }
+
+
+def get_archive_database() -> str:
+    """Returns alias of the database with the archived expenses"""
+    return get_archive_options()['DATABASE']
+
+
+class ArchiveRouter:
+    """
+    Database router, which stores the archived expenses in the archive
+    database (settings.EXPENSES_ARCHIVE['DATABASE']) and nothing else
+    there, other models stay in the default database
+    """
+
+    @staticmethod
+    def _is_archived(model) -> bool:
+        """Checks if a model is stored in the archive database"""
+        return (
+            model._meta.app_label == 'expenses'
+            and model._meta.model_name == ARCHIVE_MODEL
+        )
+
+    def db_for_read(self, model, **hints):
+        """Returns the archive database for the archived expenses"""
+        if self._is_archived(model):
+            return get_archive_database()
+        return None
+
+    def db_for_write(self, model, **hints):
+        """Returns the archive database for the archived expenses"""
+        return self.db_for_read(model, **hints)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """
+        Creates the archived expenses only in the archive database,
+        which doesn't get the other models (or the data migrations)
+        """
+        archived = app_label == 'expenses' and model_name == ARCHIVE_MODEL
+        if db == get_archive_database():
+            return archived
+        if archived:
+            return False
+        return None
+
+
+def get_replica_options() -> dict:
+    """Returns settings.EXPENSES_REPLICAS with the defaults"""
+    return {
+        'DATABASES': [],
+        'STICKY_SECONDS': 10,
+        'COOKIE_NAME': 'expenses_primary',
+        **getattr(settings, 'EXPENSES_REPLICAS', {}),
+    }
+
+
+def get_replicas() -> List[str]:
+    """Returns aliases of the replica databases"""
+    return list(get_replica_options()['DATABASES'])
+
+
+def is_test_mirror(alias: str) -> bool:
+    """
+    Checks if a database is set up as a test mirror of the primary one,
+    which points at the same (test) database
+    """
+    return (
+        connections[alias].settings_dict['NAME']
+        == connections[DEFAULT_DB_ALIAS].settings_dict['NAME']
+    )
+
+
+@contextmanager
+def replica_reads(enabled: bool = True) -> Iterator[None]:
+    """Routes the reads of the current context to the replicas (or not)"""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def reads_replicas() -> bool:
+    """Checks if the reads of the current context go to the replicas"""
+    return _replica_reads.get()
+
+
+class ReplicaRouter:
+    """
+    Database router, which sends the reads of the read-only requests
+    to a random replica (settings.EXPENSES_REPLICAS['DATABASES']) and
+    all writes, and the reads of the other requests, to the primary
+    database. A test mirror of the primary is read through the primary's
+    connection, which sees the writes of the test's transaction
+    """
+
+    def db_for_read(self, model, **hints):
+        """Returns a replica when the current context reads replicas"""
+        replicas = get_replicas()
+        if not replicas or not _replica_reads.get():
+            return None
+
+        alias = random.choice(replicas)
+        if is_test_mirror(alias):
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        """
+        Returns the primary database, also for the objects read
+        from a replica
+        """
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Allows relations of objects of the primary and the replicas"""
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Doesn't migrate the replicas, which are copies of the primary"""
+        if db in get_replicas():
+            return False
+        return None
@@ -0,0 +1,59 @@
+import datetime
+from decimal import Decimal
+from typing import Iterator, List, NamedTuple, Optional
+
+from django.db.models.query import QuerySet
+
+
+# Fields of the Expense model fetched into the rows
+FIELDS = ('id', 'name', 'amount', 'date', 'category_id', 'category_name')
+
+
+class ExpenseRow(NamedTuple):
+    """
+    Row of the expenses list, with only the columns it renders,
+    archived expenses can't be edited
+    """
+    id: int
+    name: str
+    amount: Decimal
+    date: datetime.date
+    category_id: Optional[int]
+    category_name: Optional[str]
+    archived: bool = False
+
+    @property
+    def pk(self) -> int:
+        """Returns primary key of the expense"""
+        return self.id
+
+
+def project_expenses(queryset: QuerySet,
+                     archived: bool = False) -> List[ExpenseRow]:
+    """
+    Returns rows of a queryset of expenses, fetched together with names
+    of their categories with a single query. Slices of the expenses
+    combined with the archived ones are already rows
+    """
+    if not isinstance(queryset, QuerySet):
+        return list(queryset)
+
+    return [
+        ExpenseRow(*values, archived)
+        for values in queryset.values_list(*FIELDS)
+    ]
+
+
+def iter_expenses(queryset: QuerySet, chunk_size: int = 2000,
+                  archived: bool = False) -> Iterator[ExpenseRow]:
+    """
+    Yields rows of a queryset of expenses, fetched from the database
+    in chunks, so that they are never all held in memory
+    """
+    if not isinstance(queryset, QuerySet):
+        yield from queryset
+        return
+
+    values = queryset.values_list(*FIELDS)
+    for row in values.iterator(chunk_size=chunk_size):
+        yield ExpenseRow(*row, archived)
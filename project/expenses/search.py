@@ -0,0 +1,140 @@
+from django.conf import settings
+from django.db import connections, router
+from django.db.models.expressions import RawSQL
+from django.db.models.query import QuerySet
+from django.utils.module_loading import import_string
+
+from .models import Category, Expense
+
+# Models with searchable names, the trigram index of each of them
+# is stored in the "<table>_fts" FTS5 table
+SEARCHABLE_MODELS = (Expense, Category)
+
+
+class IContainsSearchBackend:
+    """Search backend, which filters names with LIKE '%term%'"""
+
+    def filter(self, queryset: QuerySet, term: str) -> QuerySet:
+        """Returns objects of a queryset with names containing a term"""
+        return queryset.filter(name__icontains=term)
+
+    def install(self, connection) -> None:
+        """Prepares a database for the search"""
+
+    def rebuild(self, connection) -> None:
+        """Rebuilds the search index"""
+
+
+class SQLiteTrigramSearchBackend(IContainsSearchBackend):
+    """
+    Search backend, which looks up names in SQLite FTS5 tables
+    with the trigram tokenizer, kept in sync by triggers. It finds
+    the same substrings as LIKE '%term%', but through an index.
+    Terms shorter than three characters, which have no trigrams,
+    and other databases fall back to LIKE
+    """
+
+    @staticmethod
+    def _get_table(model) -> str:
+        """Returns name of the FTS5 table of a given model"""
+        return f'{model._meta.db_table}_fts'
+
+    def filter(self, queryset: QuerySet, term: str) -> QuerySet:
+        """Returns objects of a queryset with names containing a term"""
+        if (
+                len(term) < 3
+                or queryset.model not in SEARCHABLE_MODELS
+                or connections[queryset.db].vendor != 'sqlite'
+        ):
+            return super().filter(queryset, term)
+
+        table = self._get_table(queryset.model)
+        phrase = '"' + term.replace('"', '""') + '"'
+
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [phrase]
+        ))
+
+    def install(self, connection) -> None:
+        """
+        Creates missing FTS5 tables and triggers, which are dropped
+        by the migrations remaking a table, and rebuilds their index,
+        in a database the models are migrated in
+        """
+        if connection.vendor != 'sqlite':
+            return
+
+        with connection.cursor() as cursor:
+            for model in SEARCHABLE_MODELS:
+                if not router.allow_migrate_model(connection.alias, model):
+                    continue
+                table = model._meta.db_table
+                fts = self._get_table(model)
+                names = [fts] + [
+                    f'{fts}_{event}'
+                    for event in ('insert', 'delete', 'update')
+                ]
+                cursor.execute(
+                    'SELECT count(*) FROM sqlite_master WHERE name IN '
+                    '(%s, %s, %s, %s)', names,
+                )
+                if cursor.fetchone()[0] == len(names):
+                    continue
+
+                cursor.execute(
+                    f'CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5('
+                    f"name, content='{table}', content_rowid='id', "
+                    f"tokenize='trigram')"
+                )
+                cursor.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS {fts}_insert '
+                    f'AFTER INSERT ON {table} BEGIN '
+                    f'INSERT INTO {fts}(rowid, name) '
+                    f'VALUES (new.id, new.name); END'
+                )
+                cursor.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS {fts}_delete '
+                    f'AFTER DELETE ON {table} BEGIN '
+                    f'INSERT INTO {fts}({fts}, rowid, name) '
+                    f"VALUES ('delete', old.id, old.name); END"
+                )
+                cursor.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS {fts}_update '
+                    f'AFTER UPDATE OF name ON {table} BEGIN '
+                    f'INSERT INTO {fts}({fts}, rowid, name) '
+                    f"VALUES ('delete', old.id, old.name); "
+                    f'INSERT INTO {fts}(rowid, name) '
+                    f'VALUES (new.id, new.name); END'
+                )
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def rebuild(self, connection) -> None:
+        """Rebuilds the FTS5 indexes from the tables"""
+        if connection.vendor != 'sqlite':
+            return
+
+        self.install(connection)
+        with connection.cursor() as cursor:
+            for model in SEARCHABLE_MODELS:
+                if not router.allow_migrate_model(connection.alias, model):
+                    continue
+                fts = self._get_table(model)
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def get_search_backend() -> IContainsSearchBackend:
+    """Returns the backend set in settings.EXPENSES_SEARCH_BACKEND"""
+    return import_string(getattr(
+        settings, 'EXPENSES_SEARCH_BACKEND',
+        'expenses.search.SQLiteTrigramSearchBackend'
+    ))()
+
+
+def search(queryset: QuerySet, term: str) -> QuerySet:
+    """Returns objects of a queryset with names containing a given term"""
+    return get_search_backend().filter(queryset, term)
+
+
+def install_search(using: str = 'default', **kwargs) -> None:
+    """Prepares a database for the search, called after the migrations"""
+    get_search_backend().install(connections[using])
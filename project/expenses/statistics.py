@@ -0,0 +1,212 @@
+import datetime
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import CharField, F, IntegerField, Value
+from django.db.models.functions import Cast, Coalesce, Round
+from django.db.models.query import QuerySet
+
+from .counts import CACHE_TIMEOUT, get_cache_key
+from .models import Category
+from .timing import timed
+
+# Number of rows fetched from the database at once
+CHUNK_SIZE = 10000
+
+# Percentiles of the amounts of every group, by their names
+PERCENTILES = {'median': 50, 'p90': 90, 'p99': 99}
+
+# Number of the bins of the histograms, which share their edges
+BINS = 10
+
+CENT = Decimal('0.01')
+
+
+class Columns(NamedTuple):
+    """
+    Columns of an Expense queryset: amounts in cents, ids of the categories
+    (0 for the expenses without a category) and months since 1970-01
+    """
+    amounts: np.ndarray
+    categories: np.ndarray
+    months: np.ndarray
+
+
+class Statistics(NamedTuple):
+    """
+    Distribution of the amounts of an Expense queryset: number, percentiles
+    and histogram of the amounts, overall, per category (by the names,
+    the expenses without a category are apart, so that they aren't mixed
+    up with a category of any name) and per month
+    """
+    count: int
+    edges: List[Decimal]
+    overall: Dict
+    per_category: OrderedDict
+    uncategorized: Optional[Dict]
+    per_year_month: OrderedDict
+
+
+def read_columns(queryset: QuerySet,
+                 chunk_size: int = CHUNK_SIZE) -> Columns:
+    """
+    Streams the columns of a queryset into NumPy arrays, a chunk of rows
+    at a time. The database converts the amounts to cents and the months
+    to text, which NumPy parses, so the rows skip the model field
+    converters
+    """
+    queryset = queryset.order_by().annotate(
+        cents=Cast(Round(F('amount') * 100), IntegerField()),
+        category_key=Coalesce('category_id', Value(0)),
+        month=Cast('year_month', CharField()),
+    ).values_list('cents', 'category_key', 'month')
+
+    chunks = []
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        sql = None
+
+    if sql is not None:
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                amounts, categories, months = zip(*rows)
+                chunks.append((
+                    np.array(amounts, dtype=np.int64),
+                    np.array(categories, dtype=np.int64),
+                    np.array(months, dtype='datetime64[D]')
+                    .astype('datetime64[M]').astype(np.int64),
+                ))
+
+    if not chunks:
+        return Columns(*(np.empty(0, dtype=np.int64) for _ in range(3)))
+
+    return Columns(*(np.concatenate(column) for column in zip(*chunks)))
+
+
+def _describe_groups(amounts: np.ndarray, keys: np.ndarray,
+                     edges: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Returns the unique keys and, for each of them, number, percentiles
+    (linearly interpolated, as numpy.percentile) and histogram of
+    the amounts, computed for all keys at once on the amounts sorted
+    by their keys
+    """
+    unique, inverse = np.unique(keys, return_inverse=True)
+    inverse = inverse.ravel()
+    sorted_amounts = amounts[np.lexsort((amounts, inverse))]
+    counts = np.bincount(inverse, minlength=len(unique))
+    starts = np.cumsum(counts) - counts
+
+    fractions = np.array(list(PERCENTILES.values())) / 100
+    positions = starts[:, None] + (counts[:, None] - 1) * fractions
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.ceil(positions).astype(np.int64)
+    percentiles = sorted_amounts[lower] + (
+        sorted_amounts[upper] - sorted_amounts[lower]
+    ) * (positions - lower)
+
+    # The last bin includes its right edge, as in numpy.histogram
+    bins = len(edges) - 1
+    indexes = np.clip(
+        np.searchsorted(edges, amounts, side='right') - 1, 0, bins - 1
+    )
+    histograms = np.bincount(
+        inverse * bins + indexes, minlength=len(unique) * bins
+    ).reshape(len(unique), bins)
+
+    return unique, counts, percentiles, histograms
+
+
+def _to_amount(cents: float) -> Decimal:
+    """Returns an amount in cents as Decimal rounded to cents"""
+    return (Decimal(float(cents)) / 100).quantize(CENT)
+
+
+def _summarize(amounts: np.ndarray, keys: np.ndarray,
+               edges: np.ndarray) -> Dict[int, Dict]:
+    """Returns the distributions of the amounts of every key"""
+    unique, counts, percentiles, histograms = _describe_groups(
+        amounts, keys, edges
+    )
+    return {
+        int(key): {
+            'count': int(count),
+            **{name: _to_amount(value)
+               for name, value in zip(PERCENTILES, values)},
+            'histogram': histogram.tolist(),
+        }
+        for key, count, values, histogram
+        in zip(unique, counts, percentiles, histograms)
+    }
+
+
+@timed
+def build_statistics(queryset: QuerySet) -> Statistics:
+    """
+    Computes the distributions of the amounts of a given queryset
+    (or of the querysets of combined expenses) with vectorized NumPy
+    operations on its columns
+    """
+    parts = [
+        read_columns(part)
+        for part in getattr(queryset, 'querysets', [queryset])
+    ]
+    columns = Columns(*(np.concatenate(column) for column in zip(*parts)))
+    if not len(columns.amounts):
+        return Statistics(0, [], {}, OrderedDict(), None, OrderedDict())
+
+    amounts = columns.amounts
+    edges = np.histogram_bin_edges(amounts, bins=BINS)
+    overall = _summarize(amounts, np.zeros_like(amounts), edges)[0]
+
+    per_category = _summarize(amounts, columns.categories, edges)
+    uncategorized = per_category.pop(0, None)
+    names = dict(
+        Category.all_objects
+        .filter(pk__in=list(per_category))
+        .values_list('pk', 'name')
+    )
+
+    per_year_month = _summarize(amounts, columns.months, edges)
+
+    return Statistics(
+        count=overall['count'],
+        edges=[_to_amount(edge) for edge in edges],
+        overall=overall,
+        per_category=OrderedDict(sorted(
+            # A category deleted in the meantime is left out
+            ((names[key], value) for key, value in per_category.items()
+             if key in names),
+            key=lambda item: item[0],
+        )),
+        uncategorized=uncategorized,
+        per_year_month=OrderedDict(
+            (datetime.date(1970 + key // 12, key % 12 + 1, 1), value)
+            for key, value in sorted(per_year_month.items())
+        ),
+    )
+
+
+def get_statistics(queryset: QuerySet, params: Dict,
+                   version: str) -> Statistics:
+    """
+    Returns statistics of a queryset filtered with given form parameters,
+    cached until the data version changes
+    """
+    key = get_cache_key(queryset.model, params, version, kind='statistics')
+    statistics = cache.get(key)
+    if statistics is None:
+        statistics = build_statistics(queryset)
+        cache.set(key, statistics, CACHE_TIMEOUT)
+
+    return statistics
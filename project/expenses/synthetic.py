@@ -0,0 +1,131 @@
+import datetime
+import itertools
+import random
+from decimal import Decimal
+from typing import Callable, Iterator, List, Optional
+
+from .models import Category, Expense
+
+# Names of the generated expenses, the first ones are the most common
+NAMES = (
+    'coffee', 'groceries', 'lunch', 'bus ticket', 'fuel', 'dinner',
+    'snacks', 'taxi', 'pharmacy', 'books', 'cinema', 'phone bill',
+    'internet', 'electricity', 'rent', 'gym', 'haircut', 'shoes',
+    'jacket', 'gift', 'concert', 'train ticket', 'hotel', 'flight',
+    'furniture', 'laptop', 'repair', 'insurance', 'dentist', 'charity',
+)
+
+# Names of the generated categories, numbered when more are needed
+CATEGORY_NAMES = (
+    'food', 'transport', 'home', 'bills', 'health', 'entertainment',
+    'clothes', 'travel', 'education', 'gifts', 'electronics', 'sport',
+)
+
+# Largest amount, which fits in Expense.amount
+MAX_AMOUNT = Decimal('999999.99')
+
+
+def _zipf_weights(n: int, skew: float) -> List[float]:
+    """Returns weights of n items, the k-th one proportional to 1/k^skew"""
+    return [1 / rank ** skew for rank in range(1, n + 1)]
+
+
+class ExpenseGenerator:
+    """
+    Generates realistic expenses: a few categories and names are much more
+    common than the rest (Zipf distribution), amounts are log-normal
+    (mostly small, with a long tail) and dates are spread over a given
+    number of days, with more expenses on the weekends
+    """
+
+    def __init__(self, categories: int = 12, days: int = 3 * 365,
+                 end: Optional[datetime.date] = None, skew: float = 1.1,
+                 uncategorized: float = 0.02, seed: Optional[int] = None):
+        self.categories = categories
+        self.days = days
+        self.end = end or datetime.date.today()
+        self.skew = skew
+        self.uncategorized = uncategorized
+        self.random = random.Random(seed)
+
+    def get_category_names(self) -> List[str]:
+        """Returns names of the generated categories"""
+        names = list(CATEGORY_NAMES[:self.categories])
+        names += [
+            f'category {i}'
+            for i in range(len(names) + 1, self.categories + 1)
+        ]
+
+        return names
+
+    def create_categories(self) -> List[int]:
+        """Creates the missing categories and returns their ids"""
+        names = self.get_category_names()
+        existing = set(
+            Category.objects.filter(name__in=names)
+            .values_list('name', flat=True)
+        )
+        Category.objects.bulk_create(
+            Category(name=name) for name in names if name not in existing
+        )
+        ids = dict(
+            Category.objects.filter(name__in=names).values_list('name', 'pk')
+        )
+
+        return [ids[name] for name in names]
+
+    def _get_date(self) -> datetime.date:
+        """Returns a random date, weekends are twice as likely"""
+        while True:
+            date = self.end - datetime.timedelta(
+                days=self.random.randrange(self.days)
+            )
+            if date.weekday() >= 5 or self.random.random() < 0.5:
+                return date
+
+    def _get_amount(self) -> Decimal:
+        """Returns a random, log-normally distributed amount"""
+        amount = Decimal(self.random.lognormvariate(3, 1.2)).quantize(
+            Decimal('0.01')
+        )
+        return min(max(amount, Decimal('0.01')), MAX_AMOUNT)
+
+    def expenses(self, category_ids: List[int]) -> Iterator[Expense]:
+        """Yields an endless stream of expenses of given categories"""
+        category_weights = list(itertools.accumulate(
+            _zipf_weights(len(category_ids), self.skew)
+        ))
+        name_weights = list(itertools.accumulate(
+            _zipf_weights(len(NAMES), self.skew)
+        ))
+        while True:
+            category_id = None
+            if category_ids and self.random.random() >= self.uncategorized:
+                category_id = self.random.choices(
+                    category_ids, cum_weights=category_weights
+                )[0]
+            yield Expense(
+                category_id=category_id,
+                name=self.random.choices(NAMES, cum_weights=name_weights)[0],
+                amount=self._get_amount(),
+                date=self._get_date(),
+            )
+
+    def generate(self, count: int, batch_size: int = 20000,
+                 on_batch: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Creates a given number of expenses with bulk_create in batches,
+        returns number of created expenses
+        """
+        stream = self.expenses(self.create_categories())
+        created = 0
+        while created < count:
+            batch = list(itertools.islice(
+                stream, min(batch_size, count - created)
+            ))
+            Expense.objects.bulk_create(batch)
+            created += len(batch)
+            if on_batch is not None:
+                on_batch(created)
+
+        return created
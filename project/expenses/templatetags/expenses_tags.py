@@ -0,0 +1,11 @@
+from django import template
+
+from ..utils import PkUrl
+
+register = template.Library()
+
+
+@register.filter
+def with_pk(url: PkUrl, pk) -> str:
+    """Returns URL of an object with a given primary key"""
+    return url.format(pk)
@@ -0,0 +1,233 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .utils import create_test_expenses, get_category
+from ..models import Category, Expense, ExpenseQuerySet
+from ..report_cache import get_report_cache
+from ..rollups import verify
+
+
+def get_report_url(summary: str) -> str:
+    """Returns url of a given summary of the expenses"""
+    return reverse('expenses:expense-report', kwargs={'summary': summary})
+
+
+class ExpenseReportViewTestCase(TestCase):
+    """Tests for ExpenseReportView"""
+
+    def setUp(self) -> None:
+        """Set up for the ExpenseReportView tests"""
+        create_test_expenses()
+        get_report_cache().clear()
+        cache.clear()
+
+    def test_get_per_category(self) -> None:
+        """Tests if the summary per category is returned as JSON"""
+        response = self.client.get(get_report_url('per-category'))
+        self.assertEqual(
+            response.json(), {'necessary': '100.15', 'unnecessary': '50.40'}
+        )
+
+    def test_get_per_year_month_filtered(self) -> None:
+        """Tests if the summaries are filtered as the expenses list"""
+        payload = {'categories': get_category('unnecessary').pk}
+        response = self.client.get(get_report_url('per-year-month'), payload)
+        self.assertEqual(response.json(), {'2020-05': '50.40'})
+
+    def test_get_overall(self) -> None:
+        """Tests if the overall summary is returned as JSON"""
+        response = self.client.get(get_report_url('overall'))
+        self.assertEqual(response.json(), {'overall': '150.55'})
+
+    def test_get_statistics_filtered(self) -> None:
+        """Tests if the statistics of the filtered expenses are returned"""
+        payload = {'categories': get_category('necessary').pk}
+        data = self.client.get(get_report_url('statistics'), payload).json()
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(list(data['per_category']), ['necessary'])
+        self.assertIsNone(data['uncategorized'])
+        self.assertEqual(data['per_year_month']['2020-05']['median'], '100.15')
+        self.assertEqual(sum(data['overall']['histogram']), 1)
+
+    def test_get_unknown_summary(self) -> None:
+        """Tests if an unknown summary isn't found"""
+        response = self.client.get(get_report_url('per-day'))
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_invalid_filters(self) -> None:
+        """Tests if invalid filters are rejected with their errors"""
+        response = self.client.get(
+            get_report_url('overall'), {'date': '08-05-2020'}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('date', response.json()['errors'])
+
+    def test_get_not_modified(self) -> None:
+        """
+        Tests if a request with a current ETag is answered with 304,
+        reading only the data version
+        """
+        response = self.client.get(get_report_url('overall'))
+        self.assertIn('Last-Modified', response)
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                get_report_url('overall'),
+                HTTP_IF_NONE_MATCH=response['ETag'],
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_get_modified(self) -> None:
+        """Tests if a write changes the ETag"""
+        response = self.client.get(get_report_url('overall'))
+        Expense.objects.create(name='shoes', amount=1)
+        response = self.client.get(
+            get_report_url('overall'), HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'overall': '151.55'})
+
+
+class ExpenseBatchCreateViewTestCase(TestCase):
+    """Tests for ExpenseBatchCreateView"""
+    EXPENSE_BATCH_CREATE = reverse('expenses:expense-batch-create')
+
+    def setUp(self) -> None:
+        """Set up for the ExpenseBatchCreateView tests"""
+        create_test_expenses()
+        self.category = get_category('necessary')
+
+    def post(self, items, client: Client = None):
+        """Posts expenses as JSON"""
+        return (client or self.client).post(
+            self.EXPENSE_BATCH_CREATE, json.dumps(items),
+            content_type='application/json',
+        )
+
+    def test_post(self) -> None:
+        """Tests if the valid expenses are created and the others reported"""
+        response = self.post([
+            {'name': 'bread', 'amount': '2.50', 'date': '2020-06-01',
+             'category': self.category.pk},
+            {'name': 'milk', 'amount': 'free', 'date': '2020-06-01'},
+            {'name': 'eggs', 'amount': 3, 'date': '2020-06-02'},
+            'butter',
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual((data['created'], data['failed']), (2, 2))
+        results = data['results']
+        self.assertEqual([result['index'] for result in results], [0, 1, 2, 3])
+        bread = Expense.objects.get(pk=results[0]['id'])
+        self.assertEqual(bread.name, 'bread')
+        self.assertEqual(bread.category, self.category)
+        self.assertEqual(Expense.objects.get(pk=results[2]['id']).name, 'eggs')
+        self.assertIn('amount', results[1]['errors'])
+        self.assertIn('__all__', results[3]['errors'])
+        self.assertEqual(verify(), [])
+
+    def test_post_invalid_category(self) -> None:
+        """Tests if unknown and hidden categories are rejected"""
+        Category.objects.filter(pk=self.category.pk).hide()
+        response = self.post([
+            {'name': 'bread', 'amount': 1, 'date': '2020-06-01',
+             'category': category}
+            for category in (self.category.pk, 999, 'food')
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        for result in response.json()['results']:
+            self.assertIn('category', result['errors'])
+        self.assertEqual(Expense.objects.count(), 2)
+
+    def test_post_many(self) -> None:
+        """Tests if a thousand expenses are created with a few queries"""
+        items = [
+            {'name': f'expense {i}', 'amount': i, 'date': '2020-06-01',
+             'category': self.category.pk}
+            for i in range(1000)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = self.post(items)
+
+        self.assertEqual(response.status_code, 201)
+        # SQLite takes up to 999 parameters, 166 rows of 6 columns
+        # are inserted at once
+        queries = [query['sql'] for query in context.captured_queries]
+        inserts = [
+            sql for sql in queries
+            if sql.startswith('INSERT INTO "expenses_expense" ')
+        ]
+        self.assertEqual(len(inserts), 7)
+        self.assertLess(len(queries) - len(inserts), 15)
+        ids = [result['id'] for result in response.json()['results']]
+        self.assertEqual(
+            list(Expense.objects.filter(pk__in=ids).order_by('pk')
+                 .values_list('name', flat=True)),
+            [item['name'] for item in items],
+        )
+        self.assertEqual(Category.objects.get(pk=self.category.pk)
+                         .expenses_count, 1001)
+
+    def test_post_other_writer(self) -> None:
+        """
+        Tests if the expenses aren't given the ids of other rows inserted
+        after the last id was read, the insert is rolled back and 409
+        Conflict returned instead
+        """
+        bulk_create = ExpenseQuerySet.bulk_create
+
+        def bulk_create_with_other(queryset, objs, *args, **kwargs):
+            """Inserts another expense before the given ones"""
+            Expense.objects.create(name='other', amount=1)
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        with mock.patch.object(
+                ExpenseQuerySet, 'bulk_create', bulk_create_with_other
+        ):
+            response = self.post(
+                [{'name': 'bread', 'amount': 1, 'date': '2020-06-01'}]
+            )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('No expenses were created', response.json()['error'])
+        self.assertEqual(Expense.objects.count(), 2)
+
+    def test_post_csrf(self) -> None:
+        """Tests if the JSON requests don't need a CSRF token"""
+        response = self.post(
+            [{'name': 'bread', 'amount': 1, 'date': '2020-06-01'}],
+            Client(enforce_csrf_checks=True),
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_post_not_json(self) -> None:
+        """Tests if other content than a JSON array is rejected"""
+        response = self.client.post(
+            self.EXPENSE_BATCH_CREATE, {'name': 'bread'}
+        )
+        self.assertEqual(response.status_code, 415)
+
+        response = self.client.post(
+            self.EXPENSE_BATCH_CREATE, '[{', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+        for items in ({'name': 'bread'}, []):
+            self.assertEqual(self.post(items).status_code, 400)
+
+    def test_post_too_many(self) -> None:
+        """Tests if a too large batch is rejected"""
+        response = self.post([{}] * 1001)
+        self.assertEqual(response.status_code, 413)
+
+    def test_get_not_allowed(self) -> None:
+        """Tests if the expenses can only be posted"""
+        response = self.client.get(self.EXPENSE_BATCH_CREATE)
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,321 @@
+import csv
+import io
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .utils import create_test_categories, get_category
+from ..archive import (
+    ArchiveConflict, CombinedExpenses, archive_expenses, needs_archive,
+)
+from ..forms import ExpenseSearchForm
+from ..models import ArchivedExpense, Category, DataVersion, Expense
+from ..purge import purge_category
+from ..report_cache import get_report_cache
+from ..rollups import rebuild, verify
+from ..routers import ArchiveRouter
+
+CUTOFF = date(2020, 5, 7)
+
+
+def create_dated_expenses() -> None:
+    """Creates an expense a day, with repeated categories (and no category)"""
+    create_test_categories()
+    categories = [
+        get_category('unnecessary'), get_category('necessary'), None
+    ]
+    for i in range(12):
+        Expense.objects.create(
+            category=categories[i % 3], name=f'expense {i}', amount=i + 1,
+            date=date(2020, 4, 28) + timedelta(days=i),
+        )
+
+
+class ArchiveTestCase(TestCase):
+    """Tests for the archiving of the old expenses"""
+    databases = {'default', 'archive'}
+    EXPENSE_LIST = reverse('expenses:expense-list')
+
+    def setUp(self) -> None:
+        """Set up for the archiving tests"""
+        create_dated_expenses()
+        cache.clear()
+        get_report_cache().clear()
+
+    def get_pks(self, payload: dict) -> list:
+        """Returns pks of the listed expenses"""
+        response = self.client.get(self.EXPENSE_LIST, payload)
+        self.assertEqual(response.status_code, 200)
+        return [row.pk for row in response.context['object_list']]
+
+    def walk(self, payload: dict) -> list:
+        """Returns pks of all expenses visited by following the cursors"""
+        payload = {**payload, 'pagination': 'cursor', 'items_per_page': 5}
+        response = self.client.get(self.EXPENSE_LIST, payload)
+        pks = [row.pk for row in response.context['object_list']]
+        while response.context['page_obj'].has_next():
+            response = self.client.get(self.EXPENSE_LIST, {
+                **payload, 'cursor': response.context['page_obj'].next_cursor
+            })
+            pks.extend(row.pk for row in response.context['object_list'])
+
+        return pks
+
+    def get_payloads(self):
+        """Yields search parameters of every sorting and grouping"""
+        for sort_by, _ in ExpenseSearchForm.base_fields['sort_by'].choices:
+            for group_by, _ in ExpenseSearchForm.base_fields['group_by'] \
+                    .choices:
+                yield {'sort_by': sort_by, 'group_by': group_by}
+        yield {'categories': get_category('necessary').pk}
+        yield {'date_from': '2020-05-01', 'date_to': '2020-05-08'}
+        yield {'name': 'expense 1'}
+
+    def get_reports(self) -> dict:
+        """Returns all summaries of the expenses and of a category"""
+        category = get_category('unnecessary').pk
+        return {
+            (summary, category_id): self.client.get(
+                reverse('expenses:expense-report', args=[summary]),
+                {'categories': category_id} if category_id else {},
+            ).json()
+            for summary in ('per-category', 'per-year-month', 'overall',
+                            'statistics')
+            for category_id in (None, category)
+        }
+
+    def test_archive_expenses(self) -> None:
+        """Tests that the old expenses are moved in batches"""
+        batches = []
+        moved = archive_expenses(CUTOFF, 4, batches.append)
+
+        self.assertEqual(moved, 9)
+        self.assertEqual(batches, [4, 8, 9])
+        self.assertEqual(Expense.objects.count(), 3)
+        self.assertEqual(ArchivedExpense.objects.count(), 9)
+        self.assertFalse(Expense.objects.filter(date__lt=CUTOFF).exists())
+        self.assertEqual(DataVersion.get().archived_before, CUTOFF)
+        self.assertEqual(
+            ArchivedExpense.objects.get(name='expense 0').category_name,
+            'unnecessary',
+        )
+        self.assertEqual(verify(), [])
+
+    def test_ids_not_reused(self) -> None:
+        """
+        Tests that also the newest expense is archived, and new expenses
+        don't get ids of the archived ones
+        """
+        archive_expenses(date(2021, 1, 1))
+        self.assertFalse(Expense.objects.exists())
+
+        expense = Expense.objects.create(name='new', amount=1)
+        archived = ArchivedExpense.objects.values_list('pk', flat=True)
+        self.assertGreater(expense.pk, max(archived))
+        self.assertEqual(verify(), [])
+
+    def test_interrupted_move(self) -> None:
+        """Tests that the copies left by an interrupted move are skipped"""
+        expense = Expense.objects.get(name='expense 0')
+        ArchivedExpense.objects.create(
+            id=expense.pk, category_id=expense.category_id,
+            category_name='unnecessary', name=expense.name,
+            amount=expense.amount, date=expense.date,
+            year_month=expense.year_month,
+        )
+
+        self.assertEqual(archive_expenses(CUTOFF), 9)
+        self.assertEqual(ArchivedExpense.objects.count(), 9)
+        self.assertEqual(verify(), [])
+
+    def test_reused_id(self) -> None:
+        """Tests that an expense with an archived id isn't deleted"""
+        expense = Expense.objects.get(name='expense 1')
+        ArchivedExpense.objects.create(
+            id=expense.pk, name='other', amount=1, date=date(2019, 1, 1),
+            year_month=date(2019, 1, 1),
+        )
+
+        with self.assertRaises(ArchiveConflict):
+            archive_expenses(CUTOFF)
+
+        self.assertTrue(Expense.objects.filter(pk=expense.pk).exists())
+        self.assertEqual(ArchivedExpense.objects.get(pk=expense.pk).name,
+                         'other')
+
+    def test_rebuild(self) -> None:
+        """Tests that the rebuilt rollups include the archived expenses"""
+        archive_expenses(CUTOFF)
+        rebuild()
+
+        self.assertEqual(verify(), [])
+        self.assertEqual(get_category('necessary').expenses_count, 4)
+
+    def test_list(self) -> None:
+        """Tests that the list shows the same expenses in the same order"""
+        payloads = list(self.get_payloads())
+        before = [self.get_pks(payload) for payload in payloads]
+        walked = [self.walk(payload) for payload in payloads]
+        archive_expenses(CUTOFF)
+
+        for payload, pks, walked_pks in zip(payloads, before, walked):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.get_pks(payload), pks)
+                self.assertEqual(self.walk(payload), walked_pks)
+
+    def test_pages(self) -> None:
+        """Tests that the numbered pages merge both databases"""
+        payload = {'items_per_page': 5, 'sort_by': 'date: asc'}
+        before = [self.get_pks({**payload, 'page': page}) for page in (1, 2)]
+        archive_expenses(CUTOFF)
+
+        response = self.client.get(self.EXPENSE_LIST, {**payload, 'page': 2})
+        self.assertEqual(response.context['total_objects'].value, 12)
+        self.assertEqual(
+            [self.get_pks({**payload, 'page': page}) for page in (1, 2)],
+            before,
+        )
+        self.assertTrue(response.context['object_list'][0].archived)
+        self.assertContains(response, 'archived')
+
+    def test_slices(self) -> None:
+        """Tests that the slices fetch only their rows of both databases"""
+        archive_expenses(CUTOFF)
+        for ordering in (('-date', '-pk'), ('category_name', 'pk')):
+            combined = CombinedExpenses(
+                Expense.objects.order_by(*ordering),
+                ArchivedExpense.objects.order_by(*ordering),
+            )
+            rows = list(combined)
+            for start in range(len(rows) + 1):
+                with self.subTest(ordering=ordering, start=start):
+                    with CaptureQueriesContext(connections['archive']) \
+                            as context:
+                        self.assertEqual(
+                            combined[start:start + 3], rows[start:start + 3]
+                        )
+                    # A row at a time while searching, then the slice
+                    for query in context.captured_queries:
+                        self.assertRegex(query['sql'], r'LIMIT [13]\b')
+
+    def test_reports(self) -> None:
+        """Tests that the summaries include the archived expenses"""
+        before = self.get_reports()
+        archive_expenses(CUTOFF)
+
+        self.assertEqual(self.get_reports(), before)
+
+    def test_recent_dates(self) -> None:
+        """Tests that the archive isn't read for the recent dates"""
+        archive_expenses(CUTOFF)
+        payload = {'date_from': CUTOFF.isoformat(), 'sort_by': 'date: asc'}
+
+        with CaptureQueriesContext(connections['archive']) as context:
+            pks = self.get_pks(payload)
+
+        self.assertEqual(len(context.captured_queries), 0)
+        self.assertEqual(len(pks), 3)
+        self.assertFalse(needs_archive({'date': CUTOFF}, CUTOFF))
+        self.assertTrue(needs_archive({}, CUTOFF))
+        self.assertFalse(needs_archive({}, None))
+
+    def test_export(self) -> None:
+        """Tests that the archived expenses are exported"""
+        archive_expenses(CUTOFF)
+        response = self.client.get(
+            reverse('expenses:expense-export'), {'format': 'csv'}
+        )
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+
+        self.assertEqual(
+            [row['name'] for row in rows],
+            [f'expense {i}' for i in reversed(range(12))],
+        )
+        self.assertEqual(rows[-1]['category'], 'unnecessary')
+
+    def test_rename_category(self) -> None:
+        """Tests that the archived expenses follow a renamed category"""
+        archive_expenses(CUTOFF)
+        category = get_category('necessary')
+        category.name = 'essential'
+        category.save()
+
+        self.assertEqual(
+            set(ArchivedExpense.objects.filter(
+                category_id=category.pk
+            ).values_list('category_name', flat=True)),
+            {'essential'},
+        )
+        # The expenses without a category come first
+        self.assertEqual(
+            self.get_pks({
+                'sort_by': 'category: asc', 'items_per_page': 20,
+            })[4:8],
+            [11, 8, 5, 2],
+        )
+
+    def test_purge_category(self) -> None:
+        """Tests that deleted categories lose their archived expenses"""
+        archive_expenses(CUTOFF)
+        category = get_category('unnecessary')
+        Category.objects.filter(pk=category.pk).hide()
+        progress = []
+
+        deleted = purge_category(
+            category.pk, 2,
+            lambda deleted, remaining: progress.append((deleted, remaining))
+        )
+
+        self.assertEqual(deleted, 4)
+        # The 3 archived expenses are deleted in batches, then the other one
+        self.assertEqual(progress, [(2, 2), (3, 1), (4, 0)])
+        self.assertFalse(
+            ArchivedExpense.objects.filter(category_id=category.pk).exists()
+        )
+        self.assertEqual(verify(), [])
+
+    def test_command(self) -> None:
+        """Tests that the command archives the expenses before a date"""
+        out = StringIO()
+        call_command(
+            'archive_expenses', before=CUTOFF.isoformat(), batch_size=5,
+            stdout=out,
+        )
+
+        self.assertIn('Archived 5 expenses', out.getvalue())
+        self.assertIn('Archived 9 expenses dated before 2020-05-07',
+                      out.getvalue())
+
+
+class ArchiveRouterTestCase(TestCase):
+    """Tests for ArchiveRouter"""
+
+    def test_allow_migrate(self) -> None:
+        """Tests that only the archived expenses are in the archive"""
+        router = ArchiveRouter()
+
+        self.assertTrue(
+            router.allow_migrate('archive', 'expenses', 'archivedexpense')
+        )
+        self.assertFalse(
+            router.allow_migrate('archive', 'expenses', 'expense')
+        )
+        self.assertFalse(router.allow_migrate('archive', 'expenses'))
+        self.assertFalse(
+            router.allow_migrate('default', 'expenses', 'archivedexpense')
+        )
+        self.assertIsNone(
+            router.allow_migrate('default', 'expenses', 'expense')
+        )
+
+    def test_db_for_read(self) -> None:
+        """Tests that the archived expenses are read from the archive"""
+        self.assertEqual(ArchivedExpense.objects.all().db, 'archive')
+        self.assertEqual(Expense.objects.all().db, 'default')
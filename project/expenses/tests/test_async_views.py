@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory, TransactionTestCase
+from django.urls import reverse
+
+from .utils import create_test_expenses, get_category
+from ..report_cache import get_report_cache
+from ..threads import run_in_thread
+from ..views import AsyncViewMixin, CategoryListView
+
+
+class AsyncViewsTestCase(TransactionTestCase):
+    """
+    Tests for the async views, their queries run in other threads,
+    so the data has to be committed
+    """
+
+    def setUp(self) -> None:
+        """Set up for the async views tests"""
+        create_test_expenses()
+
+    def assertSameContent(self, name: str, async_name: str, kwargs=None,
+                          params=None) -> None:
+        """Asserts that a sync and an async view return the same page"""
+        get_report_cache().clear()
+        expected = self.client.get(reverse(name, kwargs=kwargs), params)
+        get_report_cache().clear()
+        response = self.client.get(reverse(async_name, kwargs=kwargs), params)
+
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+
+    def test_expense_list(self) -> None:
+        """Tests that the async expenses list matches the sync one"""
+        category = get_category('necessary').pk
+        for params in (
+                {},
+                {'items_per_page': 1, 'page': 2},
+                {'items_per_page': 1, 'page': 'last'},
+                {'categories': category, 'group_by': 'date'},
+                {'name': 'shi', 'sort_by': 'date: desc'},
+                {'pagination': 'cursor', 'items_per_page': 1},
+                {'page': 5},
+        ):
+            with self.subTest(params=params):
+                self.assertSameContent(
+                    'expenses:expense-list', 'expenses:expense-list-async',
+                    params=params,
+                )
+
+    def test_category_detail(self) -> None:
+        """Tests that the async category detail matches the sync one"""
+        self.assertSameContent(
+            'expenses:category-detail', 'expenses:category-detail-async',
+            kwargs={'pk': get_category('necessary').pk},
+        )
+
+    def test_category_not_found(self) -> None:
+        """Tests that a missing category isn't found"""
+        response = self.client.get(
+            reverse('expenses:category-detail-async', kwargs={'pk': 999})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_post_not_allowed(self) -> None:
+        """Tests that the async views only answer GET requests"""
+        response = self.client.post(reverse('expenses:expense-list-async'))
+        self.assertEqual(response.status_code, 405)
+
+    def test_default_prefetch(self) -> None:
+        """Tests that a view, which doesn't prefetch, runs the sync one"""
+        view = type(
+            'AsyncCategoryListView', (AsyncViewMixin, CategoryListView), {}
+        ).as_view()
+        response = async_to_sync(view)(RequestFactory().get('/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response.render(), 'necessary')
+
+    def test_concurrent(self) -> None:
+        """Tests that the functions run in threads concurrently"""
+        async def gather():
+            """Runs two slow functions at once"""
+            await asyncio.gather(
+                run_in_thread(time.sleep, 0.2),
+                run_in_thread(time.sleep, 0.2),
+            )
+
+        started = time.monotonic()
+        async_to_sync(gather)()
+        self.assertLess(time.monotonic() - started, 0.35)
@@ -0,0 +1,120 @@
+import datetime
+
+from django.db.models import Count
+from django.test import TestCase, TransactionTestCase
+
+from ..benchmark import (
+    VARIANTS, compare, get_requests, percentile, run_benchmark,
+)
+from ..models import Expense
+from ..rollups import verify
+from ..synthetic import ExpenseGenerator
+from ..views import ExpenseReportView
+from .. import urls
+
+
+class ExpenseGeneratorTestCase(TestCase):
+    """Tests of the synthetic expenses generator"""
+
+    def test_generate(self) -> None:
+        """Tests that the expenses and categories are created"""
+        generator = ExpenseGenerator(
+            categories=15, days=30, end=datetime.date(2021, 1, 31), seed=1
+        )
+        self.assertEqual(generator.generate(500, batch_size=200), 500)
+
+        self.assertEqual(Expense.objects.count(), 500)
+        self.assertEqual(len(generator.get_category_names()), 15)
+        self.assertFalse(Expense.objects.filter(
+            date__lt=datetime.date(2021, 1, 2)
+        ).exists())
+        self.assertFalse(Expense.objects.filter(
+            date__gt=datetime.date(2021, 1, 31)
+        ).exists())
+        self.assertEqual(verify(), [])
+
+    def test_skew(self) -> None:
+        """Tests that the first categories and names are the most common"""
+        ExpenseGenerator(categories=5, seed=1).generate(1000)
+
+        names = list(
+            Expense.objects.values('name').annotate(n=Count('pk'))
+            .order_by('-n').values_list('name', flat=True)
+        )
+        categories = list(
+            Expense.objects.filter(category__isnull=False)
+            .values('category__name').annotate(n=Count('pk'))
+            .order_by('-n').values_list('category__name', flat=True)
+        )
+        self.assertEqual(names[0], 'coffee')
+        self.assertEqual(categories[0], 'food')
+
+    def test_seed(self) -> None:
+        """Tests that a seed makes the expenses reproducible"""
+        end = datetime.date(2021, 1, 31)
+        first = ExpenseGenerator(end=end, seed=7).expenses([1, 2])
+        second = ExpenseGenerator(end=end, seed=7).expenses([1, 2])
+
+        for _ in range(20):
+            a, b = next(first), next(second)
+            self.assertEqual(
+                (a.name, a.amount, a.date, a.category_id),
+                (b.name, b.amount, b.date, b.category_id),
+            )
+
+
+class BenchmarkTestCase(TransactionTestCase):
+    """
+    Tests of the views benchmark, the data has to be committed for the
+    queries of the async views
+    """
+
+    def test_percentile(self) -> None:
+        """Tests the nearest-rank percentiles"""
+        values = [float(value) for value in range(1, 101)]
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3.0], 90), 3)
+
+    def test_every_url(self) -> None:
+        """Tests that every readable URL of the app is benchmarked"""
+        paths = {
+            path for _, path, _ in get_requests({'expense': 1, 'category': 1})
+        }
+
+        # The report URL is benchmarked for each of its summaries,
+        # the batch creation isn't read
+        self.assertEqual(
+            len(paths),
+            len(urls.urlpatterns) + len(ExpenseReportView.SUMMARIES) - 2,
+        )
+
+    def test_report(self) -> None:
+        """Tests that every request succeeds and is measured"""
+        report = run_benchmark([50], repeat=2)
+
+        self.assertEqual(report['meta']['repeat'], 2)
+        for result in report['results']:
+            self.assertEqual(result['status'], 200, result['view'])
+            self.assertGreater(result['p50_ms'], 0)
+            self.assertGreaterEqual(result['max_ms'], result['p99_ms'])
+            self.assertGreater(result['peak_memory_kib'], 0)
+
+        rows = compare(report, report)
+        self.assertEqual(len(rows), len(report['results']))
+        self.assertTrue(all(row['change'] == 0 for row in rows))
+
+    def test_report_of_views(self) -> None:
+        """Tests that only the URLs of given names are benchmarked"""
+        report = run_benchmark([50], repeat=1, views=['expense-report'])
+
+        views = [result['view'] for result in report['results']]
+        self.assertTrue(all(
+            view.startswith('expense-report/') for view in views
+        ))
+        self.assertEqual(
+            len(views),
+            len(ExpenseReportView.SUMMARIES)
+            * len(VARIANTS['expense-report']),
+        )
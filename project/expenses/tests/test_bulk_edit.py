@@ -0,0 +1,201 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .utils import create_test_expenses, get_category
+from ..bulk_edit import bulk_edit, get_amount_limit, select_expenses
+from ..forms import ExpenseBulkEditForm
+from ..models import DataVersion, Expense
+from ..rollups import verify
+from ..synthetic import ExpenseGenerator
+
+
+class BulkEditTestCase(TestCase):
+    """Tests for the changes of many expenses at once"""
+
+    def setUp(self) -> None:
+        """Set up for the bulk edit tests"""
+        ExpenseGenerator(categories=2, skew=0, uncategorized=0, seed=1) \
+            .generate(50)
+        self.food = get_category('food')
+
+    def test_recategorize(self) -> None:
+        """Tests that the expenses move between the categories in batches"""
+        expenses = Expense.objects.filter(category=self.food)
+        count = expenses.count()
+        other = Expense.objects.exclude(category=self.food).first().category
+        progress = []
+
+        updated = bulk_edit(expenses, {'category': other}, 10, progress.append)
+
+        self.assertEqual(updated, count)
+        self.assertEqual(progress[-1], count)
+        self.assertEqual(len(progress), -(-count // 10))
+        self.assertFalse(expenses.exists())
+        self.assertEqual(get_category('food').expenses_count, 0)
+        self.assertEqual(verify(), [])
+
+    def test_single_update_per_batch(self) -> None:
+        """Tests that a batch is changed with a single UPDATE"""
+        with CaptureQueriesContext(connection) as context:
+            bulk_edit(Expense.objects.all(), {'name': 'renamed'})
+
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "expenses_expense"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            set(Expense.objects.values_list('name', flat=True)), {'renamed'}
+        )
+
+    def test_amount_delta(self) -> None:
+        """Tests that a delta is added to the amounts and the rollups"""
+        expenses = Expense.objects.filter(category=self.food)
+        amounts = dict(expenses.values_list('pk', 'amount'))
+        version = DataVersion.get().version
+
+        bulk_edit(expenses, {'amount_delta': Decimal('-1.5')}, 7)
+
+        self.assertEqual(
+            dict(expenses.values_list('pk', 'amount')),
+            {pk: amount - Decimal('1.5') for pk, amount in amounts.items()},
+        )
+        self.assertGreater(DataVersion.get().version, version)
+        self.assertEqual(verify(), [])
+
+    def test_amount_limit(self) -> None:
+        """Tests that the amounts aren't changed beyond their field"""
+        expenses = Expense.objects.all()
+        amounts = list(expenses.values_list('amount', flat=True))
+
+        with self.assertRaises(ValidationError):
+            bulk_edit(expenses, {'amount_delta': get_amount_limit()})
+
+        self.assertEqual(list(expenses.values_list('amount', flat=True)),
+                         amounts)
+
+    def test_select_expenses(self) -> None:
+        """Tests that the expenses are selected by filters and ids"""
+        pks = list(Expense.objects.values_list('pk', flat=True)[:3])
+        food = Expense.objects.filter(category=self.food)
+
+        self.assertIsNone(select_expenses(None, []))
+        self.assertEqual(set(select_expenses(None, pks)), set(
+            Expense.objects.filter(pk__in=pks)
+        ))
+        self.assertEqual(
+            set(select_expenses(food, pks)), set(food.filter(pk__in=pks))
+        )
+
+    def test_command(self) -> None:
+        """Tests that the command changes the filtered expenses"""
+        out = StringIO()
+        call_command(
+            'bulk_edit_expenses', filter=f'categories={self.food.pk}',
+            no_category=True, batch_size=10, stdout=out,
+        )
+
+        self.assertIn('Updated 10 expenses', out.getvalue())
+        self.assertFalse(Expense.objects.filter(category=self.food).exists())
+        self.assertEqual(verify(), [])
+
+    def test_command_without_selection(self) -> None:
+        """Tests that the command doesn't change all expenses by default"""
+        with self.assertRaises(CommandError):
+            call_command('bulk_edit_expenses', name='renamed')
+        with self.assertRaises(CommandError):
+            call_command('bulk_edit_expenses', filter='sort_by=date',
+                         name='renamed')
+
+        self.assertFalse(Expense.objects.filter(name='renamed').exists())
+
+
+class ExpenseBulkEditFormTestCase(TestCase):
+    """Tests for ExpenseBulkEditForm"""
+
+    def setUp(self) -> None:
+        """Set up for the ExpenseBulkEditForm tests"""
+        create_test_expenses()
+
+    def test_changes(self) -> None:
+        """Tests that only the given changes are returned"""
+        form = ExpenseBulkEditForm({
+            'ids': '1, 2', 'clear_category': True, 'amount_delta': '2.50',
+        })
+
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['ids'], [1, 2])
+        self.assertEqual(
+            form.get_changes(),
+            {'category': None, 'amount_delta': Decimal('2.50')},
+        )
+
+    def test_invalid(self) -> None:
+        """Tests that the conflicting or missing changes are rejected"""
+        category = get_category('necessary').pk
+        for data in ({'ids': '1'}, {'ids': 'a', 'name': 'x'},
+                     {'category': category, 'clear_category': True}):
+            with self.subTest(data=data):
+                self.assertFalse(ExpenseBulkEditForm(data).is_valid())
+
+
+class ExpenseBulkEditViewTestCase(TestCase):
+    """Tests for ExpenseBulkEditView"""
+
+    def setUp(self) -> None:
+        """Set up for the ExpenseBulkEditView tests"""
+        create_test_expenses()
+        self.url = reverse('expenses:expense-bulk-edit')
+        self.necessary = get_category('necessary')
+
+    def test_get(self) -> None:
+        """Tests that the number of the filtered expenses is shown"""
+        response = self.client.get(self.url, {'name': 'shirt'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['selected'], 1)
+        self.assertIsNone(self.client.get(self.url).context['selected'])
+
+    def test_post(self) -> None:
+        """Tests that the filtered expenses are changed"""
+        response = self.client.post(
+            f'{self.url}?date_from=2020-05-01&sort_by=date: asc',
+            {'category': self.necessary.pk, 'name': 'clothes'},
+        )
+
+        self.assertRedirects(
+            response,
+            reverse('expenses:expense-list')
+            + '?date_from=2020-05-01&sort_by=date%3A+asc',
+        )
+        self.assertEqual(
+            list(Expense.objects.values_list('category', 'name')),
+            [(self.necessary.pk, 'clothes')] * 2,
+        )
+        self.assertEqual(get_category('necessary').expenses_count, 2)
+        self.assertEqual(verify(), [])
+
+    def test_post_ids(self) -> None:
+        """Tests that only the expenses of given ids are changed"""
+        shirt = Expense.objects.get(name='shirt')
+        self.client.post(self.url, {'ids': str(shirt.pk), 'name': 'tee'})
+
+        self.assertEqual(
+            sorted(Expense.objects.values_list('name', flat=True)),
+            ['jeans', 'tee'],
+        )
+
+    def test_post_without_selection(self) -> None:
+        """Tests that the expenses aren't changed without a selection"""
+        response = self.client.post(self.url, {'name': 'renamed'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ids', response.context['form'].errors)
+        self.assertFalse(Expense.objects.filter(name='renamed').exists())
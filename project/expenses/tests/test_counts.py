@@ -0,0 +1,137 @@
+from django.core.paginator import InvalidPage
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .utils import create_test_expenses, get_category
+from ..counts import CountResult, CountedPaginator, get_count, get_cache_key
+from ..models import Category, DataVersion, Expense
+
+
+class DataVersionTestCase(TestCase):
+    """Tests for DataVersion"""
+
+    def setUp(self) -> None:
+        """Set up for the DataVersion tests"""
+        create_test_expenses()
+        self.stamp = DataVersion.get().stamp
+
+    def test_expense_saved_version_bumped(self) -> None:
+        """Tests if saving an expense bumps the data version"""
+        Expense.objects.create(name='shoes', amount=1)
+        self.assertNotEqual(DataVersion.get().stamp, self.stamp)
+
+    def test_expenses_renamed_version_bumped(self) -> None:
+        """Tests if renaming expenses with QuerySet.update bumps the version"""
+        Expense.objects.update(name='renamed')
+        self.assertNotEqual(DataVersion.get().stamp, self.stamp)
+
+    def test_category_renamed_version_bumped(self) -> None:
+        """Tests if renaming a category bumps the data version"""
+        category = get_category('necessary')
+        category.name = 'renamed'
+        category.save()
+        self.assertNotEqual(DataVersion.get().stamp, self.stamp)
+
+
+class CountsTestCase(TestCase):
+    """Tests for counting objects of the list views"""
+
+    def setUp(self) -> None:
+        """Set up for the counts tests"""
+        create_test_expenses()
+
+    def test_get_count_cached(self) -> None:
+        """Tests if a count is cached for the same data version"""
+        queryset = Category.objects.all()
+        version = DataVersion.get().stamp
+        self.assertEqual(get_count(queryset, {}, version), CountResult(2))
+        with self.assertNumQueries(0):
+            self.assertEqual(get_count(queryset, {}, version).value, 2)
+
+    def test_get_cache_key_normalized(self) -> None:
+        """
+        Tests if the cache key ignores ordering and pagination parameters
+        and changes with the filters and the data version
+        """
+        key = get_cache_key(Expense, {'name': 'shirt '}, '1')
+        self.assertEqual(
+            key,
+            get_cache_key(Expense, {'name': 'shirt', 'sort_by': 'date'}, '1')
+        )
+        for params, version in (({'name': 'x'}, '1'), ({'name': 'y'}, '2')):
+            self.assertNotEqual(key, get_cache_key(Expense, params, version))
+
+    @override_settings(EXPENSES_COUNT_ESTIMATE_THRESHOLD=1)
+    def test_get_count_estimated(self) -> None:
+        """Tests if counts of large tables are estimated"""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        result = get_count(Expense.objects.all(), {}, '1')
+        self.assertFalse(result.exact)
+        self.assertEqual(str(result), 'about 2')
+
+    @override_settings(EXPENSES_COUNT_ESTIMATE_THRESHOLD=5)
+    def test_get_count_capped(self) -> None:
+        """Tests if a filtered count is stopped after the threshold"""
+        Category.objects.bulk_create(
+            [Category(name=f'cat {i}') for i in range(12)]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        queryset = Category.objects.filter(name__startswith='cat')
+
+        result = get_count(queryset, {'name': 'cat'}, '1')
+        self.assertEqual(result, CountResult(5, exact=False, capped=True))
+        self.assertEqual(str(result), 'more than 5')
+        self.assertEqual(
+            get_count(queryset.filter(name='cat 1'), {'name': 'cat 1'}, '1'),
+            CountResult(1),
+        )
+
+    @override_settings(EXPENSES_COUNT_ESTIMATE_THRESHOLD=5)
+    def test_pages_not_bounded_by_estimate(self) -> None:
+        """Tests if the pages after an estimated count are listed"""
+        Category.objects.bulk_create(
+            [Category(name=f'cat {i}') for i in range(12)]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        url = reverse('expenses:category-list')
+        payload = {'name': 'cat', 'items_per_page': 2}
+
+        response = Client().get(url, {**payload, 'page': 6})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(str(response.context['total_objects']),
+                         'more than 5')
+        self.assertEqual(len(response.context['object_list']), 2)
+        self.assertFalse(response.context['page_obj'].has_next())
+        self.assertTrue(
+            Client().get(url, {**payload, 'page': 5})
+            .context['page_obj'].has_next()
+        )
+        self.assertEqual(
+            Client().get(url, {**payload, 'page': 7}).status_code, 404
+        )
+
+    def test_estimated_paginator(self) -> None:
+        """Tests if an estimated paginator validates the page numbers"""
+        paginator = CountedPaginator(list(range(3)), 2, count=1, exact=False)
+        self.assertEqual(list(paginator.page(2)), [2])
+        self.assertEqual(paginator.page(2).end_index(), 3)
+        self.assertEqual(list(CountedPaginator(
+            [], 2, count=1, exact=False
+        ).page(1)), [])
+        for number in (0, 'x', 3):
+            with self.subTest(number=number):
+                with self.assertRaises(InvalidPage):
+                    paginator.page(number)
+
+    def test_expense_list_counted_once(self) -> None:
+        """Tests if the expense list doesn't run separate COUNT queries"""
+        with CaptureQueriesContext(connection) as queries:
+            Client().get(reverse('expenses:expense-list'), {'name': 'shirt'})
+        self.assertFalse(
+            [q for q in queries if 'COUNT(*)' in q['sql'].upper()]
+        )
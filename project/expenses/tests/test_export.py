@@ -0,0 +1,93 @@
+import csv
+import gzip
+import io
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from .utils import create_test_expenses, get_category
+from ..export import CHUNK_SIZE, write_csv
+from ..importing import ExpenseImporter, read_csv
+from ..models import Expense
+from ..rows import iter_expenses
+
+
+class ExpenseExportViewTestCase(TestCase):
+    """Tests for ExpenseExportView"""
+    EXPENSE_EXPORT = reverse('expenses:expense-export')
+
+    def setUp(self) -> None:
+        """Set up for the ExpenseExportView tests"""
+        create_test_expenses()
+
+    def get_content(self, payload: dict) -> bytes:
+        """Returns content of a streamed export"""
+        response = self.client.get(self.EXPENSE_EXPORT, payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+
+        return b''.join(response.streaming_content)
+
+    def test_get_csv(self) -> None:
+        """Tests if the expenses are exported as CSV in the list's order"""
+        content = self.get_content({'format': 'csv'}).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([row['name'] for row in rows], ['jeans', 'shirt'])
+        self.assertEqual(rows[0]['amount'], '100.15')
+        self.assertEqual(rows[0]['date'], '2020-05-08')
+        self.assertEqual(rows[0]['category'], 'necessary')
+
+    def test_get_ndjson_filtered(self) -> None:
+        """Tests if the expenses are filtered as in the list"""
+        payload = {
+            'format': 'ndjson',
+            'categories': get_category('unnecessary').pk,
+        }
+        content = self.get_content(payload).decode()
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['shirt'])
+
+    def test_get_sorted(self) -> None:
+        """Tests if the expenses are sorted as in the list"""
+        payload = {'format': 'ndjson', 'sort_by': 'date: asc'}
+        content = self.get_content(payload).decode()
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['shirt', 'jeans'])
+
+    def test_get_gzip(self) -> None:
+        """Tests if the export is compressed when requested"""
+        response = self.client.get(
+            self.EXPENSE_EXPORT, {'format': 'csv', 'gzip': 'on'}
+        )
+        self.assertIn('expenses.csv.gz', response['Content-Disposition'])
+        content = gzip.decompress(b''.join(response.streaming_content))
+        self.assertEqual(len(content.decode().splitlines()), 3)
+
+    def test_get_invalid_format(self) -> None:
+        """Tests if an unknown format is rejected"""
+        response = self.client.get(self.EXPENSE_EXPORT, {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+
+class WriteCsvTestCase(TestCase):
+    """Tests for write_csv"""
+
+    def test_write_csv_chunked(self) -> None:
+        """
+        Tests if large exports are written in chunks, which can be
+        read back by the importer
+        """
+        create_test_expenses()
+        Expense.objects.bulk_create(
+            Expense(name=f'expense {i}', amount=i) for i in range(5000)
+        )
+        chunks = list(write_csv(iter_expenses(Expense.objects.all(), 100)))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(c) >= CHUNK_SIZE for c in chunks[1:-1]))
+
+        Expense.objects.all().delete()
+        importer = ExpenseImporter()
+        importer.run(read_csv(io.StringIO(''.join(chunks))))
+        self.assertEqual(Expense.objects.count(), 5002)
+        self.assertEqual(importer.errors, [])
@@ -27,6 +27,19 @@ class ExpenseSearchFormTestCase(TestCase):
         form = ExpenseSearchForm(data=data)
         self.assertFalse(form.is_valid())
 
+    def test_form_validation_date_range_provided(self) -> None:
+        """Tests if a form is valid when provided with a date range"""
+        data = {'date_from': '2020-05-01', 'date_to': '2020-05-31'}
+        form = ExpenseSearchForm(data=data)
+        self.assertTrue(form.is_valid())
+
+    def test_form_validation_reversed_date_range_provided(self) -> None:
+        """Tests if a form is invalid when the date range is reversed"""
+        data = {'date_from': '2020-05-31', 'date_to': '2020-05-01'}
+        form = ExpenseSearchForm(data=data)
+        self.assertFalse(form.is_valid())
+        self.assertIn('date_to', form.errors)
+
     def test_form_validation_multiple_categories_provided(self) -> None:
         """
         Tests if a form is valid when provided with multiple categories
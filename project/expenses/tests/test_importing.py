@@ -0,0 +1,132 @@
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from .utils import create_test_categories, get_category
+from ..importing import ExpenseImporter, read_csv, read_ndjson
+from ..models import Category, Expense
+from ..rollups import verify
+
+
+class ExpenseImporterTestCase(TestCase):
+    """Tests for ExpenseImporter"""
+
+    def setUp(self) -> None:
+        """Set up for the ExpenseImporter tests"""
+        create_test_categories()
+
+    def test_run_csv_imported(self) -> None:
+        """
+        Tests if expenses are imported from CSV, with existing categories
+        reused, missing ones created and invalid rows rejected
+        """
+        stream = StringIO(
+            'name,amount,date,category\n'
+            'shirt,10.50,2020-05-01,necessary\n'
+            'tickets,,2020-05-02,fun\n'
+            'movie,12,2020-05-02,fun\n'
+            'bread,2,,\n'
+        )
+        importer = ExpenseImporter(batch_size=2)
+        self.assertEqual(importer.run(read_csv(stream)), 3)
+        self.assertEqual(
+            Expense.objects.get(name='shirt').category,
+            get_category('necessary')
+        )
+        self.assertEqual(get_category('fun').expenses_count, 1)
+        self.assertIsNone(Expense.objects.get(name='bread').category)
+        self.assertEqual([e.line for e in importer.errors], [3])
+        self.assertEqual(verify(), [])
+
+    def test_run_ndjson_imported(self) -> None:
+        """Tests if expenses are imported from NDJSON"""
+        stream = StringIO(
+            '{"name": "shirt", "amount": "10.5", "date": "2020-05-01"}\n'
+            '\n'
+            'not json\n'
+            '{"name": "jeans", "amount": 100, "category": "necessary"}\n'
+        )
+        importer = ExpenseImporter()
+        self.assertEqual(importer.run(read_ndjson(stream)), 2)
+        self.assertEqual(
+            Expense.objects.get(name='shirt').amount, Decimal('10.50')
+        )
+        self.assertEqual([e.line for e in importer.errors], [3])
+
+    def test_run_deleted_category_rejected(self) -> None:
+        """
+        Tests if records of a category, which is being deleted,
+        are rejected instead of failing the import
+        """
+        Category.objects.filter(name='necessary').hide()
+        stream = StringIO(
+            'name,amount,category\nshirt,1,necessary\njeans,2,fun\n'
+        )
+        importer = ExpenseImporter()
+        self.assertEqual(importer.run(read_csv(stream)), 1)
+        self.assertEqual(
+            [str(e) for e in importer.errors],
+            ['line 2: category: it is being deleted'],
+        )
+        self.assertEqual(verify(), [])
+
+    def test_run_errors_capped(self) -> None:
+        """Tests if only the first errors are kept, all are counted"""
+        stream = StringIO(
+            'name,amount\n' + ''.join(f'{i},x\n' for i in range(5))
+        )
+        importer = ExpenseImporter(max_errors=2)
+        importer.run(read_csv(stream))
+        self.assertEqual([e.line for e in importer.errors], [2, 3])
+        self.assertEqual(importer.rejected, 5)
+
+    def test_run_skip_to(self) -> None:
+        """Tests if records up to a given line are skipped"""
+        stream = StringIO('name,amount\nfirst,1\nsecond,2\n')
+        ExpenseImporter().run(read_csv(stream), skip_to=2)
+        self.assertEqual(
+            list(Expense.objects.values_list('name', flat=True)), ['second']
+        )
+
+
+class ImportExpensesCommandTestCase(TestCase):
+    """Tests for the import_expenses command"""
+
+    def setUp(self) -> None:
+        """Set up for the import_expenses command tests"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'expenses.csv')
+        with open(self.path, 'w') as f:
+            f.write('name,amount,category\nfirst,1,a\nsecond,x,a\nthird,3,b\n')
+
+    def test_import_expenses_imported(self) -> None:
+        """Tests if the command imports expenses and saves the progress"""
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            'import_expenses', self.path, batch_size=1,
+            stdout=stdout, stderr=stderr,
+        )
+        self.assertEqual(Expense.objects.count(), 2)
+        self.assertEqual(Category.objects.count(), 2)
+        self.assertIn('line 3', stderr.getvalue())
+        self.assertIn('rows/s', stdout.getvalue())
+        with open(f'{self.path}.import-state') as f:
+            self.assertEqual(json.load(f), {'line': 4})
+
+    def test_import_expenses_resumed(self) -> None:
+        """Tests if the command skips lines imported before"""
+        with open(f'{self.path}.import-state', 'w') as f:
+            json.dump({'line': 2}, f)
+        call_command(
+            'import_expenses', self.path, resume=True,
+            stdout=StringIO(), stderr=StringIO(),
+        )
+        self.assertEqual(
+            list(Expense.objects.values_list('name', flat=True)), ['third']
+        )
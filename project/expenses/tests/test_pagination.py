@@ -0,0 +1,124 @@
+from datetime import date, timedelta
+
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from .utils import create_test_categories, get_category
+from ..forms import ExpenseSearchForm
+from ..models import Expense
+from ..pagination import CursorPaginator, InvalidCursor
+from ..views import ExpenseListView
+
+
+def create_paginated_expenses() -> None:
+    """Creates expenses with repeated dates and categories (and no category)"""
+    create_test_categories()
+    categories = [
+        get_category('unnecessary'), get_category('necessary'), None
+    ]
+    Expense.objects.bulk_create(
+        Expense(
+            category=categories[i % 3], name=f'expense {i}', amount=i,
+            date=date(2020, 5, 1) + timedelta(days=i % 4),
+        )
+        for i in range(11)
+    )
+
+
+class CursorPaginatorTestCase(TestCase):
+    """Tests for CursorPaginator"""
+
+    def setUp(self) -> None:
+        """Set up for the CursorPaginator tests"""
+        create_paginated_expenses()
+
+    def get_querysets(self):
+        """Yields querysets ordered as in every sorting and grouping"""
+        view = ExpenseListView()
+        yield Expense.objects.all()
+        for sort_by in ExpenseSearchForm.base_fields['sort_by'].choices:
+            for group_by in ExpenseSearchForm.base_fields['group_by'].choices:
+                queryset = view._get_ordered_queryset(
+                    Expense.objects.all(), sort_by[0]
+                )
+                yield view._get_ordered_queryset(
+                    queryset, group_by[0], '-pk'
+                )
+
+    def walk(self, paginator: CursorPaginator, backwards: bool = False):
+        """Returns pks of all objects visited by following the cursors"""
+        page = paginator.page()
+        pks = [obj.pk for obj in page]
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            pks.extend(obj.pk for obj in page)
+        if not backwards:
+            return pks
+
+        pks = [obj.pk for obj in page]
+        while page.has_previous():
+            page = paginator.page(page.previous_cursor)
+            pks[:0] = [obj.pk for obj in page]
+        return pks
+
+    def test_pages_match_ordering(self) -> None:
+        """
+        Tests if following the next cursors visits all expenses in the
+        order of the queryset, for every sorting and grouping
+        """
+        for queryset in self.get_querysets():
+            paginator = CursorPaginator(queryset, 3)
+            expected = [
+                obj.pk for obj in queryset.order_by(
+                    *[f'{"-" if d else ""}{f}' for f, d in paginator.ordering]
+                )
+            ]
+            with self.subTest(ordering=queryset.query.order_by):
+                self.assertEqual(self.walk(paginator), expected)
+
+    def test_previous_cursors_match_ordering(self) -> None:
+        """
+        Tests if following the previous cursors from the last page
+        visits all expenses
+        """
+        for queryset in self.get_querysets():
+            paginator = CursorPaginator(queryset, 4)
+            with self.subTest(ordering=queryset.query.order_by):
+                self.assertEqual(
+                    self.walk(paginator, backwards=True), self.walk(paginator)
+                )
+
+    def test_invalid_cursor(self) -> None:
+        """Tests if an invalid cursor raises InvalidCursor"""
+        with self.assertRaises(InvalidCursor):
+            CursorPaginator(Expense.objects.all(), 3).page('not a cursor')
+
+
+class ExpenseListViewCursorTestCase(TestCase):
+    """Tests for the cursor pagination of ExpenseListView"""
+    EXPENSE_LIST = reverse('expenses:expense-list')
+
+    def setUp(self) -> None:
+        """Set up for the cursor pagination tests"""
+        create_paginated_expenses()
+        self.client = Client()
+
+    def test_get_context_data_cursor_pagination(self) -> None:
+        """Tests if the next cursor points at the second page"""
+        payload = {'pagination': 'cursor', 'items_per_page': 5}
+        result = self.client.get(self.EXPENSE_LIST, payload)
+        page = result.context[-1]['page_obj']
+        self.assertEqual(len(page.object_list), 5)
+
+        payload['cursor'] = page.next_cursor
+        result = self.client.get(self.EXPENSE_LIST, payload)
+        self.assertEqual(
+            [obj.pk for obj in result.context[-1]['object_list']],
+            list(Expense.objects.values_list('pk', flat=True)[5:10])
+        )
+
+    def test_get_context_data_invalid_cursor(self) -> None:
+        """Tests if an invalid cursor returns 404"""
+        payload = {'pagination': 'cursor', 'cursor': 'invalid'}
+        result = self.client.get(self.EXPENSE_LIST, payload)
+        self.assertEqual(result.status_code, 404)
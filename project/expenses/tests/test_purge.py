@@ -0,0 +1,125 @@
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from .utils import create_test_expenses, get_category
+from ..forms import ExpenseForm, ExpenseSearchForm
+from ..models import Category, Expense
+from ..purge import purge_category
+from ..rollups import verify
+from ..synthetic import ExpenseGenerator
+
+
+class PurgeCategoryTestCase(TestCase):
+    """Tests for the batched deletion of the categories"""
+
+    def setUp(self) -> None:
+        """Set up for the deletion tests"""
+        ExpenseGenerator(categories=2, skew=0, uncategorized=0, seed=1) \
+            .generate(50)
+        self.category = Category.objects.get(name='food')
+        Category.objects.filter(pk=self.category.pk).hide()
+
+    def test_purge_category(self) -> None:
+        """Tests that the expenses are deleted in batches, then the category"""
+        count = self.category.expenses_count
+        progress = []
+
+        deleted = purge_category(
+            self.category.pk, 10,
+            lambda deleted, remaining: progress.append((deleted, remaining))
+        )
+
+        self.assertEqual(deleted, count)
+        self.assertEqual(len(progress), -(-count // 10))
+        self.assertEqual(progress[-1], (count, 0))
+        self.assertFalse(
+            Category.all_objects.filter(pk=self.category.pk).exists()
+        )
+        self.assertFalse(Expense.objects.filter(
+            category_id=self.category.pk
+        ).exists())
+        self.assertTrue(Expense.objects.exists())
+        self.assertEqual(verify(), [])
+
+    def test_hidden(self) -> None:
+        """Tests that a hidden category can't be used until it's deleted"""
+        self.assertFalse(Category.objects.filter(name='food').exists())
+        with self.assertRaises(ValidationError):
+            Category(name='food').full_clean()
+
+    def test_command(self) -> None:
+        """Tests that the command finishes deletion of hidden categories"""
+        out = StringIO()
+        call_command('purge_categories', batch_size=20, stdout=out)
+
+        self.assertIn('Deleted category food', out.getvalue())
+        self.assertFalse(
+            Category.all_objects.filter(pk=self.category.pk).exists()
+        )
+        self.assertTrue(Category.objects.filter(name='transport').exists())
+
+
+class CategoryFormsTestCase(TestCase):
+    """Tests that hidden categories aren't offered by the forms"""
+
+    def test_search_form(self) -> None:
+        """Tests that expenses can't be searched by a hidden category"""
+        create_test_expenses()
+        category = get_category('necessary')
+        Category.objects.filter(pk=category.pk).hide()
+
+        form = ExpenseSearchForm({'categories': [category.pk]})
+        self.assertFalse(form.is_valid())
+
+    def test_expense_list(self) -> None:
+        """
+        Tests that expenses of a category, which is being purged,
+        are listed without a link to the detail page of the category
+        """
+        create_test_expenses()
+        category = get_category('necessary')
+        Category.objects.filter(pk=category.pk).hide()
+
+        response = self.client.get(reverse('expenses:expense-list'))
+        self.assertContains(response, 'necessary (being deleted)')
+        self.assertNotContains(
+            response,
+            reverse('expenses:category-detail', kwargs={'pk': category.pk}),
+        )
+        self.assertContains(
+            response,
+            reverse('expenses:category-detail', kwargs={
+                'pk': get_category('unnecessary').pk
+            }),
+        )
+
+    def test_expense_form(self) -> None:
+        """
+        Tests that an edited expense keeps its category, which is being
+        purged, but other expenses can't be moved to it
+        """
+        create_test_expenses()
+        category = get_category('necessary')
+        Category.objects.filter(pk=category.pk).hide()
+        expense = Expense.objects.get(name='jeans')
+        data = {
+            'category': category.pk, 'name': 'pants', 'amount': '1.00',
+            'date': '2020-05-08',
+        }
+
+        response = self.client.post(
+            reverse('expenses:expense-edit', kwargs={'pk': expense.pk}),
+            data,
+        )
+        self.assertEqual(response.status_code, 302)
+        expense.refresh_from_db()
+        self.assertEqual(expense.name, 'pants')
+        self.assertEqual(expense.category_id, category.pk)
+
+        other = Expense.objects.get(name='shirt')
+        self.assertFalse(ExpenseForm(data, instance=other).is_valid())
+        self.assertFalse(ExpenseForm(data).is_valid())
@@ -0,0 +1,159 @@
+import datetime
+import itertools
+import random
+import re
+import unittest
+from typing import Dict, Iterator, List
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..forms import ExpenseSearchForm
+from ..models import Category, Expense
+from ..report_cache import get_report_cache
+
+# Lines of the query plans, which read the expenses table or a whole
+# index of it, or sort the rows instead of reading them in order
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?expenses_expense\b')
+TEMP_SORT = re.compile(r'USE TEMP B-TREE')
+
+# Lines of a query plan, which find the expenses of a single day or
+# of a date range, or the ones of a name by the full-text index, so
+# sorting them costs as much as reading them
+BOUNDED_SEARCH = re.compile(
+    r'^SEARCH expenses_expense .*\bdate(?:=\?|>\? AND date<\?)'
+    r'|^SCAN expenses_expense_fts VIRTUAL TABLE'
+)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite query plans')
+class ExpenseListQueryPlansTestCase(TestCase):
+    """
+    Tests if the queries of the expenses list use indexes for every
+    combination of the filters, sorting, grouping and pagination
+    of ExpenseSearchForm, on data analyzed to resemble production
+    """
+    EXPENSE_LIST = reverse('expenses:expense-list')
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        """Creates expenses of many categories and days and analyzes them"""
+        rng = random.Random(0)
+        Category.objects.bulk_create(
+            Category(name=f'category {i:02}') for i in range(20)
+        )
+        categories = list(Category.objects.all())
+        start = datetime.date(2018, 1, 1)
+        Expense.objects.bulk_create(
+            Expense(
+                category=rng.choice(categories + [None]),
+                name=f'expense {i}', amount=rng.randint(1, 10000) / 100,
+                date=start + datetime.timedelta(days=rng.randrange(1000)),
+            )
+            for i in range(5000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        cls.categories = [str(category.pk) for category in categories]
+
+    def get_payloads(self) -> Iterator[Dict]:
+        """Yields parameters of the list for every combination"""
+        filters = [
+            {},
+            {'categories': self.categories[:1]},
+            {'categories': self.categories[:3]},
+            {'date': '2019-06-01'},
+            {'categories': self.categories[:3], 'date': '2019-06-01'},
+            {'date_from': '2019-01-01', 'date_to': '2019-03-31'},
+            {'categories': self.categories[:3], 'date_from': '2019-01-01'},
+            {'name': 'expense 12'},
+            {'categories': self.categories[:3], 'name': 'expense 12'},
+        ]
+        fields = ExpenseSearchForm.base_fields
+        for filter_params, sort_by, group_by, pagination in itertools.product(
+                filters,
+                [choice for choice, _ in fields['sort_by'].choices],
+                [choice for choice, _ in fields['group_by'].choices],
+                [choice for choice, _ in fields['pagination'].choices],
+        ):
+            yield {
+                **filter_params, 'sort_by': sort_by, 'group_by': group_by,
+                'pagination': pagination,
+            }
+
+    def get_plans(self, payload: Dict) -> Dict[str, List[str]]:
+        """
+        Returns plans of the queries of the expenses table, which are run
+        by the first and the next page of the list
+        """
+        queries = []
+        get_report_cache().clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.EXPENSE_LIST, payload)
+        queries += context.captured_queries
+        page = response.context['page_obj']
+        if page.has_next():
+            if payload['pagination'] == 'cursor':
+                next_payload = {**payload, 'cursor': page.next_cursor}
+            else:
+                next_payload = {**payload, 'page': 2}
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(self.EXPENSE_LIST, next_payload)
+            queries += context.captured_queries
+
+        plans = {}
+        with connection.cursor() as cursor:
+            for query in queries:
+                sql = query['sql']
+                if 'FROM "expenses_expense"' not in sql:
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plans[sql] = [row[3] for row in cursor.fetchall()]
+
+        return plans
+
+    @staticmethod
+    def is_page_read(sql: str, plan: List[str]) -> bool:
+        """
+        Checks if a query reads a page of the expenses in the order
+        of an index, so that the scan stops after the rows of the page
+        """
+        return ' LIMIT ' in sql and not any(
+            TEMP_SORT.search(line) for line in plan
+        )
+
+    def test_queries_indexed(self) -> None:
+        """Tests if no query reads the whole table or sorts the rows"""
+        for payload in self.get_payloads():
+            for sql, plan in self.get_plans(payload).items():
+                with self.subTest(payload=payload, sql=sql, plan=plan):
+                    if not self.is_page_read(sql, plan):
+                        self.assertFalse(
+                            any(FULL_SCAN.search(line) for line in plan)
+                        )
+                    if not any(BOUNDED_SEARCH.search(line) for line in plan):
+                        self.assertFalse(
+                            any(TEMP_SORT.search(line) for line in plan)
+                        )
+
+    def test_full_scan_detected(self) -> None:
+        """Tests if the suite notices a query, which can't use an index"""
+        queryset = Expense.objects.filter(name__endswith='1').order_by('?')
+        plan = [line.split(' ', 3)[3] for line in (
+            queryset.explain().splitlines()
+        )]
+        self.assertTrue(any(FULL_SCAN.search(line) for line in plan))
+        self.assertTrue(any(TEMP_SORT.search(line) for line in plan))
+
+    def test_index_scan_detected(self) -> None:
+        """Tests if the suite notices a query, which reads a whole index"""
+        queryset = Expense.objects.values_list('date', flat=True)
+        sql = str(queryset.query)
+        plan = [line.split(' ', 3)[3] for line in (
+            queryset.explain().splitlines()
+        )]
+        self.assertRegex(plan[0], r'USING (?:COVERING )?INDEX')
+        self.assertTrue(any(FULL_SCAN.search(line) for line in plan))
+        self.assertFalse(self.is_page_read(sql, plan))
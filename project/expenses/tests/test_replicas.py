@@ -0,0 +1,184 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import router
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from .utils import create_test_expenses
+from ..models import Category, Expense
+from ..replicas import ReplicaMiddleware, sync_replica, sync_replicas
+from ..routers import ReplicaRouter, reads_replicas, replica_reads
+
+# The replicas are disabled by default, the replica database of the tests
+# is a mirror of the default one
+REPLICAS = {'DATABASES': ['replica']}
+
+
+@override_settings(EXPENSES_REPLICAS=REPLICAS)
+class ReplicaRouterTestCase(TestCase):
+    """Tests for ReplicaRouter"""
+
+    def test_db_for_read(self) -> None:
+        """Tests that only the reads of the replica contexts go to replicas"""
+        self.assertEqual(Expense.objects.all().db, 'default')
+        # The replica is a test mirror of the default database
+        with replica_reads():
+            self.assertEqual(Expense.objects.all().db, 'default')
+
+    @override_settings(EXPENSES_REPLICAS={'DATABASES': ['archive']})
+    def test_db_for_read_replica(self) -> None:
+        """Tests that a replica, which isn't a mirror, is read"""
+        # Any database other than the default one stands for a replica
+        with replica_reads():
+            self.assertEqual(Expense.objects.all().db, 'archive')
+            with replica_reads(False):
+                self.assertEqual(Expense.objects.all().db, 'default')
+        self.assertEqual(Expense.objects.all().db, 'default')
+
+    def test_db_for_write(self) -> None:
+        """Tests that objects read from a replica are written to primary"""
+        category = Category(name='food')
+        category._state.db = 'replica'
+
+        self.assertEqual(
+            router.db_for_write(Category, instance=category), 'default'
+        )
+
+    def test_allow_relation(self) -> None:
+        """Tests that objects of the primary and replicas can be related"""
+        category = Category(name='food')
+        category._state.db = 'replica'
+        expense = Expense(name='lunch')
+        expense._state.db = 'default'
+
+        self.assertTrue(router.allow_relation(category, expense))
+
+    def test_allow_migrate(self) -> None:
+        """Tests that the replicas aren't migrated"""
+        replica_router = ReplicaRouter()
+
+        self.assertFalse(
+            replica_router.allow_migrate('replica', 'expenses', 'expense')
+        )
+        self.assertIsNone(
+            replica_router.allow_migrate('default', 'expenses', 'expense')
+        )
+
+
+@override_settings(EXPENSES_REPLICAS=REPLICAS)
+class ReplicaMiddlewareTestCase(TestCase):
+    """Tests for ReplicaMiddleware"""
+
+    def setUp(self) -> None:
+        """Set up for the ReplicaMiddleware tests"""
+        self.factory = RequestFactory()
+        self.reads = []
+
+        def get_response(request) -> HttpResponse:
+            """Records where the view reads"""
+            self.reads.append(reads_replicas())
+            return HttpResponse(status=int(request.GET.get('status', 200)))
+
+        self.middleware = ReplicaMiddleware(get_response)
+
+    def test_get(self) -> None:
+        """Tests that the read-only requests read the replicas"""
+        response = self.middleware(self.factory.get('/'))
+
+        self.assertEqual(self.reads, [True])
+        self.assertNotIn('expenses_primary', response.cookies)
+        self.assertFalse(reads_replicas())
+
+    def test_post(self) -> None:
+        """Tests that a write reads the primary and pins the client to it"""
+        response = self.middleware(self.factory.post('/'))
+
+        self.assertEqual(self.reads, [False])
+        self.assertEqual(response.cookies['expenses_primary']['max-age'], 10)
+
+    def test_failed_post(self) -> None:
+        """Tests that a failed write doesn't pin the client"""
+        response = self.middleware(self.factory.post('/?status=400'))
+
+        self.assertNotIn('expenses_primary', response.cookies)
+
+    def test_sticky(self) -> None:
+        """Tests that a pinned client reads the primary"""
+        request = self.factory.get('/')
+        request.COOKIES['expenses_primary'] = '1'
+        self.middleware(request)
+
+        self.assertEqual(self.reads, [False])
+
+    def test_streaming(self) -> None:
+        """Tests that the streamed content is produced reading replicas"""
+        def get_response(request) -> StreamingHttpResponse:
+            """Streams where the chunks are read"""
+            return StreamingHttpResponse(
+                str(reads_replicas()) for _ in range(2)
+            )
+
+        response = ReplicaMiddleware(get_response)(self.factory.get('/'))
+
+        self.assertEqual(b''.join(response.streaming_content), b'TrueTrue')
+
+    @override_settings(EXPENSES_REPLICAS={'DATABASES': []})
+    def test_no_replicas(self) -> None:
+        """Tests that the middleware is removed without replicas"""
+        response = self.client.get(reverse('expenses:expense-list'))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_redirect_after_post(self) -> None:
+        """Tests that the redirect after a POST is pinned to the primary"""
+        create_test_expenses()
+        response = self.client.post(
+            reverse('expenses:category-create'), {'name': 'category'},
+            follow=True,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('expenses_primary', self.client.cookies)
+        self.assertTrue(Category.objects.filter(name='category').exists())
+
+
+class SyncReplicasTestCase(TestCase):
+    """Tests for the copying of the primary database to the replicas"""
+
+    def test_sync_replica(self) -> None:
+        """Tests that a SQLite database is copied to a replica"""
+        with tempfile.TemporaryDirectory() as directory:
+            connections = ConnectionHandler({
+                alias: {
+                    'ENGINE': 'django.db.backends.sqlite3',
+                    'NAME': os.path.join(directory, f'{alias}.sqlite3'),
+                }
+                for alias in ('default', 'replica')
+            })
+            with connections['default'].cursor() as cursor:
+                cursor.execute('CREATE TABLE t (x integer)')
+                cursor.execute('INSERT INTO t VALUES (1)')
+            connections['default'].commit()
+
+            sync_replica(connections['default'], connections['replica'])
+
+            with connections['replica'].cursor() as cursor:
+                cursor.execute('SELECT x FROM t')
+                self.assertEqual(cursor.fetchall(), [(1,)])
+            connections.close_all()
+
+    def test_sync_mirror(self) -> None:
+        """Tests that the test mirror of the primary isn't copied"""
+        self.assertEqual(sync_replicas(), [])
+
+    def test_command(self) -> None:
+        """Tests that the command reports the synced replicas"""
+        out = StringIO()
+        call_command('sync_replicas', stdout=out)
+
+        self.assertIn('Synced 0 replicas', out.getvalue())
@@ -0,0 +1,112 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .utils import create_test_expenses, get_category
+from ..models import DataVersion, Expense
+from ..report_cache import (
+    LRUReportCache, ReportCache, get_report, get_report_cache,
+)
+from ..reports import Report, build_report
+
+
+def make_report(count: int) -> Report:
+    """Returns an empty report with a given count"""
+    return Report(count, 0, {}, {})
+
+
+class LRUReportCacheTestCase(TestCase):
+    """Tests for LRUReportCache"""
+
+    def test_set_least_recently_used_evicted(self) -> None:
+        """Tests if the least recently used report is evicted"""
+        cache = LRUReportCache(max_size=2)
+        cache.set('a', make_report(1))
+        cache.set('b', make_report(2))
+        cache.get('a')
+        cache.set('c', make_report(3))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a').count, 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_get_or_build_counted(self) -> None:
+        """Tests if hits and misses are counted"""
+        cache = LRUReportCache()
+        for _ in range(3):
+            cache.get_or_build('a', lambda: make_report(1))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertAlmostEqual(stats['hit_ratio'], 2 / 3)
+
+    def test_base_abstract(self) -> None:
+        """Tests that a cache has to implement getting and setting"""
+        with self.assertRaises(TypeError):
+            ReportCache()
+
+
+class GetReportTestCase(TestCase):
+    """Tests for get_report"""
+
+    def setUp(self) -> None:
+        """Set up for the get_report tests"""
+        create_test_expenses()
+        get_report_cache().clear()
+        self.queryset = Expense.objects.filter(
+            category=get_category('necessary')
+        )
+        self.params = {'categories': [get_category('necessary')]}
+
+    def test_get_report_cached(self) -> None:
+        """Tests if a report is cached for the same data version"""
+        version = DataVersion.get().stamp
+        report = get_report(self.queryset, self.params, version)
+        self.assertEqual(report, build_report(self.queryset))
+        with self.assertNumQueries(0):
+            get_report(
+                self.queryset, {**self.params, 'sort_by': 'date: asc'},
+                version
+            )
+
+    def test_get_report_invalidated(self) -> None:
+        """Tests if a write makes the cached report stale"""
+        get_report(self.queryset, self.params, DataVersion.get().stamp)
+        Expense.objects.create(
+            category=get_category('necessary'), name='shoes', amount=1
+        )
+        report = get_report(
+            self.queryset, self.params, DataVersion.get().stamp
+        )
+        self.assertEqual(report.count, 2)
+
+    @override_settings(EXPENSES_REPORT_CACHE={
+        'BACKEND': 'expenses.report_cache.DjangoReportCache',
+        'OPTIONS': {'alias': 'default'},
+    })
+    def test_get_report_django_cache(self) -> None:
+        """Tests if reports can be stored in a Django cache"""
+        get_report_cache().clear()
+        version = DataVersion.get().stamp
+        report = get_report(self.queryset, self.params, version)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_report(self.queryset, self.params, version), report
+            )
+        self.assertEqual(get_report_cache().stats()['hits'], 1)
+
+    def test_expense_list_cached(self) -> None:
+        """Tests if the expenses list reuses a cached report"""
+        url = reverse('expenses:expense-list')
+        self.client.get(url, {'items_per_page': 1})
+        self.client.get(url, {'items_per_page': 2})
+        self.assertEqual(get_report_cache().stats()['hits'], 1)
+
+    def test_stats_view(self) -> None:
+        """Tests if the counters of the cache are returned as JSON"""
+        url = reverse('expenses:expense-list')
+        self.client.get(url, {'items_per_page': 1})
+        self.client.get(url, {'items_per_page': 2})
+        response = self.client.get(reverse('expenses:report-cache-stats'))
+        self.assertEqual(response.json(), {
+            'hits': 1, 'misses': 1, 'evictions': 0, 'hit_ratio': 0.5,
+            'size': 1,
+        })
@@ -1,10 +1,19 @@
+from datetime import date
 from decimal import Decimal, ROUND_HALF_UP
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-from .utils import create_test_expenses
+from .utils import create_test_expenses, get_category
 from ..models import Expense
-from ..reports import summary_overall
+from ..reports import (
+    build_report,
+    daily_report,
+    summary_overall,
+    summary_per_category,
+    summary_per_year_month,
+)
 
 
 class ReportsTestCase(TestCase):
@@ -22,3 +31,85 @@ class ReportsTestCase(TestCase):
             result['overall'],
             Decimal(150.55).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
         )
+
+    def test_build_report_single_query(self) -> None:
+        """Tests if build_report computes all summaries with one query"""
+        queryset = Expense.objects.all()
+        with self.assertNumQueries(1):
+            report = build_report(queryset)
+        self.assertEqual(report.count, 2)
+        self.assertEqual(report.overall, summary_overall(queryset)['overall'])
+
+    def test_summary_per_category(self) -> None:
+        """Tests if summary_per_category sums expenses per category name"""
+        result = summary_per_category(Expense.objects.all())
+        self.assertEqual(list(result), ['necessary', 'unnecessary'])
+        self.assertEqual(result['necessary'], Decimal('100.15'))
+
+    def test_summary_per_year_month(self) -> None:
+        """Tests if summary_per_year_month sums expenses per month"""
+        result = summary_per_year_month(Expense.objects.all())
+        self.assertEqual(dict(result), {date(2020, 5, 1): Decimal('150.55')})
+
+    def test_build_report_empty_queryset(self) -> None:
+        """Tests if build_report returns empty summaries for no expenses"""
+        report = build_report(Expense.objects.none())
+        self.assertEqual(report.count, 0)
+        self.assertEqual(report.overall, 0)
+        self.assertFalse(report.per_category)
+
+
+class DailyReportTestCase(TestCase):
+    """Tests for the reports of date ranges read from the daily rollups"""
+
+    def setUp(self) -> None:
+        """Set up for the daily reports tests"""
+        create_test_expenses()
+        Expense.objects.create(
+            name='gift', amount=Decimal('7.25'), date=date(2020, 6, 1)
+        )
+
+    def test_daily_report_matches_expenses(self) -> None:
+        """Tests if daily_report matches a report of the expenses"""
+        for date_from, date_to, categories in (
+                (date(2020, 5, 5), None, None),
+                (None, date(2020, 5, 31), [get_category('necessary')]),
+                (date(2020, 5, 1), date(2020, 6, 30), None),
+        ):
+            queryset = Expense.objects.all()
+            if date_from:
+                queryset = queryset.filter(date__gte=date_from)
+            if date_to:
+                queryset = queryset.filter(date__lte=date_to)
+            if categories:
+                queryset = queryset.filter(category__in=categories)
+            with self.subTest(date_from=date_from, date_to=date_to):
+                self.assertEqual(
+                    daily_report(date_from, date_to, categories),
+                    build_report(queryset),
+                )
+
+    def test_build_report_date_range_daily_rollups_read(self) -> None:
+        """
+        Tests if build_report reads a date range, also intersected with
+        a single date, from the daily rollups
+        """
+        params = {'date': date(2020, 5, 8), 'date_from': date(2020, 5, 1)}
+        queryset = Expense.objects.filter(date=date(2020, 5, 8))
+        with CaptureQueriesContext(connection) as context:
+            report = build_report(queryset, params)
+        self.assertEqual(report.overall, Decimal('100.15'))
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertIn(
+            'expenses_expensedailyrollup', context.captured_queries[0]['sql']
+        )
+
+    def test_build_report_name_search_expenses_read(self) -> None:
+        """Tests if searched expenses aren't read from the daily rollups"""
+        params = {'name': 'gift', 'date_from': date(2020, 5, 1)}
+        queryset = Expense.objects.filter(
+            name='gift', date__gte=date(2020, 5, 1)
+        )
+        report = build_report(queryset, params)
+        self.assertEqual(report.count, 1)
+        self.assertEqual(report.overall, Decimal('7.25'))
@@ -0,0 +1,363 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import F, Subquery
+from django.test import TestCase
+
+from .utils import create_test_expenses, get_category
+from ..models import Category, Expense, ExpenseDailyRollup, ExpenseRollup
+from ..reports import rollup_report
+from ..rollups import verify
+
+
+class RollupsTestCase(TestCase):
+    """Tests for maintaining the expenses rollups"""
+
+    def setUp(self) -> None:
+        """Set up for the rollups tests"""
+        create_test_expenses()
+
+    def get_rollup(self, name: str, year_month: date) -> ExpenseRollup:
+        """Returns a rollup of a category with a given name"""
+        return ExpenseRollup.objects.get(
+            category=get_category(name), year_month=year_month
+        )
+
+    def test_bulk_create_rollups_created(self) -> None:
+        """Tests if bulk_create adds expenses to the rollups"""
+        rollup = self.get_rollup('necessary', date(2020, 5, 1))
+        self.assertEqual(rollup.total, Decimal('100.15'))
+        self.assertEqual(rollup.count, 1)
+        self.assertEqual(verify(), [])
+
+    def test_save_new_expense_rollup_updated(self) -> None:
+        """Tests if saving a new expense adds it to the rollup"""
+        Expense.objects.create(
+            category=get_category('necessary'), name='shoes',
+            amount=Decimal('9.85'), date=date(2020, 5, 20),
+        )
+        rollup = self.get_rollup('necessary', date(2020, 5, 1))
+        self.assertEqual(rollup.total, Decimal('110.00'))
+        self.assertEqual(rollup.count, 2)
+
+    def test_save_changed_expense_rollups_updated(self) -> None:
+        """
+        Tests if changing category, date and amount of an expense
+        moves it between the rollups
+        """
+        expense = Expense.objects.get(name='jeans')
+        expense.category = get_category('unnecessary')
+        expense.date = date(2020, 6, 2)
+        expense.amount = Decimal('1.00')
+        expense.save()
+        self.assertFalse(
+            ExpenseRollup.objects.filter(
+                category=get_category('necessary')
+            ).exists()
+        )
+        rollup = self.get_rollup('unnecessary', date(2020, 6, 1))
+        self.assertEqual(rollup.total, Decimal('1.00'))
+        self.assertEqual(verify(), [])
+
+    def test_queryset_update_rollups_updated(self) -> None:
+        """Tests if QuerySet.update moves expenses between the rollups"""
+        Expense.objects.update(category=get_category('necessary'))
+        rollup = self.get_rollup('necessary', date(2020, 5, 1))
+        self.assertEqual(rollup.total, Decimal('150.55'))
+        self.assertEqual(rollup.count, 2)
+        self.assertEqual(verify(), [])
+
+    def test_delete_rollups_updated(self) -> None:
+        """Tests if deleting expenses removes them from the rollups"""
+        Expense.objects.get(name='jeans').delete()
+        Expense.objects.filter(name='shirt').delete()
+        self.assertFalse(ExpenseRollup.objects.exists())
+        self.assertEqual(rollup_report().count, 0)
+
+    def test_rollup_report_of_category(self) -> None:
+        """Tests if rollup_report returns summaries of a given category"""
+        report = rollup_report(get_category('unnecessary'))
+        self.assertEqual(report.overall, Decimal('50.40'))
+        self.assertEqual(list(report.per_category), ['unnecessary'])
+
+
+class DailyRollupsTestCase(TestCase):
+    """Tests for maintaining the daily rollups of the expenses"""
+
+    def setUp(self) -> None:
+        """Set up for the daily rollups tests"""
+        create_test_expenses()
+
+    def get_days(self) -> dict:
+        """Returns (category name, date): (total, count) of the rollups"""
+        return {
+            (name, day): (total, count)
+            for name, day, total, count in (
+                ExpenseDailyRollup.objects.values_list(
+                    'category__name', 'date', 'total', 'count'
+                )
+            )
+        }
+
+    def test_bulk_create_daily_rollups_created(self) -> None:
+        """Tests if created expenses are added to the rollups of days"""
+        self.assertEqual(self.get_days(), {
+            ('unnecessary', date(2020, 5, 4)): (Decimal('50.40'), 1),
+            ('necessary', date(2020, 5, 8)): (Decimal('100.15'), 1),
+        })
+
+    def test_save_moved_expense_daily_rollups_updated(self) -> None:
+        """
+        Tests if moving an expense to another day of the same month
+        moves it between the daily rollups
+        """
+        expense = Expense.objects.get(name='jeans')
+        expense.date = date(2020, 5, 9)
+        expense.save()
+        self.assertIn(('necessary', date(2020, 5, 9)), self.get_days())
+        self.assertNotIn(('necessary', date(2020, 5, 8)), self.get_days())
+        self.assertEqual(verify(), [])
+
+    def test_create_uncategorized_expenses_single_rollup(self) -> None:
+        """
+        Tests if expenses without a category, created on the same day
+        separately, are added to a single rollup
+        """
+        for amount in (Decimal('1.10'), Decimal('2.20')):
+            Expense.objects.create(
+                name='gift', amount=amount, date=date(2020, 5, 4)
+            )
+        self.assertEqual(
+            self.get_days()[None, date(2020, 5, 4)], (Decimal('3.30'), 2)
+        )
+        self.assertEqual(verify(), [])
+
+    def test_delete_daily_rollups_removed(self) -> None:
+        """Tests if deleting expenses removes the rollups of their days"""
+        Expense.objects.filter(name='shirt').delete()
+        self.assertEqual(list(self.get_days()), [
+            ('necessary', date(2020, 5, 8)),
+        ])
+
+    def test_verify_outdated_daily_rollup(self) -> None:
+        """Tests if verify reports an outdated daily rollup"""
+        ExpenseDailyRollup.objects.filter(date=date(2020, 5, 4)).update(
+            total=1
+        )
+        self.assertEqual(len(verify()), 1)
+        call_command('rebuild_rollups', stdout=StringIO())
+        self.assertEqual(verify(), [])
+
+
+class CategoryExpensesCountTestCase(TestCase):
+    """Tests for maintaining the categories expenses counters"""
+
+    def setUp(self) -> None:
+        """Set up for the categories expenses counters tests"""
+        create_test_expenses()
+
+    def assertExpensesCount(self, name: str, count: int) -> None:
+        """Asserts that a category with a given name has count expenses"""
+        self.assertEqual(get_category(name).expenses_count, count)
+
+    def test_create_expense_counter_increased(self) -> None:
+        """Tests if creating an expense increases the counter"""
+        Expense.objects.create(
+            category=get_category('necessary'), name='shoes', amount=1
+        )
+        self.assertExpensesCount('necessary', 2)
+
+    def test_reassign_expense_counters_updated(self) -> None:
+        """Tests if changing category of an expense moves the counter"""
+        expense = Expense.objects.get(name='jeans')
+        expense.category = get_category('unnecessary')
+        expense.save()
+        self.assertExpensesCount('necessary', 0)
+        self.assertExpensesCount('unnecessary', 2)
+
+    def test_update_amount_counter_unchanged(self) -> None:
+        """Tests if changing amount of an expense keeps the counter"""
+        Expense.objects.filter(name='jeans').update(amount=1)
+        self.assertExpensesCount('necessary', 1)
+
+    def test_bulk_update_counters_updated(self) -> None:
+        """Tests if bulk_update moves expenses between counters once"""
+        expenses = list(Expense.objects.all())
+        for expense in expenses:
+            expense.category = get_category('unnecessary')
+        Expense.objects.bulk_update(expenses, ['category'])
+        self.assertExpensesCount('necessary', 0)
+        self.assertExpensesCount('unnecessary', 2)
+        self.assertEqual(verify(), [])
+
+    def test_delete_expense_counter_decreased(self) -> None:
+        """Tests if deleting an expense decreases the counter"""
+        Expense.objects.get(name='shirt').delete()
+        self.assertExpensesCount('unnecessary', 0)
+
+    def test_with_expenses_amount_matches_counter(self) -> None:
+        """Tests if the annotated fallback matches the counters"""
+        for category in Category.objects.with_expenses_amount():
+            self.assertEqual(category.expenses_amount, category.expenses_count)
+
+    def test_verify_outdated_counter(self) -> None:
+        """Tests if verify reports an outdated counter"""
+        Category.objects.filter(name='necessary').update(expenses_count=5)
+        self.assertEqual(len(verify()), 1)
+
+
+class ExpenseYearMonthTestCase(TestCase):
+    """Tests for maintaining the year-months of the expenses"""
+
+    def setUp(self) -> None:
+        """Set up for the year-month tests"""
+        create_test_expenses()
+
+    def get_year_months(self) -> set:
+        """Returns year-months of all expenses"""
+        return set(Expense.objects.values_list('year_month', flat=True))
+
+    def test_bulk_create_year_month_set(self) -> None:
+        """Tests if created expenses get year-months of their dates"""
+        self.assertEqual(self.get_year_months(), {date(2020, 5, 1)})
+
+    def test_save_year_month_set(self) -> None:
+        """Tests if saving a moved expense updates its year-month"""
+        expense = Expense.objects.get(name='shirt')
+        expense.date = '2020-07-15'
+        expense.save()
+        expense.refresh_from_db()
+        self.assertEqual(expense.year_month, date(2020, 7, 1))
+
+    def test_queryset_update_year_month_set(self) -> None:
+        """Tests if updating dates (also with expressions) is followed"""
+        Expense.objects.update(date=date(2020, 8, 31))
+        self.assertEqual(self.get_year_months(), {date(2020, 8, 1)})
+        Expense.objects.update(date=F('date'))
+        self.assertEqual(self.get_year_months(), {date(2020, 8, 1)})
+
+    def test_bulk_update_year_month_set(self) -> None:
+        """Tests if updating dates with bulk_update is followed"""
+        expenses = list(Expense.objects.all())
+        for expense in expenses:
+            expense.date = date(2021, 1, 2)
+        Expense.objects.bulk_update(expenses, ['date'])
+        self.assertEqual(self.get_year_months(), {date(2021, 1, 1)})
+
+    def test_rebuild_stale_year_month_fixed(self) -> None:
+        """Tests if the rebuild fixes year-months changed behind its back"""
+        Expense._base_manager.update(year_month=date(2000, 1, 1))
+        errors = verify()
+        self.assertEqual(
+            len([e for e in errors if e.startswith('expense')]), 2
+        )
+        call_command('rebuild_rollups', stdout=StringIO())
+        self.assertEqual(self.get_year_months(), {date(2020, 5, 1)})
+        self.assertEqual(verify(), [])
+
+
+class ExpenseCategoryNameTestCase(TestCase):
+    """Tests for maintaining the category names copied to the expenses"""
+
+    def setUp(self) -> None:
+        """Set up for the category name tests"""
+        create_test_expenses()
+
+    def get_category_names(self) -> dict:
+        """Returns the copied category names of the expenses by names"""
+        return dict(Expense.objects.values_list('name', 'category_name'))
+
+    def test_bulk_create_category_name_set(self) -> None:
+        """Tests if created expenses get names of their categories"""
+        self.assertEqual(
+            self.get_category_names(),
+            {'shirt': 'unnecessary', 'jeans': 'necessary'},
+        )
+
+    def test_save_category_name_set(self) -> None:
+        """Tests if saving an expense copies the name of its category"""
+        Expense.objects.create(
+            category=get_category('necessary'), name='shoes',
+            amount=Decimal('9.85'), date=date(2020, 5, 20),
+        )
+        expense = Expense.objects.get(name='shirt')
+        expense.category = None
+        expense.save()
+        self.assertEqual(
+            self.get_category_names(),
+            {'shirt': None, 'jeans': 'necessary', 'shoes': 'necessary'},
+        )
+
+    def test_update_category_name_set(self) -> None:
+        """Tests if moving the expenses copies the new category name"""
+        Expense.objects.update(category=get_category('necessary'))
+        self.assertEqual(
+            set(self.get_category_names().values()), {'necessary'}
+        )
+        Expense.objects.update(
+            category=Subquery(
+                Category.objects.filter(name='unnecessary').values('pk')
+            )
+        )
+        self.assertEqual(
+            set(self.get_category_names().values()), {'unnecessary'}
+        )
+
+    def test_rename_category_name_updated(self) -> None:
+        """Tests if renaming the categories renames their expenses"""
+        category = get_category('necessary')
+        category.name = 'needed'
+        category.save()
+        Category.objects.filter(name='unnecessary').update(name='extra')
+        self.assertEqual(
+            self.get_category_names(), {'shirt': 'extra', 'jeans': 'needed'}
+        )
+
+    def test_rebuild_stale_category_name_fixed(self) -> None:
+        """Tests if the rebuild fixes names changed behind its back"""
+        Expense._base_manager.filter(name='shirt').update(category_name=None)
+        Expense._base_manager.filter(name='jeans').update(category_name='x')
+        Expense.objects.create(name='shoes', amount=1, date=date(2020, 5, 1))
+        Expense._base_manager.filter(name='shoes').update(category_name='y')
+        self.assertEqual(
+            sorted(e for e in verify() if e.startswith('expense')),
+            [
+                "expense 1: expected category name 'unnecessary', "
+                "found None",
+                "expense 2: expected category name 'necessary', found 'x'",
+                "expense 3: expected category name None, found 'y'",
+            ],
+        )
+        call_command('rebuild_rollups', stdout=StringIO())
+        self.assertEqual(
+            self.get_category_names(),
+            {'shirt': 'unnecessary', 'jeans': 'necessary', 'shoes': None},
+        )
+        self.assertEqual(verify(), [])
+
+
+class RebuildRollupsCommandTestCase(TestCase):
+    """Tests for the rebuild_rollups command"""
+
+    def setUp(self) -> None:
+        """Set up for the rebuild_rollups command tests"""
+        create_test_expenses()
+        ExpenseRollup.objects.all().delete()
+
+    def test_verify_only_outdated_rollups(self) -> None:
+        """Tests if the command fails when the rollups are out of date"""
+        with self.assertRaises(CommandError):
+            call_command(
+                'rebuild_rollups', verify_only=True,
+                stdout=StringIO(), stderr=StringIO(),
+            )
+
+    def test_rebuild_rollups_rebuilt(self) -> None:
+        """Tests if the command rebuilds the rollups and the counters"""
+        Category.objects.update(expenses_count=0)
+        call_command('rebuild_rollups', stdout=StringIO())
+        self.assertEqual(ExpenseRollup.objects.count(), 2)
+        self.assertEqual(verify(), [])
@@ -0,0 +1,81 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from .utils import create_test_expenses
+from ..models import Category, Expense
+from ..search import search
+
+
+class SearchTestCase(TestCase):
+    """Tests for searching expenses and categories by name"""
+
+    def setUp(self) -> None:
+        """Set up for the search tests"""
+        create_test_expenses()
+
+    def assertFound(self, queryset, term: str, names) -> None:
+        """Asserts that searching a queryset for a term finds given names"""
+        self.assertEqual(
+            sorted(obj.name for obj in search(queryset, term)), sorted(names)
+        )
+
+    def test_search_substring(self) -> None:
+        """Tests if search finds names containing a term in any case"""
+        self.assertFound(Expense.objects.all(), 'HIR', ['shirt'])
+        self.assertFound(
+            Category.objects.all(), 'nec', ['necessary', 'unnecessary']
+        )
+
+    def test_search_uses_index(self) -> None:
+        """Tests if search looks up names in the FTS5 table"""
+        sql = str(search(Expense.objects.all(), 'shirt').query)
+        self.assertIn('expenses_expense_fts MATCH', sql)
+
+    def test_search_short_term(self) -> None:
+        """Tests if terms too short for trigrams are searched with LIKE"""
+        self.assertFound(Expense.objects.all(), 'ea', ['jeans'])
+
+    def test_search_quotes_escaped(self) -> None:
+        """Tests if quotes in a term don't break the FTS5 query"""
+        self.assertFound(Expense.objects.all(), '"shirt', [])
+
+    def test_search_synced_on_writes(self) -> None:
+        """Tests if created, renamed and deleted objects are searchable"""
+        Expense.objects.create(name='t-shirt', amount=1)
+        Expense.objects.filter(name='jeans').update(name='shorts')
+        Category.objects.filter(name='necessary').update(name='needed')
+        self.assertFound(Expense.objects.all(), 'shirt', ['shirt', 't-shirt'])
+        self.assertFound(Expense.objects.all(), 'jeans', [])
+        self.assertFound(Expense.objects.all(), 'short', ['shorts'])
+        self.assertFound(Category.objects.all(), 'necessary', ['unnecessary'])
+
+        Expense.objects.filter(name='shorts').delete()
+        self.assertFound(Expense.objects.all(), 'short', [])
+
+    @override_settings(
+        EXPENSES_SEARCH_BACKEND='expenses.search.IContainsSearchBackend'
+    )
+    def test_search_icontains_backend(self) -> None:
+        """Tests if the search backend can be changed in the settings"""
+        sql = str(search(Expense.objects.all(), 'shirt').query)
+        self.assertIn('LIKE', sql)
+
+
+class RebuildSearchIndexCommandTestCase(TestCase):
+    """Tests for the rebuild_search_index command"""
+
+    def test_rebuild_search_index(self) -> None:
+        """Tests if the command indexes names missing from the index"""
+        create_test_expenses()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO expenses_expense_fts(expenses_expense_fts) "
+                "VALUES ('delete-all')"
+            )
+        self.assertFalse(search(Expense.objects.all(), 'shirt').exists())
+
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertTrue(search(Expense.objects.all(), 'shirt').exists())
@@ -0,0 +1,85 @@
+import os
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.utils import ConnectionHandler
+from django.test import TestCase
+
+from ..backends.sqlite3.base import DatabaseWrapper
+from ..concurrency import STOCK_PROFILE, run_concurrency_benchmark
+from ..models import Expense
+
+
+def get_pragma(name: str, conn=connection):
+    """Returns value of a pragma of a connection"""
+    with conn.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+class SQLiteBackendTestCase(TestCase):
+    """Tests for the SQLite backend, which sets up its connections"""
+
+    def test_pragmas(self) -> None:
+        """Tests that the pragmas are run on the connections"""
+        self.assertEqual(get_pragma('busy_timeout'), 5000)
+        self.assertEqual(get_pragma('synchronous'), 1)
+        self.assertEqual(get_pragma('temp_store'), 2)
+        self.assertEqual(get_pragma('cache_size'), -20000)
+
+    def test_wal(self) -> None:
+        """Tests that a database file is switched to the WAL journal"""
+        with tempfile.TemporaryDirectory() as directory:
+            connections = ConnectionHandler({'default': {
+                'ENGINE': 'expenses.backends.sqlite3',
+                'NAME': os.path.join(directory, 'db.sqlite3'),
+                'OPTIONS': {'pragmas': {'cache_size': -1000}},
+            }})
+            try:
+                self.assertEqual(
+                    get_pragma('journal_mode', connections['default']), 'wal'
+                )
+                self.assertEqual(
+                    get_pragma('cache_size', connections['default']), -1000
+                )
+            finally:
+                connections.close_all()
+
+    def test_transaction_mode(self) -> None:
+        """Tests that the transactions begin in the configured mode"""
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+        self.assertNotIn(
+            'transaction_mode', connection.get_connection_params()
+        )
+
+        with self.assertRaises(ImproperlyConfigured):
+            DatabaseWrapper({
+                **connection.settings_dict,
+                'OPTIONS': {'transaction_mode': 'LAZY'},
+            })
+
+
+class ConcurrencyBenchmarkTestCase(TestCase):
+    """Tests for the concurrency benchmark"""
+
+    def test_run_concurrency_benchmark(self) -> None:
+        """Tests that every profile is measured on its own database"""
+        Expense.objects.create(name='kept', amount=1, date='2020-01-01')
+        report = run_concurrency_benchmark(
+            2, 1, 0.2, profiles={
+                'stock': STOCK_PROFILE,
+                'configured': {'ENGINE': 'expenses.backends.sqlite3'},
+            },
+        )
+
+        results = report['results']
+        self.assertEqual(
+            [result['profile'] for result in results],
+            ['stock', 'configured'],
+        )
+        for result in results:
+            self.assertGreater(result['writes'] + result['write_errors'], 0)
+            self.assertGreater(result['reads'], 0)
+        self.assertEqual(results[1]['write_errors'], 0)
+        self.assertEqual(Expense.objects.get().name, 'kept')
@@ -0,0 +1,131 @@
+import datetime
+from decimal import Decimal
+
+import numpy as np
+from django.test import TestCase
+
+from ..models import Category, Expense
+from ..statistics import BINS, build_statistics, read_columns
+from ..synthetic import ExpenseGenerator
+
+# The percentiles are rounded to cents
+HALF_CENT = 0.0051
+
+
+class StatisticsTestCase(TestCase):
+    """Tests for the statistics of the amounts of the expenses"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        """Creates expenses of several categories and months"""
+        ExpenseGenerator(
+            categories=4, days=90, end=datetime.date(2021, 3, 31),
+            uncategorized=0.1, seed=3,
+        ).generate(400)
+
+    @staticmethod
+    def get_amounts(queryset) -> np.ndarray:
+        """Returns amounts (in cents) of a queryset"""
+        return np.array([
+            int(amount * 100)
+            for amount in queryset.values_list('amount', flat=True)
+        ])
+
+    def assertDistribution(self, value: dict, amounts: np.ndarray,
+                           edges: np.ndarray) -> None:
+        """
+        Asserts that a distribution matches one computed by NumPy,
+        from amounts in cents
+        """
+        median, p90, p99 = np.percentile(amounts, [50, 90, 99]) / 100
+        self.assertEqual(value['count'], len(amounts))
+        self.assertAlmostEqual(float(value['median']), median, delta=HALF_CENT)
+        self.assertAlmostEqual(float(value['p90']), p90, delta=HALF_CENT)
+        self.assertAlmostEqual(float(value['p99']), p99, delta=HALF_CENT)
+        self.assertEqual(
+            value['histogram'], np.histogram(amounts, edges)[0].tolist()
+        )
+
+    def test_build_statistics_matches_numpy(self) -> None:
+        """
+        Tests if the grouped percentiles and histograms match the ones
+        computed by NumPy for every group separately
+        """
+        statistics = build_statistics(Expense.objects.all())
+        amounts = self.get_amounts(Expense.objects.all())
+        edges = np.histogram_bin_edges(amounts, BINS)
+        self.assertEqual(statistics.count, 400)
+        self.assertEqual(len(statistics.edges), BINS + 1)
+        self.assertDistribution(statistics.overall, amounts, edges)
+
+        names = list(
+            Category.objects.order_by('name').values_list('name', flat=True)
+        )
+        self.assertEqual(list(statistics.per_category), names)
+        self.assertDistribution(
+            statistics.uncategorized,
+            self.get_amounts(Expense.objects.filter(category=None)),
+            edges,
+        )
+        for name in names:
+            with self.subTest(category=name):
+                self.assertDistribution(
+                    statistics.per_category[name],
+                    self.get_amounts(
+                        Expense.objects.filter(category__name=name)
+                    ),
+                    edges,
+                )
+
+        self.assertEqual(list(statistics.per_year_month), [
+            datetime.date(2021, month, 1) for month in (1, 2, 3)
+        ])
+        for year_month, value in statistics.per_year_month.items():
+            with self.subTest(year_month=year_month):
+                self.assertDistribution(
+                    value,
+                    self.get_amounts(
+                        Expense.objects.filter(year_month=year_month)
+                    ),
+                    edges,
+                )
+
+    def test_build_statistics_category_named_dash(self) -> None:
+        """
+        Tests if a category named like the label of the expenses without
+        a category is kept apart from them
+        """
+        category = Category.objects.create(name='-')
+        Expense.objects.create(category=category, name='dash', amount=1)
+        statistics = build_statistics(Expense.objects.all())
+
+        self.assertEqual(statistics.per_category['-']['count'], 1)
+        self.assertEqual(
+            statistics.uncategorized['count'],
+            Expense.objects.filter(category=None).count(),
+        )
+        self.assertEqual(
+            sum(value['count'] for value in statistics.per_category.values())
+            + statistics.uncategorized['count'],
+            statistics.count,
+        )
+
+    def test_read_columns_chunked(self) -> None:
+        """Tests if the columns don't depend on the size of the chunks"""
+        queryset = Expense.objects.filter(amount__gte=Decimal('5'))
+        columns = read_columns(queryset)
+        chunked = read_columns(queryset, chunk_size=7)
+        self.assertEqual(len(columns.amounts), queryset.count())
+        for column, chunked_column in zip(columns, chunked):
+            np.testing.assert_array_equal(column, chunked_column)
+
+    def test_build_statistics_empty_queryset(self) -> None:
+        """Tests if statistics of no expenses are empty"""
+        for queryset in (
+                Expense.objects.none(),
+                Expense.objects.filter(amount__lt=0),
+        ):
+            statistics = build_statistics(queryset)
+            self.assertEqual(statistics.count, 0)
+            self.assertFalse(statistics.per_category)
+            self.assertIsNone(statistics.uncategorized)
@@ -0,0 +1,72 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .utils import create_test_expenses, get_category
+from ..report_cache import get_report_cache
+
+
+def get_metrics(header: str) -> dict:
+    """Returns durations of the metrics of a Server-Timing header"""
+    metrics = {}
+    for metric in header.split(', '):
+        name, duration = metric.split(';')[:2]
+        metrics[name] = float(duration[len('dur='):])
+
+    return metrics
+
+
+class TimingMiddlewareTestCase(TestCase):
+    """Tests for TimingMiddleware"""
+
+    def setUp(self) -> None:
+        """Set up for the TimingMiddleware tests"""
+        create_test_expenses()
+        get_report_cache().clear()
+
+    def get_list(self):
+        """Returns the expenses list filtered by a category"""
+        return self.client.get(
+            reverse('expenses:expense-list'),
+            {'categories': get_category('necessary').pk},
+        )
+
+    def test_server_timing(self) -> None:
+        """Tests that the queries, reports and rendering are measured"""
+        metrics = get_metrics(self.get_list()['Server-Timing'])
+
+        self.assertGreater(metrics['db'], 0)
+        self.assertGreater(metrics['tpl'], 0)
+        self.assertIn('reports.build_report', metrics)
+        self.assertGreaterEqual(
+            metrics['total'], metrics['tpl'] + metrics['reports.build_report']
+        )
+
+    def test_log(self) -> None:
+        """Tests that the timings are logged as JSON"""
+        with self.assertLogs('expenses.timing', 'INFO') as logs:
+            self.get_list()
+
+        data = json.loads(logs.records[0].getMessage())
+        self.assertEqual(data['path'], reverse('expenses:expense-list'))
+        self.assertEqual(data['status'], 200)
+        self.assertGreater(data['queries'], 0)
+        self.assertEqual(data['functions']['reports.build_report']['calls'], 1)
+        self.assertNotIn('slow_queries', data)
+
+    @override_settings(EXPENSES_TIMING={'SLOW_QUERIES': 2})
+    def test_slow_queries(self) -> None:
+        """Tests that the slowest queries are logged when it's enabled"""
+        with self.assertLogs('expenses.timing', 'INFO') as logs:
+            self.get_list()
+
+        queries = json.loads(logs.records[0].getMessage())['slow_queries']
+        self.assertEqual(len(queries), 2)
+        self.assertGreaterEqual(queries[0]['ms'], queries[1]['ms'])
+        self.assertIn('SELECT', queries[0]['sql'])
+
+    @override_settings(EXPENSES_TIMING={'ENABLED': False})
+    def test_disabled(self) -> None:
+        """Tests that the middleware isn't used when it's disabled"""
+        self.assertFalse(self.get_list().has_header('Server-Timing'))
@@ -1,8 +1,9 @@
 from django.test import TestCase
+from django.urls import reverse
 
 from ..models import Category, Expense
 from .utils import create_test_categories
-from ..utils import get_expenses_amount
+from ..utils import get_expenses_amount, get_pk_url
 
 
 class ExpensesViewsUtilitiesTestCase(TestCase):
@@ -21,3 +22,14 @@ class ExpensesViewsUtilitiesTestCase(TestCase):
         self.assertEqual(
             result, Expense.objects.filter(category=category).count()
         )
+
+    def test_get_pk_url(self) -> None:
+        """
+        Test if get_pk_url builds the same URLs as reverse
+        """
+        url = get_pk_url('expenses:category-edit')
+        for pk in (1, 27, 2718281828):
+            self.assertEqual(
+                url.format(pk),
+                reverse('expenses:category-edit', kwargs={'pk': pk}),
+            )
@@ -1,10 +1,15 @@
 from datetime import date
+from decimal import Decimal
 
-from django.test import TestCase, Client
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from .utils import get_category, create_test_expenses, create_test_categories
 from ..models import Expense, Category
+from ..report_cache import get_report_cache
+from ..rows import ExpenseRow
 
 
 def get_category_url(operation: str, pk: int) -> str:
@@ -82,8 +87,8 @@ class ExpenseListViewTestCase(TestCase):
         payload = {'sort_by': 'category: asc'}
         result = self.client.get(self.EXPENSE_LIST, payload)
         self.assertEqual(
-            result.context[-1]['object_list'][0].category,
-            get_category('necessary')
+            result.context[-1]['object_list'][0].category_name,
+            'necessary'
         )
 
     def test_get_context_data_sort_by_category_and_descending(self) -> None:
@@ -94,9 +99,26 @@ class ExpenseListViewTestCase(TestCase):
         payload = {'sort_by': 'category: desc'}
         result = self.client.get(self.EXPENSE_LIST, payload)
         self.assertEqual(
-            result.context[-1]['object_list'][0].category,
-            get_category('unnecessary')
+            result.context[-1]['object_list'][0].category_name,
+            'unnecessary'
+        )
+
+    def test_get_context_data_date_range_provided(self) -> None:
+        """
+        Tests what get_context_data returns when provided with a date range
+        Expected result: expenses of the range and their summaries
+        """
+        payload = {'date_from': '2020-05-05', 'date_to': '2020-05-31'}
+        result = self.client.get(self.EXPENSE_LIST, payload)
+        context = result.context[-1]
+        self.assertEqual(
+            [expense.name for expense in context['object_list']], ['jeans']
         )
+        self.assertEqual(
+            dict(context['summary_per_category']),
+            {'necessary': Decimal('100.15')},
+        )
+        self.assertEqual(context['total_objects'].value, 1)
 
     def test_get_context_data_sort_by_date_and_ascending(self) -> None:
         """
@@ -130,8 +152,8 @@ class ExpenseListViewTestCase(TestCase):
         payload = {'group_by': 'category: asc'}
         result = self.client.get(self.EXPENSE_LIST, payload)
         self.assertEqual(
-            result.context[-1]['object_list'][0].category,
-            get_category('necessary')
+            result.context[-1]['object_list'][0].category_name,
+            'necessary'
         )
 
     def test_get_context_data_group_by_category_descending(self) -> None:
@@ -142,8 +164,8 @@ class ExpenseListViewTestCase(TestCase):
         payload = {'group_by': 'category: desc'}
         result = self.client.get(self.EXPENSE_LIST, payload)
         self.assertEqual(
-            result.context[-1]['object_list'][0].category,
-            get_category('unnecessary')
+            result.context[-1]['object_list'][0].category_name,
+            'unnecessary'
         )
 
     def test_get_context_data_group_by_date(self) -> None:
@@ -176,6 +198,67 @@ class ExpenseListViewTestCase(TestCase):
         result = self.client.get(self.EXPENSE_LIST)
         self.assertIn('total_objects', result.context[0])
 
+    def test_get_context_data_rows_projected(self) -> None:
+        """
+        Tests if get_context_data returns rows with names of the categories
+        """
+        payload = {'sort_by': 'category: asc'}
+        result = self.client.get(self.EXPENSE_LIST, payload)
+        row = result.context[-1]['object_list'][0]
+        self.assertIsInstance(row, ExpenseRow)
+        self.assertEqual(row.category_id, get_category('necessary').id)
+
+    def test_get_context_data_queries_independent_of_page_size(self) -> None:
+        """
+        Tests if the number of queries doesn't depend on items_per_page:
+        data version, report (when it isn't cached), categories being
+        deleted, page rows and categories of the form
+        """
+        Expense.objects.bulk_create(
+            Expense(category=get_category('necessary'), name=f'expense {i}',
+                    amount=i, date=date(2020, 6, 1))
+            for i in range(30)
+        )
+        for items_per_page in (1, 10, 50):
+            for pagination in ('', 'cursor'):
+                payload = {
+                    'items_per_page': items_per_page,
+                    'pagination': pagination,
+                    'name': 'expense',
+                }
+                get_report_cache().clear()
+                with self.subTest(payload=payload), self.assertNumQueries(5):
+                    self.client.get(self.EXPENSE_LIST, payload)
+
+    def test_get_context_data_row_urls(self) -> None:
+        """
+        Tests if the rows link to the same URLs as reversed ones
+        """
+        expense = Expense.objects.get(name='shirt')
+        result = self.client.get(self.EXPENSE_LIST)
+        for url in (
+                reverse('expenses:expense-edit', args=[expense.pk]),
+                reverse('expenses:expense-delete', args=[expense.pk]),
+                get_category_url('detail', expense.category_id),
+        ):
+            self.assertContains(result, f'href="{url}"')
+
+    def test_get_context_data_summaries_cached_per_data_version(self) -> None:
+        """
+        Tests if the cached summaries are rendered again after
+        the expenses change
+        """
+        self.assertContains(
+            self.client.get(self.EXPENSE_LIST), 'Overall: 150.55'
+        )
+        Expense.objects.create(
+            category=get_category('necessary'), name='hat', amount=10,
+            date=date(2020, 6, 1)
+        )
+        self.assertContains(
+            self.client.get(self.EXPENSE_LIST), 'Overall: 160.55'
+        )
+
 
 class CategoryListViewTestCase(TestCase):
     """Tests for ExpenseListView"""
@@ -241,6 +324,19 @@ class CategoryListViewTestCase(TestCase):
             result.context[-1]['object_list'][0].expenses, 1
         )
 
+    def test_get_context_data_queries_independent_of_categories(self) -> None:
+        """
+        Tests if the number of queries doesn't depend on number of categories
+        """
+        Category.objects.create(name='category')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.CATEGORY_LIST)
+        Category.objects.bulk_create(
+            Category(name=f'category {i}') for i in range(20)
+        )
+        with self.assertNumQueries(len(queries)):
+            self.client.get(self.CATEGORY_LIST)
+
     def test_get_context_data_items_per_page_provided(self) -> None:
         """
         Tests what get_context_data_returns when items_per_page is provided
@@ -259,6 +355,17 @@ class CategoryListViewTestCase(TestCase):
         result = self.client.get(self.CATEGORY_LIST)
         self.assertIn('total_objects', result.context[0])
 
+    def test_get_context_data_invalid_form_count_not_cached(self) -> None:
+        """
+        Tests if the count of an invalid search, which lists all
+        categories, isn't cached as the count of its name
+        """
+        self.client.get(
+            self.CATEGORY_LIST, {'name': 'unnecessary', 'items_per_page': 0}
+        )
+        result = self.client.get(self.CATEGORY_LIST, {'name': 'unnecessary'})
+        self.assertEqual(result.context['total_objects'].value, 1)
+
 
 class CategoryCreateViewTestCase(TestCase):
     """Tests for CreateView, which uses Category model"""
@@ -311,8 +418,12 @@ class CategoryUpdateViewTestCase(TestCase):
         self.assertEqual(category.name, category_name)
 
 
+@override_settings(EXPENSES_CATEGORY_PURGE={'BACKGROUND': False})
 class CategoryDeleteViewTestCase(TestCase):
-    """Tests for CategoryDeleteView"""
+    """
+    Tests for CategoryDeleteView, the categories are deleted during
+    the request instead of in the background
+    """
 
     def setUp(self) -> None:
         """Set up for tests of CategoryDeleteView"""
@@ -338,6 +449,22 @@ class CategoryDeleteViewTestCase(TestCase):
             Expense.objects.filter(category=category).count(), 0
         )
 
+    @override_settings(EXPENSES_CATEGORY_PURGE={'BACKGROUND': True})
+    def test_delete_category_hidden(self) -> None:
+        """
+        Tests if a Category is hidden at once and deleted in the background
+        after the request
+        """
+        category = Category.objects.first()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(get_category_url('delete', category.id))
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(Category.objects.filter(pk=category.id).exists())
+        self.assertTrue(Category.all_objects.filter(pk=category.id).exists())
+        response = self.client.get(get_category_url('detail', category.id))
+        self.assertEqual(response.status_code, 404)
+
 
 class CategoryDetailViewTestCase(TestCase):
     """Tests for CategoryDetailView"""
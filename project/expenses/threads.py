@@ -0,0 +1,52 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .timing import timed_queries
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the pool of threads running the queries of the async views,
+    its size is set in settings.EXPENSES_QUERY_THREADS
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'EXPENSES_QUERY_THREADS', 4),
+            thread_name_prefix='expenses-query',
+        )
+
+    return _executor
+
+
+def _call(func: Callable, *args, **kwargs) -> Any:
+    """
+    Calls a function, which uses the ORM, closing the thread's database
+    connections afterwards as at the end of a request
+    """
+    try:
+        with timed_queries():
+            return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_thread(func: Callable, *args, **kwargs) -> Any:
+    """
+    Runs a (blocking) function in the pool of query threads, with
+    the context variables of the caller, so that it's timed as a part
+    of the request
+    """
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(),
+        functools.partial(context.run, _call, func, *args, **kwargs),
+    )
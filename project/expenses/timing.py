@@ -0,0 +1,196 @@
+import contextvars
+import functools
+import heapq
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, Iterator, List
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+
+logger = logging.getLogger(__name__)
+
+# Timings of the current request, None outside of the TimingMiddleware
+_current = contextvars.ContextVar('expenses_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Timings of a request: number and duration of the database queries,
+    of the timed functions and of the template rendering, optionally
+    with SQL of a given number of the slowest queries. The queries and
+    functions may be run by several threads of an async view
+    """
+
+    def __init__(self, slow_queries: int = 0):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+        self.functions = {}
+        self.slow_queries = slow_queries
+        self._slowest = []
+        self._lock = threading.Lock()
+
+    def add_function(self, name: str, duration: float) -> None:
+        """Records a call of a timed function"""
+        with self._lock:
+            calls, total = self.functions.get(name, (0, 0.0))
+            self.functions[name] = (calls + 1, total + duration)
+
+    def execute(self, execute: Callable, sql: str, params, many: bool,
+                context: Dict):
+        """Database execute wrapper, which times the queries"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            with self._lock:
+                self.queries += 1
+                self.db += duration
+                if self.slow_queries:
+                    item = (duration, self.queries, sql)
+                    if len(self._slowest) < self.slow_queries:
+                        heapq.heappush(self._slowest, item)
+                    else:
+                        heapq.heappushpop(self._slowest, item)
+
+    def get_slowest_queries(self) -> List[Dict]:
+        """Returns the captured slowest queries, the slowest first"""
+        return [
+            {'sql': sql, 'ms': round(duration * 1000, 3)}
+            for duration, _, sql in sorted(self._slowest, reverse=True)
+        ]
+
+    def as_dict(self, total: float) -> Dict:
+        """Returns the timings (in milliseconds) as a dict"""
+        data = {
+            'total_ms': round(total * 1000, 3),
+            'queries': self.queries,
+            'db_ms': round(self.db * 1000, 3),
+            'template_ms': round(self.template * 1000, 3),
+            'functions': {
+                name: {'calls': calls, 'ms': round(duration * 1000, 3)}
+                for name, (calls, duration) in self.functions.items()
+            },
+        }
+        if self.slow_queries:
+            data['slow_queries'] = self.get_slowest_queries()
+
+        return data
+
+    def get_header(self, total: float) -> str:
+        """Returns value of the Server-Timing header"""
+        metrics = [
+            f'total;dur={total * 1000:.3f}',
+            f'db;dur={self.db * 1000:.3f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template * 1000:.3f}',
+        ]
+        metrics += [
+            f'{name};dur={duration * 1000:.3f};desc="{calls} calls"'
+            for name, (calls, duration) in self.functions.items()
+        ]
+
+        return ', '.join(metrics)
+
+
+def timed(func: Callable) -> Callable:
+    """
+    Decorator timing calls of a function made during requests measured
+    by the TimingMiddleware, other calls only look up the context variable
+    """
+    name = f'{func.__module__.rsplit(".", 1)[-1]}.{func.__name__}'
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        timings = _current.get()
+        if timings is None:
+            return func(*args, **kwargs)
+
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings.add_function(name, time.perf_counter() - started)
+
+    return wrapper
+
+
+@contextmanager
+def timed_queries() -> Iterator[None]:
+    """
+    Times the queries of the current thread's connections, when they are
+    made during a measured request
+    """
+    timings = _current.get()
+    with ExitStack() as stack:
+        if timings is not None:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(timings.execute)
+                )
+        yield
+
+
+class TimingMiddleware:
+    """
+    Middleware measuring the database queries, the timed functions and
+    the template rendering of every request. The timings are sent in
+    the Server-Timing header and logged to expenses.timing as JSON.
+    Configured with settings.EXPENSES_TIMING: ENABLED (when False,
+    the middleware is removed) and SLOW_QUERIES (number of the slowest
+    queries logged with their SQL, 0 doesn't capture them)
+    """
+
+    def __init__(self, get_response: Callable):
+        options = getattr(settings, 'EXPENSES_TIMING', {})
+        if not options.get('ENABLED', True):
+            raise MiddlewareNotUsed('Expenses timing is disabled')
+
+        self.get_response = get_response
+        self.slow_queries = options.get('SLOW_QUERIES', 0)
+
+    def __call__(self, request: WSGIRequest) -> HttpResponse:
+        timings = RequestTimings(self.slow_queries)
+        token = _current.set(timings)
+        try:
+            with timed_queries():
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        # Streamed responses are measured until they start streaming
+        total = time.perf_counter() - timings.started
+        response['Server-Timing'] = timings.get_header(total)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **timings.as_dict(total),
+        }))
+
+        return response
+
+    def process_template_response(
+            self, request: WSGIRequest, response: SimpleTemplateResponse
+    ) -> SimpleTemplateResponse:
+        """Times rendering of the response, which follows this call"""
+        timings = _current.get()
+        started = time.perf_counter()
+
+        def rendered(response: SimpleTemplateResponse) -> None:
+            """Records the rendering time"""
+            timings.template += time.perf_counter() - started
+
+        if timings is not None:
+            response.add_post_render_callback(rendered)
+
+        return response
@@ -1,29 +1,55 @@
 from django.views.generic import CreateView, UpdateView, DeleteView
 from django.urls import path, reverse_lazy
+from .forms import ExpenseForm
 from .models import Expense, Category
 from .views import (
     ExpenseListView,
+    ExpenseExportView,
+    ExpenseReportView,
+    ReportCacheStatsView,
+    ExpenseBatchCreateView,
+    ExpenseBulkEditView,
+    AsyncExpenseListView,
     CategoryListView,
     CategoryDeleteView,
     CategoryDetailView,
+    AsyncCategoryDetailView,
 )
 
 urlpatterns = [
     path('expense/list/',
          ExpenseListView.as_view(),
          name='expense-list'),
+    path('expense/list/async/',
+         AsyncExpenseListView.as_view(),
+         name='expense-list-async'),
+    path('expense/export/',
+         ExpenseExportView.as_view(),
+         name='expense-export'),
+    path('expense/report/<str:summary>/',
+         ExpenseReportView.as_view(),
+         name='expense-report'),
+    path('expense/report-cache/',
+         ReportCacheStatsView.as_view(),
+         name='report-cache-stats'),
     path('expense/create/',
          CreateView.as_view(
              model=Expense,
-             fields='__all__',
+             form_class=ExpenseForm,
              template_name='expenses/model_form.html',
              success_url=reverse_lazy('expenses:expense-list')
          ),
          name='expense-create'),
+    path('expense/batch/',
+         ExpenseBatchCreateView.as_view(),
+         name='expense-batch-create'),
+    path('expense/bulk-edit/',
+         ExpenseBulkEditView.as_view(),
+         name='expense-bulk-edit'),
     path('expense/<int:pk>/edit/',
          UpdateView.as_view(
              model=Expense,
-             fields='__all__',
+             form_class=ExpenseForm,
              template_name='expenses/model_form.html',
              success_url=reverse_lazy('expenses:expense-list')
          ),
@@ -61,5 +87,8 @@ urlpatterns = [
          name='category-delete'),
     path('category/<int:pk>/',
          CategoryDetailView.as_view(),
-         name='category-detail')
+         name='category-detail'),
+    path('category/<int:pk>/async/',
+         AsyncCategoryDetailView.as_view(),
+         name='category-detail-async'),
 ]
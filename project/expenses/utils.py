@@ -1,6 +1,36 @@
-from .models import Category, Expense
+from typing import NamedTuple
+
+from django.urls import reverse
+
+from .models import Category
 
 
 def get_expenses_amount(category: Category) -> int:
     """Returns number of Expenses of a given Category"""
-    return Expense.objects.filter(category=category).count()
+    return category.expenses_count
+
+
+class PkUrl(NamedTuple):
+    """URL of a view of an object split around the object's primary key"""
+    prefix: str
+    suffix: str
+
+    def format(self, pk) -> str:
+        """Returns URL of the object with a given primary key"""
+        return f'{self.prefix}{pk}{self.suffix}'
+
+
+# Primary key, which the URLs are reversed with to find the prefixes
+_MARKER = 2718281828
+
+
+def get_pk_url(name: str) -> PkUrl:
+    """
+    Returns URL of a view with a pk argument, which is reversed only once,
+    for building the URLs of many objects without reversing each of them
+    """
+    prefix, suffix = reverse(name, kwargs={'pk': _MARKER}).split(
+        str(_MARKER)
+    )
+
+    return PkUrl(prefix, suffix)
@@ -1,62 +1,140 @@
-from typing import Tuple, Dict
-
+import asyncio
+import datetime
+import functools
+import json
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
 from django.core.handlers.wsgi import WSGIRequest
+from django.core.paginator import Page
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
 from django.db.models.query import QuerySet
-from django.http import HttpResponseRedirect
-from django.views.generic import DeleteView, DetailView
+from django.http import (
+    Http404, HttpResponse, HttpResponseBadRequest, HttpResponseRedirect,
+    JsonResponse, StreamingHttpResponse,
+)
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
+from django.views.generic import DeleteView, DetailView, FormView
 from django.views.generic.list import ListView
 
-from .forms import ExpenseSearchForm, CategorySearchForm
-from .models import Expense, Category
-from .reports import (
-    summary_per_category,
-    summary_per_year_month,
-    summary_overall,
+from .counts import (
+    CACHE_TIMEOUT, CountedPaginator, CountResult, get_cache_key, get_count,
+)
+from .archive import CombinedExpenses, needs_archive
+from .batch import MAX_ITEMS, BatchConflict, create_expenses
+from .bulk_edit import bulk_edit, select_expenses
+from .export import FORMATS, WRITERS, gzip_chunks
+from .forms import (
+    ExpenseBulkEditForm, ExpenseExportForm, ExpenseSearchForm,
+    CategorySearchForm, parse_ids,
 )
-from .utils import get_expenses_amount
+from .models import ArchivedExpense, Category, DataVersion, Expense
+from .pagination import CursorPage, CursorPaginator, InvalidCursor
+from .report_cache import get_report, get_report_cache
+from .reports import Report, rollup_report
+from .rows import iter_expenses, project_expenses
+from .purge import delete_category
+from .search import search
+from .statistics import get_statistics
+from .threads import run_in_thread
+from .utils import get_expenses_amount, get_pk_url
+
+
+class CountedListMixin:
+    """Mixin for the list views, which count their objects only once"""
+    paginator_class = CountedPaginator
+    total_count = None
+
+    def get_paginator(self, queryset: QuerySet, per_page: int,
+                      **kwargs) -> CountedPaginator:
+        """
+        Returns paginator, which uses the already known count, an estimated
+        one doesn't limit the pages
+        """
+        return super().get_paginator(
+            queryset, per_page, count=self.total_count.value,
+            exact=self.total_count.exact, **kwargs
+        )
 
 
-class ExpenseListView(ListView):
-    """List view for Expense model"""
-    model = Expense
-    paginate_by = 5
+class ExpenseFilterMixin:
+    """Mixin for the views, which filter expenses with ExpenseSearchForm"""
 
-    def get_context_data(
-            self, *, object_list: QuerySet = None, **kwargs
-    ) -> Dict:
-        """Returns context for the expenses list"""
-        queryset = object_list if object_list is not None else self.object_list
+    def filter_queryset(
+            self, queryset: QuerySet, form: ExpenseSearchForm
+    ) -> QuerySet:
+        """Returns expenses filtered, sorted and grouped as in a form"""
+        if not form.is_valid():
+            return queryset
 
-        form = ExpenseSearchForm(self.request.GET)
-        if form.is_valid():
-            name = form.cleaned_data.get('name', '').strip()
-            if name:
-                queryset = queryset.filter(name__icontains=name)
+        name = form.cleaned_data.get('name', '').strip()
+        if name:
+            queryset = search(queryset, name)
 
-            categories = form.cleaned_data['categories']
-            if categories:
-                queryset = queryset.filter(category__in=categories)
+        categories = form.cleaned_data['categories']
+        if categories:
+            queryset = queryset.filter(category__in=categories)
 
-            date = form.cleaned_data['date']
-            if date:
-                queryset = queryset.filter(date=date)
+        date = form.cleaned_data['date']
+        if date:
+            queryset = queryset.filter(date=date)
 
-            sort_by = form.cleaned_data['sort_by']
-            queryset = self._get_ordered_queryset(queryset, sort_by)
+        # Both bounds are read from the date index
+        date_from = form.cleaned_data['date_from']
+        if date_from:
+            queryset = queryset.filter(date__gte=date_from)
 
-            group_by = form.cleaned_data['group_by']
-            queryset = self._get_ordered_queryset(queryset, group_by, '-pk')
+        date_to = form.cleaned_data['date_to']
+        if date_to:
+            queryset = queryset.filter(date__lte=date_to)
 
-            self.paginate_by = form.cleaned_data['items_per_page'] or 5
+        sort_by = form.cleaned_data['sort_by']
+        queryset = self._get_ordered_queryset(queryset, sort_by, '-pk')
 
-        return super().get_context_data(
-            form=form,
-            object_list=queryset,
-            total_objects=queryset.count(),
-            summary_per_category=summary_per_category(queryset),
-            summary_per_year_month=summary_per_year_month(queryset),
-            summary_overall=summary_overall(queryset),
-            **kwargs
+        group_by = form.cleaned_data['group_by']
+        return self._get_ordered_queryset(queryset, group_by, '-pk')
+
+    @staticmethod
+    def get_page_queryset(
+            queryset: QuerySet, form: ExpenseSearchForm
+    ) -> QuerySet:
+        """
+        Returns the filtered expenses, which the pages are read from.
+        The ones of the filtered categories sorted by the category name
+        are filtered also by the names, which lead the index of the order,
+        so that it's read only for the filtered categories. The summaries
+        are grouped by the categories with the index of their ids instead
+        """
+        if not form.is_valid() or not form.cleaned_data['categories']:
+            return queryset
+        order = form.cleaned_data['group_by'] or form.cleaned_data['sort_by']
+        if not order.startswith('category'):
+            return queryset
+
+        return queryset.filter(category_name__in=[
+            category.name for category in form.cleaned_data['categories']
+        ])
+
+    def with_archived(self, queryset: QuerySet, form: ExpenseSearchForm):
+        """
+        Returns the filtered expenses combined with the archived ones
+        filtered alike, unless the form excludes the archived dates
+        """
+        archived_before = _get_data_version(self.request).archived_before
+        params = form.cleaned_data if form.is_valid() else {}
+        if not needs_archive(params, archived_before):
+            return queryset
+
+        return CombinedExpenses(
+            queryset,
+            self.filter_queryset(ArchivedExpense.objects.all(), form),
         )
 
     @staticmethod
@@ -83,7 +161,7 @@ class ExpenseListView(ListView):
         prefix, category = self._get_params(order_params)
         if category == 'category':
             return queryset.order_by(
-                f'{prefix}category__name', *ordering
+                f'{prefix}category_name', *ordering
             )
         elif category == 'date':
             return queryset.order_by(
@@ -93,7 +171,372 @@ class ExpenseListView(ListView):
             return queryset
 
 
-class CategoryListView(ListView):
+class ExpenseListView(ExpenseFilterMixin, CountedListMixin, ListView):
+    """List view for Expense model"""
+    model = Expense
+    paginate_by = 5
+
+    cursor_pagination = False
+
+    def get_search(
+            self, queryset: QuerySet
+    ) -> Tuple[ExpenseSearchForm, QuerySet]:
+        """
+        Returns the search form and the expenses filtered with it,
+        the pagination is set up as requested in the form
+        """
+        form = ExpenseSearchForm(self.request.GET)
+        queryset = self.with_archived(
+            self.filter_queryset(queryset, form), form
+        )
+        if form.is_valid():
+            self.paginate_by = form.cleaned_data['items_per_page'] or 5
+            self.cursor_pagination = (
+                form.cleaned_data['pagination'] == 'cursor'
+            )
+
+        return form, queryset
+
+    def get_version(self) -> str:
+        """Returns stamp of the current data version"""
+        return _get_data_version(self.request).stamp
+
+    def get_report(self, queryset: QuerySet, params: Dict,
+                   version: str) -> Report:
+        """Returns summaries of the filtered expenses"""
+        return get_report(queryset, params, version)
+
+    def get_context_data(
+            self, *, object_list: QuerySet = None, **kwargs
+    ) -> Dict:
+        """Returns context for the expenses list"""
+        queryset = object_list if object_list is not None else self.object_list
+
+        form, queryset = self.get_search(queryset)
+        params = form.cleaned_data if form.is_valid() else {}
+        version = self.get_version()
+        report = self.get_report(queryset, params, version)
+        # The summaries count the expenses exactly and are cached with
+        # the data version, so the count needs no cache of its own
+        self.total_count = CountResult(report.count)
+        querystring = self.request.GET.copy()
+        querystring.pop('page', None)
+        querystring.pop('cursor', None)
+
+        return super().get_context_data(
+            form=form,
+            object_list=self.get_page_queryset(queryset, form),
+            total_objects=self.total_count,
+            summary_per_category=report.per_category,
+            summary_per_year_month=report.per_year_month,
+            summary_overall={'overall': report.overall},
+            cursor_pagination=self.cursor_pagination,
+            querystring=querystring.urlencode(),
+            summary_cache_key=get_cache_key(
+                Expense, params, version, kind='summaries'
+            ),
+            summary_cache_timeout=CACHE_TIMEOUT,
+            # Categories, which are being deleted, have no detail pages
+            deleting_categories=set(
+                Category.all_objects.filter(deleting=True).values_list(
+                    'pk', flat=True
+                )
+            ),
+            row_urls={
+                'category': get_pk_url('expenses:category-detail'),
+                'edit': get_pk_url('expenses:expense-edit'),
+                'delete': get_pk_url('expenses:expense-delete'),
+            },
+            **kwargs
+        )
+
+    def get_page_rows(self, page: Page) -> List:
+        """Returns rows of the expenses of a numbered page"""
+        return project_expenses(page.object_list)
+
+    def get_cursor_page(self, paginator: CursorPaginator) -> CursorPage:
+        """Returns the page pointed at by the requested cursor"""
+        try:
+            return paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+
+    def paginate_queryset(
+            self, queryset: QuerySet, page_size: int
+    ) -> Tuple:
+        """
+        Paginates the queryset with cursors if it was requested,
+        objects of the page are fetched as rows
+        """
+        if not self.cursor_pagination:
+            paginator, page, object_list, is_paginated = (
+                super().paginate_queryset(queryset, page_size)
+            )
+            page.object_list = self.get_page_rows(page)
+            return paginator, page, page.object_list, is_paginated
+
+        paginator = CursorPaginator(queryset, page_size, project_expenses)
+        page = self.get_cursor_page(paginator)
+
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class ExpenseExportView(ExpenseFilterMixin, View):
+    """
+    View exporting all expenses shown by the expenses list as a CSV
+    or NDJSON file, which is streamed (and optionally compressed)
+    while the expenses are fetched from the database in chunks
+    """
+
+    def get(self, request: WSGIRequest) -> StreamingHttpResponse:
+        """Returns the exported expenses"""
+        export_form = ExpenseExportForm(request.GET)
+        if not export_form.is_valid():
+            return HttpResponseBadRequest('Invalid export format')
+
+        form = ExpenseSearchForm(request.GET)
+        queryset = self.with_archived(
+            self.filter_queryset(Expense.objects.all(), form), form
+        )
+        export_format = export_form.cleaned_data['format']
+        chunks = WRITERS[export_format](iter_expenses(queryset))
+        filename = f'expenses.{export_format}'
+        content_type = FORMATS[export_format]
+        if export_form.cleaned_data['gzip']:
+            chunks = gzip_chunks(chunks)
+            filename += '.gz'
+            content_type = 'application/gzip'
+
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="{filename}"'
+        )
+
+        return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ExpenseBatchCreateView(View):
+    """
+    View creating a JSON array of expenses (objects with the fields
+    of the expense form) at once, the valid ones are inserted together
+    and the result of every item is returned. Only JSON requests
+    are accepted, which other sites can't send without CORS, so they
+    are exempt from the CSRF check
+    """
+    max_items = MAX_ITEMS
+
+    def post(self, request: WSGIRequest) -> JsonResponse:
+        """Creates the posted expenses"""
+        if request.content_type != 'application/json':
+            return JsonResponse(
+                {'error': 'Content-Type must be application/json'},
+                status=415,
+            )
+        try:
+            items = json.loads(request.body)
+        except ValueError as e:
+            return JsonResponse({'error': f'Invalid JSON: {e}'}, status=400)
+        if not isinstance(items, list) or not items:
+            return JsonResponse(
+                {'error': 'Expected a non-empty array of expenses'},
+                status=400,
+            )
+        if len(items) > self.max_items:
+            return JsonResponse(
+                {'error': f'At most {self.max_items} expenses are accepted'},
+                status=413,
+            )
+
+        try:
+            results = create_expenses(items)
+        except BatchConflict as e:
+            return JsonResponse(
+                {'error': f'No expenses were created, try again: {e}'},
+                status=409,
+            )
+        created = sum(1 for result in results if 'id' in result)
+
+        return JsonResponse({
+            'created': created,
+            'failed': len(results) - created,
+            'results': results,
+        }, status=201 if created else 400)
+
+
+class ExpenseBulkEditView(ExpenseFilterMixin, FormView):
+    """
+    View changing the category, name or amounts of many expenses
+    at once, the ones filtered as in the expenses list (with the search
+    parameters of the URL) and/or given with their ids. The archived
+    expenses aren't edited
+    """
+    form_class = ExpenseBulkEditForm
+    template_name = 'expenses/expense_bulk_edit.html'
+
+    def get_initial(self) -> Dict:
+        """Returns the ids given in the URL"""
+        return {'ids': self.request.GET.get('ids', '')}
+
+    def get_selection(self, ids: List[int]) -> Optional[QuerySet]:
+        """
+        Returns the expenses selected with the search parameters
+        and given ids, None if they aren't selected
+        """
+        form = ExpenseSearchForm(self.request.GET)
+        filtered = None
+        if form.has_filters():
+            filtered = self.filter_queryset(Expense.objects.all(), form)
+
+        return select_expenses(filtered, ids)
+
+    def get_querystring(self) -> str:
+        """Returns the search parameters of the URL"""
+        querystring = self.request.GET.copy()
+        querystring.pop('ids', None)
+        return querystring.urlencode()
+
+    def get_context_data(self, **kwargs) -> Dict:
+        """Returns context with the number of the selected expenses"""
+        try:
+            ids = parse_ids(self.request.GET.get('ids', ''))
+        except ValueError:
+            ids = []
+        selection = self.get_selection(ids)
+
+        return super().get_context_data(
+            selected=selection.count() if selection is not None else None,
+            querystring=self.get_querystring(),
+            **kwargs
+        )
+
+    def form_valid(self, form: ExpenseBulkEditForm) -> HttpResponse:
+        """Applies the changes to the selected expenses"""
+        selection = self.get_selection(form.cleaned_data['ids'])
+        if selection is None:
+            form.add_error(
+                'ids', 'Select the expenses with their ids or filters '
+                       'of the expenses list.'
+            )
+            return self.form_invalid(form)
+        try:
+            bulk_edit(selection, form.get_changes())
+        except ValidationError as e:
+            form.add_error('amount_delta', e)
+            return self.form_invalid(form)
+
+        return HttpResponseRedirect(
+            f'{reverse("expenses:expense-list")}?{self.get_querystring()}'
+        )
+
+
+def _get_data_version(request: WSGIRequest) -> DataVersion:
+    """Returns the data version, fetched once per request"""
+    if not hasattr(request, 'data_version'):
+        request.data_version = DataVersion.get()
+
+    return request.data_version
+
+
+def _get_report_etag(request: WSGIRequest, *args, **kwargs) -> str:
+    """Returns ETag of a report, which changes with the data version"""
+    return f'{kwargs.get("summary", "")}-{_get_data_version(request).stamp}'
+
+
+def _get_report_last_modified(
+        request: WSGIRequest, *args, **kwargs
+) -> datetime.datetime:
+    """Returns time of the last change of the reported data"""
+    return _get_data_version(request).modified
+
+
+@method_decorator(condition(
+    etag_func=_get_report_etag,
+    last_modified_func=_get_report_last_modified,
+), name='get')
+class ExpenseReportView(ExpenseFilterMixin, View):
+    """
+    View returning a summary of the expenses list as JSON, filtered with
+    the same parameters. Conditional requests are answered with
+    304 Not Modified from the data version alone
+    """
+    SUMMARIES = ('per-category', 'per-year-month', 'overall', 'statistics')
+    CENT = Decimal('0.01')
+
+    def get(self, request: WSGIRequest, summary: str) -> JsonResponse:
+        """Returns a given summary of the filtered expenses"""
+        if summary not in self.SUMMARIES:
+            raise Http404(f'Unknown summary: {summary}')
+
+        form = ExpenseSearchForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+
+        queryset = self.with_archived(
+            self.filter_queryset(Expense.objects.all(), form), form
+        )
+        if summary == 'statistics':
+            return self.get_statistics(queryset, form.cleaned_data)
+
+        report = get_report(
+            queryset, form.cleaned_data, _get_data_version(request).stamp
+        )
+        if summary == 'per-category':
+            data = report.per_category
+        elif summary == 'per-year-month':
+            data = {
+                year_month.strftime('%Y-%m'): total
+                for year_month, total in report.per_year_month.items()
+            }
+        else:
+            data = {'overall': report.overall}
+
+        # Sums computed by the database may have more decimal places
+        return JsonResponse(
+            {key: Decimal(total).quantize(self.CENT)
+             for key, total in data.items()},
+            encoder=DjangoJSONEncoder
+        )
+
+    def get_statistics(self, queryset: QuerySet,
+                       params: Dict) -> JsonResponse:
+        """
+        Returns number, median, p90 and p99 and histogram of the amounts
+        of the filtered expenses, overall, per category, of the ones
+        without a category and per month
+        """
+        statistics = get_statistics(
+            queryset, params, _get_data_version(self.request).stamp
+        )
+        return JsonResponse(
+            {
+                'count': statistics.count,
+                'histogram_edges': statistics.edges,
+                'overall': statistics.overall,
+                'per_category': statistics.per_category,
+                'uncategorized': statistics.uncategorized,
+                'per_year_month': {
+                    year_month.strftime('%Y-%m'): value
+                    for year_month, value
+                    in statistics.per_year_month.items()
+                },
+            },
+            encoder=DjangoJSONEncoder
+        )
+
+
+class ReportCacheStatsView(View):
+    """
+    View returning the hits, misses and evictions of the cache
+    of the summaries as JSON, counted by the process serving it
+    """
+
+    def get(self, request: WSGIRequest) -> JsonResponse:
+        """Returns the counters of the report cache"""
+        return JsonResponse(get_report_cache().stats())
+
+
+class CategoryListView(CountedListMixin, ListView):
     """List view for the Category model"""
     model = Category
     paginate_by = 5
@@ -106,17 +549,19 @@ class CategoryListView(ListView):
         if form.is_valid():
             name = form.cleaned_data.get('name', '').strip()
             if name:
-                queryset = queryset.filter(name__icontains=name)
+                queryset = search(queryset, name)
 
             self.paginate_by = form.cleaned_data['items_per_page'] or 5
 
-        for category in queryset:
-            category.expenses = get_expenses_amount(category)
+        queryset = queryset.annotate(expenses=F('expenses_count'))
+        version = DataVersion.get().stamp
+        params = form.cleaned_data if form.is_valid() else {}
+        self.total_count = get_count(queryset, params, version)
 
         return super().get_context_data(
             form=form,
             object_list=queryset,
-            total_objects=queryset.count(),
+            total_objects=self.total_count,
             **kwargs
         )
 
@@ -129,17 +574,21 @@ class CategoryDeleteView(DeleteView):
     def get_context_data(self, **kwargs) -> Dict:
         """Returns context for the category deletion"""
         return super().get_context_data(
-            categories_expenses=get_expenses_amount(self.get_object()),
+            categories_expenses=get_expenses_amount(self.object),
             **kwargs
         )
 
     def delete(
             self, request: WSGIRequest, *args, **kwargs
     ) -> HttpResponseRedirect:
-        """Deletes all Expenses related to deleted Category"""
-        Expense.objects.filter(category=self.get_object()).delete()
+        """
+        Hides the Category, which is deleted with its Expenses in batches
+        in the background
+        """
+        self.object = self.get_object()
+        delete_category(self.object)
 
-        return super().delete(request, *args, **kwargs)
+        return HttpResponseRedirect(self.get_success_url())
 
 
 class CategoryDetailView(DetailView):
@@ -147,14 +596,167 @@ class CategoryDetailView(DetailView):
     model = Category
     template_name = 'expenses/category_detail.html'
 
+    def get_summary_per_year_month(self) -> OrderedDict:
+        """Returns summary of the category's expenses per month"""
+        return rollup_report(self.object).per_year_month
+
     def get_context_data(self, **kwargs) -> Dict:
         """Returns context for the category deletion"""
-        category = self.get_object()
-        queryset = Expense.objects.filter(category=category)
+        category = self.object
 
         return super().get_context_data(
             category=category,
-            categories_expenses=get_expenses_amount(self.get_object()),
-            summary_per_year_month=summary_per_year_month(queryset),
+            categories_expenses=get_expenses_amount(category),
+            summary_per_year_month=self.get_summary_per_year_month(),
             **kwargs
         )
+
+
+class AsyncViewMixin:
+    """
+    Mixin for the async variants of the views, which prefetch their
+    independent data concurrently in the pool of query threads and then
+    build exactly the same response as the sync views from it
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs) -> Callable:
+        """
+        Returns an async view function, class-based views can't be async
+        in this version of Django
+        """
+        super().as_view(**initkwargs)
+
+        async def view(request: WSGIRequest, *args, **kwargs) -> HttpResponse:
+            self = cls(**initkwargs)
+            self.setup(request, *args, **kwargs)
+            if request.method.lower() not in ('get', 'head'):
+                return self.http_method_not_allowed(request, *args, **kwargs)
+
+            await self.prefetch()
+            return await run_in_thread(self.get, request, *args, **kwargs)
+
+        view.view_class = cls
+        view.view_initkwargs = initkwargs
+        functools.update_wrapper(view, cls, updated=())
+
+        return view
+
+    async def prefetch(self) -> None:
+        """
+        Fetches the data of the response concurrently, nothing by default,
+        so that the view fetches its data in the thread of the sync view
+        """
+
+
+class AsyncExpenseListView(AsyncViewMixin, ExpenseListView):
+    """
+    Async variant of the ExpenseListView, which validates the search form
+    while fetching the data version, and then computes the summaries
+    while fetching the requested page
+    """
+    search = None
+    version = None
+    report = None
+    prefetched_page = None
+
+    async def prefetch(self) -> None:
+        """Fetches the data of the expenses list concurrently"""
+        self.search, self.version = await asyncio.gather(
+            run_in_thread(super().get_search, self.get_queryset()),
+            run_in_thread(super().get_version),
+        )
+        form, queryset = self.search
+        params = form.cleaned_data if form.is_valid() else {}
+        self.report, self.prefetched_page = await asyncio.gather(
+            run_in_thread(
+                super().get_report, queryset, params, self.version
+            ),
+            run_in_thread(
+                self.fetch_page, self.get_page_queryset(queryset, form),
+                self.get_paginate_by(queryset),
+            ),
+        )
+
+    def fetch_page(self, queryset: QuerySet, page_size: int):
+        """
+        Returns the requested cursor page or (number, rows) of a numbered
+        page, fetched without the count, which the paginator validates
+        the page number with later, or None if it can't be fetched early
+        """
+        if self.cursor_pagination:
+            paginator = CursorPaginator(queryset, page_size, project_expenses)
+            try:
+                return paginator.page(self.request.GET.get('cursor'))
+            except InvalidCursor:
+                return None
+
+        page = self.kwargs.get(self.page_kwarg) or self.request.GET.get(
+            self.page_kwarg
+        ) or 1
+        try:
+            number = int(page)
+        except ValueError:
+            return None
+        if number < 1:
+            return None
+
+        offset = (number - 1) * page_size
+        return number, project_expenses(queryset[offset:offset + page_size])
+
+    def get_search(
+            self, queryset: QuerySet
+    ) -> Tuple[ExpenseSearchForm, QuerySet]:
+        """Returns the prefetched search form and filtered expenses"""
+        return self.search
+
+    def get_version(self) -> str:
+        """Returns the prefetched data version"""
+        return self.version
+
+    def get_report(self, queryset: QuerySet, params: Dict,
+                   version: str) -> Report:
+        """Returns the prefetched summaries"""
+        return self.report
+
+    def get_page_rows(self, page: Page) -> List:
+        """Returns rows of a numbered page, prefetched if it's possible"""
+        if self.prefetched_page is not None:
+            number, rows = self.prefetched_page
+            if number == page.number:
+                return rows
+
+        return super().get_page_rows(page)
+
+    def get_cursor_page(self, paginator: CursorPaginator) -> CursorPage:
+        """Returns the prefetched cursor page"""
+        if self.prefetched_page is not None:
+            return self.prefetched_page
+
+        return super().get_cursor_page(paginator)
+
+
+class AsyncCategoryDetailView(AsyncViewMixin, CategoryDetailView):
+    """
+    Async variant of the CategoryDetailView, which fetches the category
+    and its summary concurrently
+    """
+    prefetched_object = None
+    summary_per_year_month = None
+
+    async def prefetch(self) -> None:
+        """Fetches the category and its summary concurrently"""
+        category = Category(pk=self.kwargs[self.pk_url_kwarg])
+        self.prefetched_object, report = await asyncio.gather(
+            run_in_thread(super().get_object),
+            run_in_thread(rollup_report, category),
+        )
+        self.summary_per_year_month = report.per_year_month
+
+    def get_object(self, queryset: QuerySet = None) -> Category:
+        """Returns the prefetched category"""
+        return self.prefetched_object
+
+    def get_summary_per_year_month(self) -> OrderedDict:
+        """Returns the prefetched summary"""
+        return self.summary_per_year_month
@@ -41,6 +41,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'expenses.timing.TimingMiddleware',
+    'expenses.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,12 +54,21 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'project.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'project', 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # In production the templates are compiled only once, in
+            # development they're read again, so that changes are visible
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -74,13 +85,48 @@ WSGI_APPLICATION = 'project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
+# The SQLite connections run the pragmas of expenses.backends.sqlite3
+# (WAL journal, busy timeout, memory-mapped I/O...) overridden with
+# 'pragmas', and begin the transactions in 'transaction_mode'
+SQLITE_OPTIONS = {
+    'pragmas': {},
+    'transaction_mode': 'IMMEDIATE',
+}
+
+# Seconds a connection is reused by the following requests of a thread
+SQLITE_CONN_MAX_AGE = 600
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'expenses.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'OPTIONS': SQLITE_OPTIONS,
+        'CONN_MAX_AGE': SQLITE_CONN_MAX_AGE,
+    },
+    # Old expenses moved out of the default database, created with
+    # manage.py migrate --database archive
+    'archive': {
+        'ENGINE': 'expenses.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'archive.sqlite3'),
+        'OPTIONS': SQLITE_OPTIONS,
+        'CONN_MAX_AGE': SQLITE_CONN_MAX_AGE,
+    },
+    # Copy of the default database, which the read-only requests read,
+    # synced with manage.py sync_replicas. The tests read the default one
+    'replica': {
+        'ENGINE': 'expenses.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'replica.sqlite3'),
+        'OPTIONS': SQLITE_OPTIONS,
+        'CONN_MAX_AGE': SQLITE_CONN_MAX_AGE,
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
+DATABASE_ROUTERS = [
+    'expenses.routers.ArchiveRouter',
+    'expenses.routers.ReplicaRouter',
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -118,3 +164,93 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.0/howto/static-files/
 
 STATIC_URL = '/static/'
+
+
+# Expenses
+
+# Number of rows of a table, above which the list views show estimated
+# numbers of objects instead of counting them (None to always count)
+EXPENSES_COUNT_ESTIMATE_THRESHOLD = None
+
+# Backend used to search expenses and categories by name,
+# expenses.search.IContainsSearchBackend works with every database
+EXPENSES_SEARCH_BACKEND = 'expenses.search.SQLiteTrigramSearchBackend'
+
+# Cache of the summaries of the expenses list, the reports can be also
+# stored in one of CACHES with expenses.report_cache.DjangoReportCache
+# and OPTIONS {'alias': 'default', 'timeout': 3600}
+EXPENSES_REPORT_CACHE = {
+    'BACKEND': 'expenses.report_cache.LRUReportCache',
+    'OPTIONS': {'max_size': 256},
+}
+
+# Number of threads running the independent queries of the async views
+# (expense/list/async/ and category/<pk>/async/) concurrently
+EXPENSES_QUERY_THREADS = 4
+
+# Deleted categories are hidden at once, their expenses are then deleted
+# in batches of BATCH_SIZE, each in a short transaction, in a background
+# thread (or during the request, if BACKGROUND is False), the interrupted
+# deletions are finished by the purge_categories command
+EXPENSES_CATEGORY_PURGE = {
+    'BACKGROUND': True,
+    'BATCH_SIZE': 1000,
+}
+
+# Expenses dated more than AGE_DAYS ago are moved to the DATABASE
+# by the archive_expenses command, in batches of BATCH_SIZE, each in
+# a short transaction. Lists, exports and reports of dates before
+# the archived ones read both databases
+EXPENSES_ARCHIVE = {
+    'DATABASE': 'archive',
+    'AGE_DAYS': 2 * 365,
+    'BATCH_SIZE': 1000,
+}
+
+# GET and HEAD requests read a random one of the replica DATABASES,
+# unless the client wrote something in the last STICKY_SECONDS, which
+# is remembered in the COOKIE_NAME cookie, the writes go to the default
+# database. The replicas are copies made by the sync_replicas command,
+# which must run after every change, so they are disabled by default
+# (an empty list of DATABASES reads everything from the default), e.g.
+# ['replica'] enables the one configured in DATABASES
+EXPENSES_REPLICAS = {
+    'DATABASES': [],
+    'STICKY_SECONDS': 10,
+    'COOKIE_NAME': 'expenses_primary',
+}
+
+# Per-request timings of the database queries, the reports and the template
+# rendering, sent in the Server-Timing header and logged to expenses.timing,
+# SLOW_QUERIES is a number of the slowest queries logged with their SQL
+# (0 doesn't capture them)
+EXPENSES_TIMING = {
+    'ENABLED': True,
+    'SLOW_QUERIES': 0,
+}
+
+# The timings are printed in development, production should send
+# the expenses.timing logs to its log collector instead
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'require_debug_true': {
+            '()': 'django.utils.log.RequireDebugTrue',
+        },
+    },
+    'handlers': {
+        'timing': {
+            'level': 'INFO',
+            'filters': ['require_debug_true'],
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'expenses.timing': {
+            'handlers': ['timing'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}